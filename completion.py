@@ -0,0 +1,135 @@
+"""As-you-type completion for street and name fields.
+
+PrefixIndex keeps (key, text) pairs in one sorted list, keyed by the
+normalized text of every word onwards ("вул. Шевченка 5" is found from
+"вул", "шевч" or "shevch"), so complete() is a bisect and a short walk.
+The two shared indexes, streets() and names(), are loaded from the database
+the first time a dialog asks for them; after that the UI tells them about
+its own writes (add_street(), remove_street(), add_names(), remove_names())
+instead of reloading, and invalidate() drops both after bulk changes such
+as an import.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional
+
+from transliterate import normalize_for_search
+
+COMPLETION_LIMIT = 8
+
+
+def _keys(text: str) -> List[str]:
+    """Search keys of text: its normalized form from each word onwards."""
+    words = normalize_for_search(text).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over a multiset of strings."""
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self._counts: Dict[str, int] = {}
+        for text in texts:
+            text = " ".join(text.split())
+            if text:
+                self._counts[text] = self._counts.get(text, 0) + 1
+        self._entries = sorted((key, text) for text in self._counts for key in _keys(text))
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, text: str) -> bool:
+        return " ".join(text.split()) in self._counts
+
+    def add(self, text: str):
+        text = " ".join(text.split())
+        if not text:
+            return
+        count = self._counts.get(text, 0)
+        self._counts[text] = count + 1
+        if not count:
+            for key in _keys(text):
+                insort(self._entries, (key, text))
+
+    def remove(self, text: str):
+        """Forget one occurrence of text; it stops completing with the last one."""
+        text = " ".join(text.split())
+        count = self._counts.get(text, 0)
+        if count > 1:
+            self._counts[text] = count - 1
+            return
+        if not count:
+            return
+        del self._counts[text]
+        for key in _keys(text):
+            i = bisect_left(self._entries, (key, text))
+            if i < len(self._entries) and self._entries[i] == (key, text):
+                del self._entries[i]
+
+    def complete(self, prefix: str, limit: int = COMPLETION_LIMIT) -> List[str]:
+        """Up to `limit` distinct texts with a word starting with prefix, in key order."""
+        prefix = " ".join(normalize_for_search(prefix).split())
+        if not prefix or limit <= 0:
+            return []
+        entries = self._entries
+        found: List[str] = []
+        i = bisect_left(entries, (prefix,))
+        while i < len(entries) and len(found) < limit:
+            key, text = entries[i]
+            if not key.startswith(prefix):
+                break
+            if text not in found:
+                found.append(text)
+            i += 1
+        return found
+
+
+_streets: Optional[PrefixIndex] = None
+_names: Optional[PrefixIndex] = None
+
+
+def streets() -> PrefixIndex:
+    """Index of every street in the register, loaded on first use."""
+    global _streets
+    if _streets is None:
+        import database as db
+        _streets = PrefixIndex(db.get_address_streets().values())
+    return _streets
+
+
+def names() -> PrefixIndex:
+    """Index of residents' full names and the father/mother/spouse names on record."""
+    global _names
+    if _names is None:
+        import database as db
+        _names = PrefixIndex(db.get_person_names())
+    return _names
+
+
+def add_street(street: str):
+    if _streets is not None:
+        _streets.add(street)
+
+
+def remove_street(street: str):
+    if _streets is not None:
+        _streets.remove(street)
+
+
+def add_names(*names_: Optional[str]):
+    if _names is not None:
+        for name in names_:
+            if name:
+                _names.add(name)
+
+
+def remove_names(*names_: Optional[str]):
+    if _names is not None:
+        for name in names_:
+            if name:
+                _names.remove(name)
+
+
+def invalidate():
+    """Drop both indexes; the next dialog reloads them."""
+    global _streets, _names
+    _streets = _names = None
@@ -1,65 +1,673 @@
 import sqlite3
 import os
 import re as _re
-from typing import List, Optional
+import threading
+import time
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import MISSING, fields
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from models import Address, Resident, Event
+from transliterate import normalize_for_search, phonetic_keys
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "church.db")
 
 
+# ── Connections ──────────────────────────────────────────────────────────────
+
+class _Connection(sqlite3.Connection):
+    """sqlite3 connection that remembers which file and generation it belongs to."""
+    path: str = ""
+    generation: int = 0
+    is_closed: bool = False
+    has_fts: Optional[bool] = None  # resident_fts present; checked on first search
+
+
+class ConnectionManager:
+    """Long-lived SQLite connections: one per thread, plus a small pool for workers.
+
+    get() hands back the calling thread's connection, opening it (and running
+    the PRAGMAs) only the first time.  Short-lived worker threads should wrap
+    their work in `with pooled():` so they reuse a pooled connection instead
+    of opening their own.  A connection opened for a different DB_PATH
+    (e.g. a test's temp file) is closed and replaced transparently.
+    """
+
+    def __init__(self, pool_size: int = 4):
+        self.pool_size = pool_size
+        self.opened = 0
+        self.closed = 0
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pool: List[_Connection] = []
+        self._live: Dict[int, _Connection] = {}
+
+    def _open(self) -> _Connection:
+        conn = sqlite3.connect(DB_PATH, factory=_Connection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        # Write-ahead log: a background export's long read no longer blocks
+        # UI writes (nor they the export).  Persistent, so a no-op after the
+        # first open of a file.
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.path = DB_PATH
+        with self._lock:
+            conn.generation = self._generation
+            self._live[id(conn)] = conn
+            self.opened += 1
+        return conn
+
+    def _close(self, conn: _Connection):
+        with self._lock:
+            if conn.is_closed:
+                return
+            conn.is_closed = True
+            self._live.pop(id(conn), None)
+            self.closed += 1
+        conn.close()
+
+    def _usable(self, conn: Optional[_Connection]) -> bool:
+        return (conn is not None and not conn.is_closed
+                and conn.path == DB_PATH and conn.generation == self._generation)
+
+    def get(self) -> _Connection:
+        conn = getattr(self._local, "conn", None)
+        if not self._usable(conn):
+            if conn is not None:
+                self._close(conn)
+            conn = self._local.conn = self._open()
+        return conn
+
+    @contextmanager
+    def pooled(self):
+        """Bind a pooled connection to the current thread for the block."""
+        previous = getattr(self._local, "conn", None)
+        conn = None
+        stale = []
+        with self._lock:
+            while self._pool and conn is None:
+                candidate = self._pool.pop()
+                if self._usable(candidate):
+                    conn = candidate
+                else:
+                    stale.append(candidate)
+        for c in stale:
+            self._close(c)
+        self._local.conn = conn or self._open()
+        try:
+            yield self._local.conn
+        finally:
+            conn = self._local.conn
+            self._local.conn = previous
+            if self._usable(conn) and conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                keep = self._usable(conn) and len(self._pool) < self.pool_size
+                if keep:
+                    self._pool.append(conn)
+            if not keep:
+                self._close(conn)
+
+    def close_all(self):
+        """Close every open connection; threads reopen lazily on next use."""
+        with self._lock:
+            self._generation += 1
+            live = list(self._live.values())
+            self._pool.clear()
+        if live:
+            _checkpoint(live[0])
+        for conn in live:
+            self._close(conn)
+        self._local.conn = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "closed": self.closed,
+                "open":   len(self._live),
+                "pooled": len(self._pool),
+            }
+
+
+def _checkpoint(conn):
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.OperationalError:
+        pass  # still busy after the timeout; the next checkpoint catches up
+
+
+_manager = ConnectionManager()
+
+
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    return _manager.get()
+
+
+def pooled_connection():
+    """Context manager for worker threads: borrow a connection from the pool."""
+    return _manager.pooled()
+
+
+def close_connections():
+    _manager.close_all()
+
+
+def checkpoint():
+    """Move committed changes from church.db-wal into church.db and empty the log.
+
+    Run when a background task ends and by close_connections(), so that a
+    copy of church.db alone holds everything committed so far.
+    """
+    _checkpoint(get_connection())
+
+
+def connection_stats() -> Dict[str, int]:
+    """Return opened/closed/open/pooled connection counters."""
+    return _manager.stats()
+
+
+# ── Schema migrations ────────────────────────────────────────────────────────
+#
+# Each step runs once, in version order, inside the single transaction opened
+# by migrate().  New tables, columns, indexes and triggers are added by
+# appending a step to _MIGRATIONS — never by editing an existing one.
+# Steps must use conn.execute() only: executescript() would commit midway.
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _columns(conn, table: str) -> List[str]:
+    return [r["name"] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _m001_base_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS config (
+            key   TEXT PRIMARY KEY,
+            value TEXT
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS addresses (
+            id     INTEGER PRIMARY KEY AUTOINCREMENT,
+            street TEXT NOT NULL,
+            notes  TEXT DEFAULT ''
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS residents (
+            id             INTEGER PRIMARY KEY AUTOINCREMENT,
+            address_id     INTEGER NOT NULL REFERENCES addresses(id) ON DELETE CASCADE,
+            first_name     TEXT NOT NULL,
+            last_name      TEXT NOT NULL,
+            birth_date     TEXT,
+            baptism_date   TEXT,
+            marriage_date  TEXT,
+            death_date     TEXT,
+            status         TEXT NOT NULL DEFAULT 'active',
+            notes          TEXT DEFAULT ''
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            resident_id  INTEGER NOT NULL REFERENCES residents(id) ON DELETE CASCADE,
+            event_type   TEXT NOT NULL,
+            event_date   TEXT NOT NULL,
+            description  TEXT DEFAULT '',
+            created_at   TEXT DEFAULT (datetime('now'))
+        )""")
+
+
+def _m002_family_columns(conn):
+    existing = _columns(conn, "residents")
+    for col in ("father", "mother", "spouse"):
+        if col not in existing:
+            conn.execute(f"ALTER TABLE residents ADD COLUMN {col} TEXT DEFAULT ''")
+
+
+# Secondary indexes for the hot read paths.  tests/test_database.py runs
+# EXPLAIN QUERY PLAN over every query in this module against these.
+_INDEXES_V3 = {
+    # get_residents(), FK cascade from addresses
+    "idx_residents_address_name":
+        "residents(address_id, last_name, first_name)",
+    # get_all_residents() ordering
+    "idx_residents_name":
+        "residents(last_name, first_name)",
+    # get_events_for_address() join, FK cascade from residents
+    "idx_events_resident_date":
+        "events(resident_id, event_date)",
+    # find_or_create_address()
+    "idx_addresses_street_lower":
+        "addresses(LOWER(street))",
+}
+
+
+def _m003_hot_query_indexes(conn):
+    for name, target in _INDEXES_V3.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def _fold(text: Optional[str]) -> str:
+    """Comparison key: NFC, whitespace collapsed, Unicode casefold.
+
+    SQLite's LOWER() folds ASCII only, so 'ВУЛ. ШЕВЧЕНКА 5' and
+    'вул. Шевченка 5' differ there; their _fold() keys are equal.
+    """
+    return " ".join(unicodedata.normalize("NFC", text or "").split()).casefold()
+
+
+def _m004_folded_keys(conn):
+    if "street_key" not in _columns(conn, "addresses"):
+        conn.execute("ALTER TABLE addresses ADD COLUMN street_key TEXT NOT NULL DEFAULT ''")
+    existing = _columns(conn, "residents")
+    for col in ("first_key", "last_key"):
+        if col not in existing:
+            conn.execute(f"ALTER TABLE residents ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+    conn.executemany(
+        "UPDATE addresses SET street_key=? WHERE id=?",
+        [(_fold(r["street"]), r["id"]) for r in conn.execute("SELECT id, street FROM addresses")],
+    )
+    conn.executemany(
+        "UPDATE residents SET first_key=?, last_key=? WHERE id=?",
+        [(_fold(r["first_name"]), _fold(r["last_name"]), r["id"])
+         for r in conn.execute("SELECT id, first_name, last_name FROM residents")],
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_addresses_street_lower")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_addresses_street_key ON addresses(street_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_residents_name_key "
+                 "ON residents(address_id, last_key, first_key)")
+
+
+# Ukrainian letters are remapped onto consecutive private-use code points so
+# that plain binary comparison (SQLite's default collation, Python's str <)
+# follows the alphabet: Ґ after Г, Є after Е, І/Ї after И, and all of them
+# before Я.  Latin text keeps its code points and sorts ahead of Cyrillic.
+# Letters found in older (Russian-spelled) registers sit next to their
+# nearest Ukrainian neighbours: Ё and Э after Е, Ы after И, Ъ before Ь.
+_UK_ALPHABET = "абвгґдеёэєжзиыіїйклмнопрстуфхцчшщъьюя"
+_UK_SORT_TABLE = {ord(ch): 0xE000 + i for i, ch in enumerate(_UK_ALPHABET)}
+_UK_SORT_TABLE.update({ord(ch): None for ch in "'’ʼ"})  # apostrophe is not collated
+
+
+def _sort_key(text: Optional[str]) -> str:
+    """Binary-sortable key that orders names in Ukrainian alphabetical order."""
+    return _fold(text).translate(_UK_SORT_TABLE)
+
+
+def _m005_sort_keys(conn):
+    existing = _columns(conn, "residents")
+    for col in ("first_sort", "last_sort"):
+        if col not in existing:
+            conn.execute(f"ALTER TABLE residents ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+    conn.executemany(
+        "UPDATE residents SET first_sort=?, last_sort=? WHERE id=?",
+        [(_sort_key(r["first_name"]), _sort_key(r["last_name"]), r["id"])
+         for r in conn.execute("SELECT id, first_name, last_name FROM residents")],
+    )
+    # The name-ordered indexes from step 3 are superseded; address_id lookups
+    # for FK cascades are still covered by idx_residents_name_key.
+    conn.execute("DROP INDEX IF EXISTS idx_residents_address_name")
+    conn.execute("DROP INDEX IF EXISTS idx_residents_name")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_residents_address_sort "
+                 "ON residents(address_id, last_sort, first_sort)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_residents_sort "
+                 "ON residents(last_sort, first_sort)")
+
+
+def _m006_address_sort_keys(conn):
+    existing = _columns(conn, "addresses")
+    for col, decl in (("street_sort", "TEXT NOT NULL DEFAULT ''"),
+                      ("building_no", "INTEGER NOT NULL DEFAULT 0"),
+                      ("building_suffix", "TEXT NOT NULL DEFAULT ''")):
+        if col not in existing:
+            conn.execute(f"ALTER TABLE addresses ADD COLUMN {col} {decl}")
+    conn.executemany(
+        "UPDATE addresses SET street_sort=?, building_no=?, building_suffix=? WHERE id=?",
+        [(*_address_sort_key(r["street"]), r["id"])
+         for r in conn.execute("SELECT id, street FROM addresses")],
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_addresses_sort "
+                 "ON addresses(street_sort, building_no, building_suffix)")
+
+
+def _m007_active_counters(conn):
+    if "active_count" not in _columns(conn, "addresses"):
+        conn.execute("ALTER TABLE addresses ADD COLUMN active_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS parish_stats (
+            id            INTEGER PRIMARY KEY CHECK (id = 1),
+            active_count  INTEGER NOT NULL DEFAULT 0
+        )""")
+    conn.execute("""
+        UPDATE addresses SET active_count = (
+            SELECT COUNT(*) FROM residents r
+            WHERE r.address_id = addresses.id AND r.status = 'active')""")
+    conn.execute("""
+        INSERT OR REPLACE INTO parish_stats (id, active_count)
+        SELECT 1, COUNT(*) FROM residents WHERE status = 'active'""")
+    # The per-address and parish-wide counters are kept exact here rather than
+    # in Python so that every write path — including FK cascades — is covered.
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_active_insert
+        AFTER INSERT ON residents WHEN NEW.status = 'active'
+        BEGIN
+            UPDATE addresses SET active_count = active_count + 1 WHERE id = NEW.address_id;
+            UPDATE parish_stats SET active_count = active_count + 1 WHERE id = 1;
+        END""")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_active_delete
+        AFTER DELETE ON residents WHEN OLD.status = 'active'
+        BEGIN
+            UPDATE addresses SET active_count = active_count - 1 WHERE id = OLD.address_id;
+            UPDATE parish_stats SET active_count = active_count - 1 WHERE id = 1;
+        END""")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_active_update
+        AFTER UPDATE OF status, address_id ON residents
+        WHEN (OLD.status = 'active') <> (NEW.status = 'active')
+          OR (OLD.status = 'active' AND OLD.address_id <> NEW.address_id)
+        BEGIN
+            UPDATE addresses SET active_count = active_count - (OLD.status = 'active')
+            WHERE id = OLD.address_id;
+            UPDATE addresses SET active_count = active_count + (NEW.status = 'active')
+            WHERE id = NEW.address_id;
+            UPDATE parish_stats
+            SET active_count = active_count - (OLD.status = 'active') + (NEW.status = 'active')
+            WHERE id = 1;
+        END""")
+
+
+def _search_text(*names: Optional[str]) -> str:
+    """Searchable text for a resident: each name folded, transliterated and
+    reduced to its phonetic keys (see transliterate.phonetic_keys()).
+
+    One line per distinct form, so a search phrase (which never contains a
+    newline) cannot match across two different names.
+    """
+    forms: List[str] = []
+    for name in names:
+        folded = _fold(name)
+        for form in (folded, normalize_for_search(folded), *phonetic_keys(folded)):
+            if form and form not in forms:
+                forms.append(form)
+    return "\n".join(forms)
+
+
+# Fuzzy name matching works on pg_trgm-style trigrams of the transliterated
+# words of a name.  A name is stored as a key in which every word is padded
+# with two spaces in front and one behind ("  kovalchuk   ivan "); its
+# trigrams are the three-character windows of that key, except those ending
+# in two spaces, which would straddle two words.  Keys are cut to
+# FUZZY_MAX_KEY characters, the positions the trigram triggers read.
+FUZZY_MAX_KEY = 128
+FUZZY_MIN_SCORE = 0.3
+_WORD_RE = _re.compile(r"\w+")
+
+
+def _fuzzy_key(name: Optional[str]) -> str:
+    words = _WORD_RE.findall(normalize_for_search(_fold(name)))
+    return "".join(f"  {w} " for w in words)[:FUZZY_MAX_KEY]
+
+
+def _trigrams(key: str) -> set:
+    return {key[i:i + 3] for i in range(len(key) - 2) if key[i + 1:i + 3] != "  "}
+
+
+def _similarity(a: set, b: set) -> float:
+    """Share of trigrams two names have in common (Jaccard index, 0.0–1.0)."""
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+def name_similarity(a: str, b: str) -> float:
+    """How alike two names are, ignoring case, script and word order (0.0–1.0).
+
+    "Kovalchyk" and "Ковальчук" score about 0.5; unrelated names near 0.
+    """
+    return _similarity(_trigrams(_fuzzy_key(a)), _trigrams(_fuzzy_key(b)))
+
+
+def _resident_derived(res) -> tuple:
+    """Values for the derived residents columns, in _RESIDENT_DERIVED order."""
+    full_name = f"{res.first_name} {res.last_name}"
+    fuzzy_key = _fuzzy_key(full_name)
+    return (
+        _fold(res.first_name), _fold(res.last_name),
+        _sort_key(res.first_name), _sort_key(res.last_name),
+        _search_text(full_name, res.father, res.mother, res.spouse),
+        fuzzy_key, len(_trigrams(fuzzy_key)),
+    )
+
+
+_RESIDENT_DERIVED = ("first_key", "last_key", "first_sort", "last_sort", "search_text",
+                     "fuzzy_key", "fuzzy_grams")
+
+
+def _has_fts5_trigram(conn) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp._fts5_probe")
+    return True
+
+
+def _m008_name_search(conn):
+    if "search_text" not in _columns(conn, "residents"):
+        conn.execute("ALTER TABLE residents ADD COLUMN search_text TEXT NOT NULL DEFAULT ''")
+    conn.executemany(
+        "UPDATE residents SET search_text=? WHERE id=?",
+        [(_search_text(f"{r['first_name']} {r['last_name']}",
+                       r["father"], r["mother"], r["spouse"]), r["id"])
+         for r in conn.execute(
+             "SELECT id, first_name, last_name, father, mother, spouse FROM residents")],
+    )
+    if not _has_fts5_trigram(conn):
+        return  # search_residents() falls back to LIKE on search_text
+    # External-content index over residents.search_text; the triggers only copy
+    # the column, so they need no Python functions registered on the connection.
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS resident_fts USING fts5(
+            search_text, content='residents', content_rowid='id', tokenize='trigram'
+        )""")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_fts_insert AFTER INSERT ON residents
+        BEGIN
+            INSERT INTO resident_fts (rowid, search_text) VALUES (NEW.id, NEW.search_text);
+        END""")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_fts_delete AFTER DELETE ON residents
+        BEGIN
+            INSERT INTO resident_fts (resident_fts, rowid, search_text)
+            VALUES ('delete', OLD.id, OLD.search_text);
+        END""")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_fts_update
+        AFTER UPDATE OF search_text ON residents
+        BEGIN
+            INSERT INTO resident_fts (resident_fts, rowid, search_text)
+            VALUES ('delete', OLD.id, OLD.search_text);
+            INSERT INTO resident_fts (rowid, search_text) VALUES (NEW.id, NEW.search_text);
+        END""")
+    conn.execute("INSERT INTO resident_fts (resident_fts) VALUES ('rebuild')")
+
+
+# (gram, resident_id) rows for the residents row(s) `r`, read off fuzzy_key
+# position by position; `source` lists the tables to read from.
+_TRIGRAMS_OF = """SELECT substr({r}.fuzzy_key, p.n, 3), {r}.id FROM {source}
+                  WHERE p.n <= length({r}.fuzzy_key) - 2
+                    AND substr({r}.fuzzy_key, p.n + 1, 2) <> '  '"""
+
+
+def _m009_fuzzy_names(conn):
+    existing = _columns(conn, "residents")
+    for col, decl in (("fuzzy_key", "TEXT NOT NULL DEFAULT ''"),
+                      ("fuzzy_grams", "INTEGER NOT NULL DEFAULT 0")):
+        if col not in existing:
+            conn.execute(f"ALTER TABLE residents ADD COLUMN {col} {decl}")
+    updates = []
+    for r in conn.execute("SELECT id, first_name, last_name FROM residents"):
+        key = _fuzzy_key(f"{r['first_name']} {r['last_name']}")
+        updates.append((key, len(_trigrams(key)), r["id"]))
+    conn.executemany("UPDATE residents SET fuzzy_key=?, fuzzy_grams=? WHERE id=?", updates)
+    # Triggers cannot use WITH RECURSIVE, so the character positions to read
+    # trigrams from are a table of their own.
+    conn.execute("CREATE TABLE IF NOT EXISTS trigram_positions (n INTEGER PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO trigram_positions VALUES (?)",
+                     [(n,) for n in range(1, FUZZY_MAX_KEY + 1)])
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resident_trigrams (
+            gram        TEXT    NOT NULL,
+            resident_id INTEGER NOT NULL,
+            PRIMARY KEY (gram, resident_id)
+        ) WITHOUT ROWID""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resident_trigrams_resident "
+                 "ON resident_trigrams(resident_id)")
+    one_row = _TRIGRAMS_OF.format(r="NEW", source="trigram_positions p")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_trigrams_insert AFTER INSERT ON residents
+        BEGIN
+            INSERT OR IGNORE INTO resident_trigrams {one_row};
+        END""")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_trigrams_delete AFTER DELETE ON residents
+        BEGIN
+            DELETE FROM resident_trigrams WHERE resident_id = OLD.id;
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_trigrams_update
+        AFTER UPDATE OF fuzzy_key ON residents WHEN NEW.fuzzy_key <> OLD.fuzzy_key
+        BEGIN
+            DELETE FROM resident_trigrams WHERE resident_id = OLD.id;
+            INSERT OR IGNORE INTO resident_trigrams {one_row};
+        END""")
+    conn.execute("DELETE FROM resident_trigrams")
+    conn.execute("INSERT OR IGNORE INTO resident_trigrams "
+                 + _TRIGRAMS_OF.format(r="r", source="residents r, trigram_positions p"))
+
+
+def _m010_phonetic_search_text(conn):
+    # search_text gains the phonetic keys; resident_fts follows via its trigger
+    conn.executemany(
+        "UPDATE residents SET search_text=? WHERE id=?",
+        [(_search_text(f"{r['first_name']} {r['last_name']}",
+                       r["father"], r["mother"], r["spouse"]), r["id"])
+         for r in conn.execute(
+             "SELECT id, first_name, last_name, father, mother, spouse FROM residents")],
+    )
+
+
+def _m011_cyrillic_sort_keys(conn):
+    # Ё, Э, Ы and Ъ joined _UK_ALPHABET, which moved the code points of every
+    # letter after Е, so all stored name and street sort keys are recomputed.
+    conn.executemany(
+        "UPDATE residents SET first_sort=?, last_sort=? WHERE id=?",
+        [(_sort_key(r["first_name"]), _sort_key(r["last_name"]), r["id"])
+         for r in conn.execute("SELECT id, first_name, last_name FROM residents")],
+    )
+    conn.executemany(
+        "UPDATE addresses SET street_sort=?, building_no=?, building_suffix=? WHERE id=?",
+        [(*_address_sort_key(r["street"]), r["id"])
+         for r in conn.execute("SELECT id, street FROM addresses")],
+    )
+
+
+def _m012_trigram_bulk_writes(conn):
+    # A resident's rows in resident_trigrams are exactly the grams of its
+    # fuzzy_key, so the triggers can delete them through the primary key.
+    # That makes idx_resident_trigrams_resident, which every imported row
+    # had to update ~20 times, unnecessary.
+    old_rows = """DELETE FROM resident_trigrams WHERE resident_id = OLD.id AND gram IN
+                      (SELECT substr(OLD.fuzzy_key, p.n, 3) FROM trigram_positions p
+                       WHERE p.n <= length(OLD.fuzzy_key) - 2)"""
+    one_row = _TRIGRAMS_OF.format(r="NEW", source="trigram_positions p")
+    # While BulkImporter holds a row in trigrams_deferred (only ever inside
+    # its own write transaction) the insert trigger stands down, and the
+    # importer indexes its residents with one INSERT … SELECT per chunk.
+    conn.execute("CREATE TABLE IF NOT EXISTS trigrams_deferred (since_id INTEGER NOT NULL)")
+    for name in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_residents_trigrams_{name}")
+    conn.execute(f"""
+        CREATE TRIGGER trg_residents_trigrams_insert AFTER INSERT ON residents
+        WHEN NOT EXISTS (SELECT 1 FROM trigrams_deferred)
+        BEGIN
+            INSERT OR IGNORE INTO resident_trigrams {one_row};
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER trg_residents_trigrams_delete AFTER DELETE ON residents
+        BEGIN
+            {old_rows};
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER trg_residents_trigrams_update
+        AFTER UPDATE OF fuzzy_key ON residents WHEN NEW.fuzzy_key <> OLD.fuzzy_key
+        BEGIN
+            {old_rows};
+            INSERT OR IGNORE INTO resident_trigrams {one_row};
+        END""")
+    conn.execute("DROP INDEX IF EXISTS idx_resident_trigrams_resident")
+
+
+_MIGRATIONS = [
+    (1, _m001_base_schema),
+    (2, _m002_family_columns),
+    (3, _m003_hot_query_indexes),
+    (4, _m004_folded_keys),
+    (5, _m005_sort_keys),
+    (6, _m006_address_sort_keys),
+    (7, _m007_active_counters),
+    (8, _m008_name_search),
+    (9, _m009_fuzzy_names),
+    (10, _m010_phonetic_search_text),
+    (11, _m011_cyrillic_sort_keys),
+    (12, _m012_trigram_bulk_writes),
+]
+
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+
+def _schema_version(conn) -> int:
+    try:
+        row = conn.execute(
+            "SELECT value FROM config WHERE key=?", (SCHEMA_VERSION_KEY,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0  # brand-new file: not even the config table exists yet
+    return int(row["value"]) if row else 0
+
+
+def migrate(conn) -> List[int]:
+    """Apply pending migrations in one transaction. Returns the versions applied.
+
+    Databases created before versioning existed report version 0; the early
+    steps are written to be no-ops against them.
+    """
+    if _schema_version(conn) >= SCHEMA_VERSION:
+        return []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = _schema_version(conn)  # re-read under the write lock
+        applied = []
+        for version, step in _MIGRATIONS:
+            if version > current:
+                step(conn)
+                applied.append(version)
+        if applied:
+            conn.execute("INSERT OR REPLACE INTO config VALUES (?,?)",
+                         (SCHEMA_VERSION_KEY, str(SCHEMA_VERSION)))
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return applied
 
 
 def init_db():
-    with get_connection() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS config (
-                key   TEXT PRIMARY KEY,
-                value TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS addresses (
-                id     INTEGER PRIMARY KEY AUTOINCREMENT,
-                street TEXT NOT NULL,
-                notes  TEXT DEFAULT ''
-            );
-
-            CREATE TABLE IF NOT EXISTS residents (
-                id             INTEGER PRIMARY KEY AUTOINCREMENT,
-                address_id     INTEGER NOT NULL REFERENCES addresses(id) ON DELETE CASCADE,
-                first_name     TEXT NOT NULL,
-                last_name      TEXT NOT NULL,
-                birth_date     TEXT,
-                baptism_date   TEXT,
-                marriage_date  TEXT,
-                death_date     TEXT,
-                status         TEXT NOT NULL DEFAULT 'active',
-                father         TEXT DEFAULT '',
-                mother         TEXT DEFAULT '',
-                spouse         TEXT DEFAULT '',
-                notes          TEXT DEFAULT ''
-            );
-
-            CREATE TABLE IF NOT EXISTS events (
-                id           INTEGER PRIMARY KEY AUTOINCREMENT,
-                resident_id  INTEGER NOT NULL REFERENCES residents(id) ON DELETE CASCADE,
-                event_type   TEXT NOT NULL,
-                event_date   TEXT NOT NULL,
-                description  TEXT DEFAULT '',
-                created_at   TEXT DEFAULT (datetime('now'))
-            );
-        """)
-        # Migration: add columns that may be absent in older databases
-        import sqlite3 as _sqlite3
-        for col in ("father", "mother", "spouse"):
-            try:
-                conn.execute(f"ALTER TABLE residents ADD COLUMN {col} TEXT DEFAULT ''")
-            except _sqlite3.OperationalError:
-                pass  # column already exists
+    migrate(get_connection())
 
 
 # ── Config ──────────────────────────────────────────────────────────────────
@@ -77,45 +685,81 @@ def set_config(key: str, value: str):
 
 # ── Addresses ────────────────────────────────────────────────────────────────
 
+_BUILDING_RE = _re.compile(r'^(.*?)\s+(\d+)(\S*)$')
+_BUILDING_NO_MAX = 2 ** 63 - 1   # largest SQLite INTEGER
+
+
 def _address_sort_key(street: str):
-    """Return (street_name_casefold, building_number) for natural sort.
+    """Return (street_sort, building_number, building_suffix) for natural sort.
 
-    Handles 'Street Name 12', 'вул. Незалежності 15', etc.
-    Addresses without a trailing number sort as building 0.
+    Handles 'Street Name 12', 'вул. Незалежності 15', '12а', '12/3', etc.
+    The street part uses the Ukrainian _sort_key(); addresses without a
+    trailing number sort as building 0.  Stored in the street_sort,
+    building_no and building_suffix columns by every address write.  Numbers
+    too large for an SQLite INTEGER are clamped and sort last.
     """
-    m = _re.match(r'^(.*?)\s+(\d+)\s*$', street.strip())
+    m = _BUILDING_RE.match(street.strip())
     if m:
-        return (m.group(1).casefold(), int(m.group(2)))
-    return (street.strip().casefold(), 0)
+        return (_sort_key(m.group(1)), min(int(m.group(2)), _BUILDING_NO_MAX),
+                _sort_key(m.group(3)))
+    return (_sort_key(street), 0, "")
 
 
 def get_addresses() -> List[Address]:
     with get_connection() as conn:
         rows = conn.execute("""
-            SELECT a.id, a.street, a.notes,
-                   COUNT(CASE WHEN r.status='active' THEN 1 END) AS active_count
-            FROM addresses a
-            LEFT JOIN residents r ON r.address_id = a.id
-            GROUP BY a.id
+            SELECT id, street, notes, active_count
+            FROM addresses
+            ORDER BY street_sort, building_no, building_suffix
         """).fetchall()
-        result = [Address(r["id"], r["street"], r["notes"], r["active_count"]) for r in rows]
-        result.sort(key=lambda a: _address_sort_key(a.street))
-        return result
+        return [Address(r["id"], r["street"], r["notes"], r["active_count"]) for r in rows]
+
+
+def get_address_streets(limit: int = -1) -> Dict[int, str]:
+    """Return {address_id: street} for at most `limit` addresses (all if negative), unordered."""
+    with get_connection() as conn:
+        return {r["id"]: r["street"] for r in
+                conn.execute("SELECT id, street FROM addresses LIMIT ?", (limit,))}
+
+
+def get_address_street(address_id: int) -> Optional[str]:
+    """Return the street of one address, or None if it does not exist."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT street FROM addresses WHERE id=?", (address_id,)).fetchone()
+        return row["street"] if row else None
+
+
+def get_active_total() -> int:
+    """Active residents across the parish, read from the trigger-kept counter."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT active_count FROM parish_stats WHERE id=1").fetchone()
+        return row["active_count"] if row else 0
+
+
+_INSERT_ADDRESS_SQL = """INSERT INTO addresses
+    (street, street_key, street_sort, building_no, building_suffix, notes)
+    VALUES (?,?,?,?,?,?)"""
+
+
+def _address_values(street: str, notes: str = "") -> tuple:
+    return (street, _fold(street), *_address_sort_key(street), notes)
 
 
 def add_address(street: str, notes: str = "") -> Address:
     with get_connection() as conn:
-        cur = conn.execute(
-            "INSERT INTO addresses (street, notes) VALUES (?,?)", (street, notes)
-        )
+        cur = conn.execute(_INSERT_ADDRESS_SQL, _address_values(street, notes))
         return Address(cur.lastrowid, street, notes)
 
 
 def update_address(addr: Address):
     with get_connection() as conn:
         conn.execute(
-            "UPDATE addresses SET street=?, notes=? WHERE id=?",
-            (addr.street, addr.notes, addr.id),
+            """UPDATE addresses SET
+               street=?, street_key=?, street_sort=?, building_no=?, building_suffix=?,
+               notes=?
+               WHERE id=?""",
+            (addr.street, _fold(addr.street), *_address_sort_key(addr.street),
+             addr.notes, addr.id),
         )
 
 
@@ -125,15 +769,16 @@ def delete_address(addr_id: int):
 
 
 def find_or_create_address(street: str) -> int:
-    """Return address id matching street (case-insensitive); create if absent."""
+    """Return address id matching street (Unicode case-insensitive); create if absent."""
     street = street.strip()
+    key = _fold(street)
     with get_connection() as conn:
         row = conn.execute(
-            "SELECT id FROM addresses WHERE LOWER(street)=LOWER(?)", (street,)
+            "SELECT id FROM addresses WHERE street_key=?", (key,)
         ).fetchone()
         if row:
             return row["id"]
-        cur = conn.execute("INSERT INTO addresses (street) VALUES (?)", (street,))
+        cur = conn.execute(_INSERT_ADDRESS_SQL, _address_values(street))
         return cur.lastrowid
 
 
@@ -142,10 +787,8 @@ def resident_exists(address_id: int, first_name: str, last_name: str) -> bool:
     with get_connection() as conn:
         row = conn.execute(
             """SELECT id FROM residents
-               WHERE address_id=?
-                 AND LOWER(first_name)=LOWER(?)
-                 AND LOWER(last_name)=LOWER(?)""",
-            (address_id, first_name.strip(), last_name.strip()),
+               WHERE address_id=? AND last_key=? AND first_key=?""",
+            (address_id, _fold(last_name), _fold(first_name)),
         ).fetchone()
         return row is not None
 
@@ -154,32 +797,121 @@ def resident_exists(address_id: int, first_name: str, last_name: str) -> bool:
 
 def get_residents(address_id: int) -> List[Resident]:
     with get_connection() as conn:
-        rows = conn.execute(
-            "SELECT * FROM residents WHERE address_id=? ORDER BY last_name, first_name",
+        cur = conn.execute(
+            f"""SELECT {_RESIDENT_COLUMNS} FROM residents WHERE address_id=?
+                ORDER BY last_sort, first_sort""",
             (address_id,),
-        ).fetchall()
-        return [_row_to_resident(r) for r in rows]
+        )
+        return list(map(_row_decoder(cur, Resident), cur.fetchall()))
 
 
 def get_all_residents() -> List[Resident]:
     with get_connection() as conn:
-        rows = conn.execute(
-            "SELECT * FROM residents ORDER BY last_name, first_name"
-        ).fetchall()
-        return [_row_to_resident(r) for r in rows]
+        cur = conn.execute(
+            f"SELECT {_RESIDENT_COLUMNS} FROM residents ORDER BY last_sort, first_sort"
+        )
+        return list(map(_row_decoder(cur, Resident), cur.fetchall()))
+
+
+def get_person_names() -> List[str]:
+    """Every resident's full name and every father/mother/spouse name on
+    record, once per occurrence (e.g. to build name completion)."""
+    names: List[str] = []
+    with get_connection() as conn:
+        for r in conn.execute(
+                "SELECT first_name, last_name, father, mother, spouse FROM residents"):
+            names.append(f"{r['first_name']} {r['last_name']}")
+            names.extend(n for n in (r["father"], r["mother"], r["spouse"]) if n)
+    return names
+
+
+def count_residents() -> int:
+    """Number of residents of any status (e.g. as the total for export progress)."""
+    with get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM residents").fetchone()[0]
+
+
+# Keyset columns per iter_residents() order; each matches an index (the
+# rowid is the implicit last column of every index).
+_ITER_ORDERS = {
+    "name":    ("last_sort", "first_sort", "id"),
+    "address": ("address_id", "last_sort", "first_sort", "id"),
+    "id":      ("id",),
+}
+
+
+def iter_residents(batch_size: int = 500, order: str = "name",
+                   where: str = "", params: tuple = ()) -> Iterator[Resident]:
+    """Yield residents lazily, `batch_size` rows per query.
+
+    Uses keyset pagination on the index behind `order` ('name', 'address' or
+    'id'), so memory stays flat and no cursor is held open between batches.
+    `where` is an optional SQL condition with `?` placeholders for `params`.
+    """
+    if order not in _ITER_ORDERS:
+        raise ValueError(f"unknown order: {order!r}")
+    keys = _ITER_ORDERS[order]
+    key_list = ", ".join(keys)
+    base = f"({where})" if where else "1"
+    columns = ", ".join(_RESIDENT_FIELDS + tuple(k for k in keys if k not in _RESIDENT_FIELDS))
+    first_sql = f"SELECT {columns} FROM residents WHERE {base} ORDER BY {key_list} LIMIT ?"
+    next_sql = (f"SELECT {columns} FROM residents WHERE {base} AND ({key_list}) > "
+                f"({', '.join('?' * len(keys))}) ORDER BY {key_list} LIMIT ?")
+    last = None
+    while True:
+        with get_connection() as conn:
+            if last is None:
+                cur = conn.execute(first_sql, (*params, batch_size))
+            else:
+                cur = conn.execute(next_sql, (*params, *last, batch_size))
+            rows = list(map(_row_decoder(cur, Resident, keys), cur.fetchall()))
+        for res, *_ in rows:
+            yield res
+        if len(rows) < batch_size:
+            return
+        last = tuple(rows[-1][1:])
+
+
+EXPORT_COLUMNS = ("last_name", "first_name", "street", "status", "birth_date",
+                  "baptism_date", "marriage_date", "death_date", "notes")
+
+
+def iter_export_rows() -> Iterator[tuple]:
+    """Yield one plain tuple per resident (EXPORT_COLUMNS) in name order.
+
+    A single ordered query joins residents to their street and the cursor is
+    consumed as it goes, so nothing is materialised.  Residents whose address
+    no longer exists get an empty street.
+    """
+    cur = get_connection().execute(
+        f"""SELECT {", ".join("r." + c if c != "street" else "COALESCE(a.street, '')"
+                              for c in EXPORT_COLUMNS)}
+            FROM residents r LEFT JOIN addresses a ON a.id = r.address_id
+            ORDER BY r.last_sort, r.first_sort, r.id""")
+    try:
+        for row in cur:
+            yield tuple(row)
+    finally:
+        cur.close()
+
+
+_INSERT_RESIDENT_SQL = f"""INSERT INTO residents
+    (address_id, first_name, last_name, birth_date, baptism_date,
+     marriage_date, death_date, status, father, mother, spouse, notes,
+     {", ".join(_RESIDENT_DERIVED)})
+    VALUES ({", ".join("?" * (12 + len(_RESIDENT_DERIVED)))})"""
+
+
+def _resident_values(res: Resident) -> tuple:
+    return (res.address_id, res.first_name, res.last_name, res.birth_date,
+            res.baptism_date, res.marriage_date, res.death_date, res.status,
+            res.father or "", res.mother or "", res.spouse or "", res.notes,
+            *_resident_derived(res))
 
 
 def add_resident(res: Resident) -> Resident:
     with get_connection() as conn:
-        cur = conn.execute(
-            """INSERT INTO residents
-               (address_id, first_name, last_name, birth_date, baptism_date,
-                marriage_date, death_date, status, father, mother, spouse, notes)
-               VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
-            (res.address_id, res.first_name, res.last_name, res.birth_date,
-             res.baptism_date, res.marriage_date, res.death_date, res.status,
-             res.father or "", res.mother or "", res.spouse or "", res.notes),
-        )
+        cur = conn.execute(_INSERT_RESIDENT_SQL, _resident_values(res))
         res.id = cur.lastrowid
         return res
 
@@ -187,14 +919,16 @@ def add_resident(res: Resident) -> Resident:
 def update_resident(res: Resident):
     with get_connection() as conn:
         conn.execute(
-            """UPDATE residents SET
+            f"""UPDATE residents SET
                first_name=?, last_name=?, birth_date=?, baptism_date=?,
                marriage_date=?, death_date=?, status=?,
-               father=?, mother=?, spouse=?, notes=?
+               father=?, mother=?, spouse=?, notes=?,
+               {", ".join(c + "=?" for c in _RESIDENT_DERIVED)}
                WHERE id=?""",
             (res.first_name, res.last_name, res.birth_date, res.baptism_date,
              res.marriage_date, res.death_date, res.status,
-             res.father or "", res.mother or "", res.spouse or "", res.notes, res.id),
+             res.father or "", res.mother or "", res.spouse or "", res.notes,
+             *_resident_derived(res), res.id),
         )
 
 
@@ -219,19 +953,382 @@ def mark_left(res_id: int):
         )
 
 
+# ── Bulk import ──────────────────────────────────────────────────────────────
+
+class _Housemates:
+    """Names at one address with a gram → positions posting list, for BulkImporter.
+
+    Like similar_residents() in memory: only names sharing enough trigrams
+    are scored, so an address with hundreds of residents stays cheap.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+
+    def add(self, name: str, grams: set):
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(len(self.names))
+        self.names.append(name)
+        self.sizes.append(len(grams))
+
+    def closest(self, grams: set, min_score: float) -> Optional[Tuple[str, float]]:
+        """(name, score) of the best match scoring at least min_score, else None."""
+        if not self.names:
+            return None
+        shared = Counter(chain.from_iterable(self.postings.get(gram, ()) for gram in grams))
+        min_shared = min_score * len(grams) / (1 + min_score)
+        best = None
+        for i, n in shared.items():
+            if n >= min_shared:
+                score = n / (len(grams) + self.sizes[i] - n)
+                if score >= min_score and (best is None or score > best[1]):
+                    best = (self.names[i], score)
+        return best
+
+
+class BulkImporter:
+    """Insert many residents in one transaction, skipping duplicates.
+
+    Usage:
+        with db.BulkImporter() as imp:
+            for street, res in records:
+                imp.add(street, res)
+        imp.new_count, imp.skip_count
+
+    The address and existing-name key maps are loaded once on entry, so each
+    row costs dictionary lookups instead of queries; new residents are written
+    with executemany every `batch_size` rows.  Duplicate detection matches
+    find_or_create_address() and resident_exists(), including rows earlier in
+    the same import.  All work runs inside a savepoint that is rolled back if
+    the block raises, leaving the database as it was.
+
+    With `commit_every` set, the work is committed every that many new
+    residents instead, so other connections wait for one chunk at most; a
+    failure then rolls back only the current chunk, and re-running the import
+    skips what was already committed.  `commit_seconds` also ends a chunk
+    once it has held the write lock (from its first write) that long, however
+    few rows it has.  With `undo_on_error` as well, the
+    committed chunks are deleted again on a failure (or a cancel raised from
+    inside the block): the import keeps nothing, as if it were one transaction.
+
+    With `similar_score` set, a new resident whose name scores at least that
+    against someone already at the same address (name_similarity(), e.g. a
+    typo or the other script) is still imported but listed in `similar` as
+    (resident, existing full name, score) for the user to review.
+
+    The insert trigger on resident_trigrams stands down for the importer's
+    rows (see _m012_trigram_bulk_writes); each chunk's trigrams are written
+    in one statement just before it is committed.
+    """
+
+    def __init__(self, batch_size: int = 1000, commit_every: int = 0,
+                 similar_score: float = 0.0, undo_on_error: bool = False,
+                 commit_seconds: float = 0.0):
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.commit_seconds = commit_seconds
+        self.similar_score = similar_score
+        self.undo_on_error = undo_on_error
+        self._uncommitted = 0
+        self.new_count = 0
+        self.skip_count = 0
+        self.similar: List[tuple] = []
+        self._conn = None
+        self._addresses: Dict[str, int] = {}
+        self._names: set = set()
+        self._housemates: Dict[int, _Housemates] = {}
+        self._pending: List[tuple] = []
+        self._deferred = False  # holding the trigrams_deferred row
+        self._locked_at: Optional[float] = None  # first write of the open chunk
+        # What this import wrote, for undo_on_error: resident id ranges and
+        # new address ids, split into the open chunk and the committed ones.
+        self._chunk_ids: List[Tuple[int, int]] = []
+        self._chunk_addresses: List[int] = []
+        self._committed_ids: List[Tuple[int, int]] = []
+        self._committed_addresses: List[int] = []
+
+    def __enter__(self) -> "BulkImporter":
+        self._conn = get_connection()
+        self._conn.execute("SAVEPOINT bulk_import")
+        # Descending so that, like find_or_create_address(), the lowest id
+        # wins if older data holds two addresses with the same key.
+        self._addresses = {r["street_key"]: r["id"] for r in self._conn.execute(
+            "SELECT id, street_key FROM addresses ORDER BY id DESC")}
+        self._names = {(r["address_id"], r["last_key"], r["first_key"]) for r in self._conn.execute(
+            "SELECT address_id, last_key, first_key FROM residents")}
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._rollback()
+            if self.undo_on_error:
+                self._undo_committed()
+            return False
+        try:
+            self.flush()
+            self._index_trigrams()
+        except BaseException:
+            self._rollback()
+            if self.undo_on_error:
+                self._undo_committed()
+            raise
+        self._conn.execute("RELEASE bulk_import")
+        if self._conn.in_transaction:
+            self._conn.commit()
+        return False
+
+    def _rollback(self):
+        self._pending = []
+        self._deferred = False
+        self._locked_at = None
+        self._chunk_ids = []
+        self._chunk_addresses = []
+        self._conn.execute("ROLLBACK TO bulk_import")
+        self._conn.execute("RELEASE bulk_import")
+
+    def _undo_committed(self):
+        """Delete what earlier chunks committed; addresses only if still empty."""
+        if not (self._committed_ids or self._committed_addresses):
+            return
+        with self._conn:
+            self._conn.executemany("DELETE FROM residents WHERE id BETWEEN ? AND ?",
+                                   self._committed_ids)
+            self._conn.executemany(
+                """DELETE FROM addresses WHERE id = ?
+                   AND NOT EXISTS (SELECT 1 FROM residents WHERE address_id = ?)""",
+                [(a, a) for a in self._committed_addresses])
+        self._committed_ids = []
+        self._committed_addresses = []
+
+    def address_id(self, street: str) -> int:
+        """Id of the address matching street, created (inside the import) if absent."""
+        street = street.strip()
+        key = _fold(street)
+        addr_id = self._addresses.get(key)
+        if addr_id is None:
+            self._writing()
+            addr_id = self._conn.execute(_INSERT_ADDRESS_SQL, _address_values(street)).lastrowid
+            self._addresses[key] = addr_id
+            self._chunk_addresses.append(addr_id)
+            if self.similar_score:
+                self._housemates[addr_id] = _Housemates()  # nobody to read back
+        return addr_id
+
+    def add(self, street: str, res: Resident) -> bool:
+        """Queue res at street; returns False (and counts a skip) for a duplicate."""
+        res.address_id = self.address_id(street)
+        name = (res.address_id, _fold(res.last_name), _fold(res.first_name))
+        if name in self._names:
+            self.skip_count += 1
+            return False
+        self._names.add(name)
+        values = _resident_values(res)
+        if self.similar_score:
+            self._check_similar(res, _trigrams(values[-2]))  # the row's fuzzy_key
+        self._pending.append(values)
+        self.new_count += 1
+        self._uncommitted += 1
+        if (self.commit_every and self._uncommitted >= self.commit_every
+                or self.commit_seconds and self._locked_at is not None
+                and time.monotonic() - self._locked_at >= self.commit_seconds):
+            self.commit()
+        elif len(self._pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def _check_similar(self, res: Resident, grams: set):
+        housemates = self._housemates.get(res.address_id)
+        if housemates is None:
+            # First row for an existing address in the import, so nothing of
+            # ours is queued for it yet: the table holds everyone there.
+            housemates = self._housemates[res.address_id] = _Housemates()
+            for r in self._conn.execute(
+                    "SELECT first_name, last_name, fuzzy_key FROM residents WHERE address_id=?",
+                    (res.address_id,)):
+                housemates.add(f"{r['first_name']} {r['last_name']}", _trigrams(r["fuzzy_key"]))
+        best = housemates.closest(grams, self.similar_score)
+        if best is not None:
+            self.similar.append((res, *best))
+        housemates.add(res.full_name, grams)
+
+    def _index_trigrams(self):
+        """Fill resident_trigrams for this chunk in one statement; re-arm the trigger.
+
+        Per-row trigger firings cost about three times as much as this.
+        """
+        if not self._deferred:
+            return
+        self._conn.execute(
+            "INSERT OR IGNORE INTO resident_trigrams "
+            + _TRIGRAMS_OF.format(r="r", source="residents r, trigram_positions p")
+            + " AND r.id > (SELECT since_id FROM trigrams_deferred)")
+        self._conn.execute("DELETE FROM trigrams_deferred")
+        self._deferred = False
+
+    def commit(self):
+        """Write and commit everything queued so far, then open a new savepoint."""
+        self.flush()
+        self._index_trigrams()
+        self._conn.execute("RELEASE bulk_import")
+        if self._conn.in_transaction:
+            self._conn.commit()
+        self._committed_ids += self._chunk_ids
+        self._committed_addresses += self._chunk_addresses
+        self._chunk_ids = []
+        self._chunk_addresses = []
+        self._conn.execute("SAVEPOINT bulk_import")
+        self._uncommitted = 0
+        self._locked_at = None
+
+    def _writing(self):
+        """Note the open chunk's first write: other writers wait from here on."""
+        if self._locked_at is None:
+            self._locked_at = time.monotonic()
+
+    def flush(self):
+        if self._pending:
+            self._writing()
+            if not self._deferred:
+                # Rows after since_id get their trigrams in _index_trigrams()
+                self._conn.execute("INSERT INTO trigrams_deferred "
+                                   "SELECT COALESCE(MAX(id), 0) FROM residents")
+                self._deferred = True
+            self._conn.executemany(_INSERT_RESIDENT_SQL, self._pending)
+            # One executemany holds the write lock, so its rows get
+            # consecutive ids ending at the last one inserted.
+            last = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self._chunk_ids.append((last - len(self._pending) + 1, last))
+            self._pending = []
+
+
+# ── Search ───────────────────────────────────────────────────────────────────
+
+def _like_pattern(text: str) -> str:
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _search_statement(conn, query: str, limit: int):
+    """(sql, params) for search_residents(), or None for an empty query."""
+    folded = _fold(query)
+    forms = [f for f in dict.fromkeys((normalize_for_search(folded), folded)) if f]
+    if not forms:
+        return None
+    # Phonetic keys find the other spellings in the same single lookup; one
+    # too short for the trigram index is left out rather than forcing LIKE.
+    forms += [k for k in phonetic_keys(folded) if k not in forms and len(k) >= 3]
+    if conn.has_fts is None:
+        conn.has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name='resident_fts'").fetchone() is not None
+    if conn.has_fts and min(len(f) for f in forms) >= 3:
+        match = " OR ".join('"' + f.replace('"', '""') + '"' for f in forms)
+        return (f"""SELECT {_R_COLUMNS}, a.street AS street
+                   FROM resident_fts
+                   JOIN residents r ON r.id = resident_fts.rowid
+                   JOIN addresses a ON a.id = r.address_id
+                   WHERE resident_fts MATCH ?
+                   ORDER BY bm25(resident_fts), r.last_sort, r.first_sort
+                   LIMIT ?""", (match, limit))
+    where = " OR ".join("r.search_text LIKE ? ESCAPE '\\'" for _ in forms)
+    return (f"""SELECT {_R_COLUMNS}, a.street AS street
+                FROM residents r
+                JOIN addresses a ON a.id = r.address_id
+                WHERE {where}
+                ORDER BY r.last_sort, r.first_sort
+                LIMIT ?""", (*(_like_pattern(f) for f in forms), limit))
+
+
+def search_residents(query: str, limit: int = 200) -> List[tuple]:
+    """Find residents whose name, or father/mother/spouse name, contains query.
+
+    Latin and Cyrillic queries both match, and so do other romanisations of
+    a name ("Kowalczuk" finds "Ковальчук"; see transliterate.py).  Returns up
+    to `limit` (Resident, street) pairs, best matches first.  Queries of three
+    or more characters are answered from the resident_fts trigram index;
+    shorter ones fall back to a LIKE over residents.search_text.
+    """
+    with get_connection() as conn:
+        statement = _search_statement(conn, query, limit)
+        if statement is None:
+            return []
+        cur = conn.execute(*statement)
+        return list(map(_row_decoder(cur, Resident, ("street",)), cur.fetchall()))
+
+
+def iter_search_residents(query: str, limit: int = 200,
+                          batch_size: int = 50) -> Iterator[List[tuple]]:
+    """search_residents() delivered in lists of up to `batch_size` pairs.
+
+    Batches are fetched off one open cursor as the caller asks for them, so a
+    caller that stops early (a newer query superseded this one) never reads
+    the rest.
+    """
+    conn = get_connection()
+    statement = _search_statement(conn, query, limit)
+    if statement is None:
+        return
+    cur = conn.execute(*statement)
+    decode = _row_decoder(cur, Resident, ("street",))
+    try:
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield list(map(decode, rows))
+    finally:
+        cur.close()
+
+
+def similar_residents(name: str, limit: int = 10, min_score: float = FUZZY_MIN_SCORE,
+                      address_id: Optional[int] = None) -> List[tuple]:
+    """Residents whose full name is close to `name`, tolerating typos.
+
+    Unlike search_residents() this is not a substring match: "Kovalchyk"
+    finds "Ковальчук", and the words may come in any order.  Returns up to
+    `limit` (Resident, street, score) triples with score >= min_score, best
+    first (see name_similarity()), optionally only those at `address_id`.
+    Candidates come from the resident_trigrams index.
+    """
+    grams = _trigrams(_fuzzy_key(name))
+    if not grams:
+        return []
+    # score = shared / (len(grams) + fuzzy_grams - shared) >= min_score needs
+    # at least this many shared trigrams, whatever the candidate's length.
+    min_shared = min_score * len(grams) / (1 + min_score)
+    at_address = "AND r.address_id = ?" if address_id is not None else ""
+    sql = f"""SELECT {_R_COLUMNS}, a.street AS street,
+                     m.shared * 1.0 / (? + r.fuzzy_grams - m.shared) AS score
+              FROM (SELECT resident_id, COUNT(*) AS shared FROM resident_trigrams
+                    WHERE gram IN ({", ".join("?" * len(grams))})
+                    GROUP BY resident_id HAVING COUNT(*) >= ?) m
+              JOIN residents r ON r.id = m.resident_id
+              JOIN addresses a ON a.id = r.address_id
+              WHERE m.shared * 1.0 / (? + r.fuzzy_grams - m.shared) >= ? {at_address}
+              ORDER BY score DESC, r.last_sort, r.first_sort
+              LIMIT ?"""
+    params = [len(grams), *grams, min_shared, len(grams), min_score]
+    if address_id is not None:
+        params.append(address_id)
+    params.append(limit)
+    with get_connection() as conn:
+        cur = conn.execute(sql, params)
+        return list(map(_row_decoder(cur, Resident, ("street", "score")), cur.fetchall()))
+
+
 # ── Events ───────────────────────────────────────────────────────────────────
 
 def get_events_for_address(address_id: int) -> List[Event]:
     with get_connection() as conn:
-        rows = conn.execute(
+        cur = conn.execute(
             """SELECT e.*, r.first_name || ' ' || r.last_name AS resident_name
                FROM events e
                JOIN residents r ON r.id = e.resident_id
                WHERE r.address_id = ?
                ORDER BY e.event_date DESC, e.id DESC""",
             (address_id,),
-        ).fetchall()
-        return [_row_to_event(r) for r in rows]
+        )
+        return list(map(_row_decoder(cur, Event), cur.fetchall()))
 
 
 def add_event(event: Event) -> Event:
@@ -246,32 +1343,73 @@ def add_event(event: Event) -> Event:
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
-def _row_to_resident(r) -> Resident:
-    keys = r.keys()
-    return Resident(
-        id=r["id"],
-        address_id=r["address_id"],
-        first_name=r["first_name"],
-        last_name=r["last_name"],
-        birth_date=r["birth_date"],
-        baptism_date=r["baptism_date"],
-        marriage_date=r["marriage_date"],
-        death_date=r["death_date"],
-        status=r["status"],
-        father=r["father"] or None if "father" in keys else None,
-        mother=r["mother"] or None if "mother" in keys else None,
-        spouse=r["spouse"] or None if "spouse" in keys else None,
-        notes=r["notes"] or "",
-    )
+# Model columns in constructor order.  Queries select these instead of `*`,
+# so the derived sort and search columns are never fetched.
+_RESIDENT_FIELDS = tuple(f.name for f in fields(Resident))
+_RESIDENT_COLUMNS = ", ".join(_RESIDENT_FIELDS)
+_R_COLUMNS = ", ".join("r." + c for c in _RESIDENT_FIELDS)
 
+_decoders: Dict[tuple, Callable] = {}
 
-def _row_to_event(r) -> Event:
-    return Event(
-        id=r["id"],
-        resident_id=r["resident_id"],
-        event_type=r["event_type"],
-        event_date=r["event_date"],
-        description=r["description"] or "",
-        created_at=r["created_at"] or "",
-        resident_name=r["resident_name"] if "resident_name" in r.keys() else "",
-    )
+
+def _row_decoder(cur: sqlite3.Cursor, model, extra: Tuple[str, ...] = ()) -> Callable:
+    """Switch cur to plain tuple rows and return a function building `model` from one.
+
+    Column positions are looked up by name once per column layout (and
+    cached), so decoding a row is one itemgetter call and the constructor.
+    Model fields the query did not select get their defaults.  With `extra`
+    column names the function returns (model, *extra values) instead.
+    """
+    cur.row_factory = None
+    names = tuple(d[0] for d in cur.description)
+    key = (model, names, extra)
+    decode = _decoders.get(key)
+    if decode is None:
+        decode = _decoders[key] = _build_decoder(model, names, extra)
+    return decode
+
+
+def _field_getter(model, names: Tuple[str, ...]) -> Callable[[tuple], tuple]:
+    """itemgetter returning a row's values in the order of model's fields."""
+    at: Dict[str, int] = {}
+    for i, name in enumerate(names):
+        at.setdefault(name, i)
+    positions = []
+    pad = []
+    for f in fields(model):
+        if f.name in at:
+            positions.append(at[f.name])
+        else:
+            positions.append(len(names) + len(pad))
+            pad.append(None if f.default is MISSING else f.default)
+    get = itemgetter(*positions)
+    if not pad:
+        return get
+    padding = tuple(pad)
+    return lambda row: get(row + padding)
+
+
+def _build_decoder(model, names: Tuple[str, ...], extra: Tuple[str, ...]) -> Callable:
+    get = _field_getter(model, names)
+    if model is Resident:
+        def decode(row):
+            (id_, address_id, first, last, birth, baptism, marriage, death,
+             status, father, mother, spouse, notes) = get(row)
+            return Resident(id_, address_id, first, last, birth, baptism, marriage,
+                            death, status, father or None, mother or None,
+                            spouse or None, notes or "")
+    elif model is Event:
+        def decode(row):
+            id_, resident_id, kind, date, description, created_at, resident_name = get(row)
+            return Event(id_, resident_id, kind, date, description or "",
+                         created_at or "", resident_name or "")
+    else:
+        raise TypeError(f"no row decoder for {model.__name__}")
+    if not extra:
+        return decode
+    at = [names.index(name) for name in extra]
+    if len(at) == 1:
+        i = at[0]
+        return lambda row: (decode(row), row[i])
+    get_extra = itemgetter(*at)
+    return lambda row: (decode(row), *get_extra(row))
@@ -1,10 +1,13 @@
 import csv
-from typing import List, Tuple
+import os
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 from models import Resident
 import lang
 
-_ADDRESS_CACHE: dict = {}
-
 
 def _headers() -> list:
     return [
@@ -20,26 +23,75 @@ def _headers() -> list:
     ]
 
 
-def _get_address_street(address_id: int) -> str:
-    if address_id not in _ADDRESS_CACHE:
-        import database as db
-        for a in db.get_addresses():
-            _ADDRESS_CACHE[a.id] = a.street
-    return _ADDRESS_CACHE.get(address_id, "")
+ADDRESS_CACHE_SIZE = 10000
+
+
+class AddressResolver:
+    """Map address ids to streets for the duration of one export.
+
+    The first lookup loads up to `max_size` streets in a single query.  If
+    that was the whole table, unknown ids are answered as "" without going
+    back to the database.  Otherwise ids outside the loaded set are fetched
+    one by one and kept in an LRU of at most `max_size` entries; ids with no
+    address are cached as "" as well, so each id costs at most one query.
+    `misses` counts lookups that found no address.
+    """
+
+    def __init__(self, max_size: int = ADDRESS_CACHE_SIZE):
+        self.max_size = max_size
+        self._streets: "OrderedDict[int, str]" = OrderedDict()
+        self._complete: Optional[bool] = None  # None until the first lookup
+        self.lookups = 0
+        self.loads = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def street(self, address_id: int) -> str:
+        self.lookups += 1
+        streets = self._streets
+        if self._complete is None:
+            import database as db
+            streets.update(db.get_address_streets(self.max_size))
+            self.loads += 1
+            self._complete = len(streets) < self.max_size
+        street = streets.get(address_id)
+        if street is not None:
+            if not self._complete:
+                streets.move_to_end(address_id)
+        elif self._complete:
+            street = ""
+        else:
+            import database as db
+            street = db.get_address_street(address_id) or ""
+            self.loads += 1
+            streets[address_id] = street
+            if len(streets) > self.max_size:
+                streets.popitem(last=False)
+                self.evictions += 1
+        if not street:
+            self.misses += 1
+        return street
+
+    def stats(self) -> dict:
+        """Return lookups/loads/misses/evictions/size counters."""
+        return {"lookups": self.lookups, "loads": self.loads, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self._streets)}
+
+
+def _status_label(status: str) -> str:
+    if status == "deceased":
+        return lang.get("status_deceased")
+    if status == "left":
+        return lang.get("status_left")
+    return lang.get("status_active")
 
 
-def _resident_row(r: Resident) -> list:
-    if r.status == "deceased":
-        status = lang.get("status_deceased")
-    elif r.status == "left":
-        status = lang.get("status_left")
-    else:
-        status = lang.get("status_active")
+def _resident_row(r: Resident, addresses: AddressResolver) -> list:
     return [
         r.last_name,
         r.first_name,
-        _get_address_street(r.address_id),
-        status,
+        addresses.street(r.address_id),
+        _status_label(r.status),
         r.birth_date    or "",
         r.baptism_date  or "",
         r.marriage_date or "",
@@ -48,52 +100,172 @@ def _resident_row(r: Resident) -> list:
     ]
 
 
-def export_csv(path: str, residents: List[Resident]):
-    _ADDRESS_CACHE.clear()
+def export_csv(path: str, residents: Iterable[Resident],
+               addresses: Optional[AddressResolver] = None) -> int:
+    """Write residents in the order given and return how many were written.
+
+    `residents` may be a list or a lazy iterator such as db.iter_residents(),
+    which already yields them in Ukrainian alphabetical order.  Streets are
+    resolved through `addresses` (a fresh AddressResolver by default).
+    """
+    addresses = addresses or AddressResolver()
+    count = 0
     with open(path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(_headers())
-        for r in sorted(residents, key=lambda x: (x.last_name, x.first_name)):
-            writer.writerow(_resident_row(r))
+        for r in residents:
+            writer.writerow(_resident_row(r, addresses))
+            count += 1
+    return count
+
+
+# progress(done, total) callback; total is None when it is not known up front.
+Progress = Optional[Callable[[int, Optional[int]], None]]
+
+PROGRESS_EVERY = 500
+
+
+def _reporting(rows: Iterable, progress: Progress, total: Optional[int] = None) -> Iterator:
+    """Pass rows through, calling progress every PROGRESS_EVERY rows and at the end."""
+    if progress is None:
+        yield from rows
+        return
+    done = 0
+    progress(done, total)
+    for row in rows:
+        yield row
+        done += 1
+        if done % PROGRESS_EVERY == 0:
+            progress(done, total)
+    progress(done, total)
+
+
+@contextmanager
+def _replaced_on_success(path: str):
+    """Yield a temp path next to `path`; move it onto `path` only if the block succeeds.
+
+    A failed or cancelled export deletes just the temp file, so an earlier
+    export already at `path` is left untouched.
+    """
+    folder, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=f".{name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _db_rows(progress: Progress = None) -> Iterator[tuple]:
+    """Export rows straight off db.iter_export_rows(), status labels localised."""
+    import database as db
+    labels = {s: _status_label(s) for s in ("active", "deceased", "left")}
+    active = labels["active"]
+    rows = db.iter_export_rows()
+    if progress is not None:
+        rows = _reporting(rows, progress, db.count_residents())
+    for last, first, street, status, dob, bapt, marr, death, notes in rows:
+        yield (last, first, street, labels.get(status, active),
+               dob or "", bapt or "", marr or "", death or "", notes or "")
 
 
-def export_excel(path: str, residents: List[Resident]):
+def export_csv_from_db(path: str, progress: Progress = None) -> int:
+    """Stream the whole register from the database to CSV; returns the row count.
+
+    Rows come straight off one ordered residents/addresses join
+    (db.iter_export_rows) and are written as the cursor yields them, so
+    memory stays flat however large the register is.  Rows go to a temp file
+    that replaces `path` once complete; if writing fails or `progress` cancels
+    the export, only the temp file is removed and `path` is left as it was.
+    """
+    count = 0
+    with _replaced_on_success(path) as tmp:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(_headers())
+            for row in _db_rows(progress):
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def _openpyxl():
     try:
         import openpyxl
-        from openpyxl.styles import Font, PatternFill, Alignment
     except ImportError:
         raise RuntimeError(
             "openpyxl is not installed.\n"
             "Run: pip install openpyxl\n"
             "Then try again."
         )
+    return openpyxl
+
 
-    _ADDRESS_CACHE.clear()
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = lang.get("export_col_address") if lang.current() == "uk" else "Residents"
+EXCEL_WIDTH_SAMPLE = 1000
+_HEADER_STYLE = "export_header"
 
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill("solid", fgColor="4472C4")
-    center = Alignment(horizontal="center")
 
-    for col, header in enumerate(_headers(), start=1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = center
+def _write_xlsx(path: str, rows: Iterable[Sequence]) -> int:
+    """Stream rows into a write-only workbook under one styled header row.
 
-    for row_idx, r in enumerate(
-        sorted(residents, key=lambda x: (x.last_name, x.first_name)), start=2
-    ):
-        for col_idx, value in enumerate(_resident_row(r), start=1):
-            ws.cell(row=row_idx, column=col_idx, value=value)
+    Column widths must be fixed before the first row is written, so the first
+    EXCEL_WIDTH_SAMPLE rows are held back and measured as they arrive; every
+    later row goes straight to disk.  Returns the number of data rows.
+    """
+    openpyxl = _openpyxl()
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
 
-    for col in ws.columns:
-        max_len = max((len(str(cell.value or "")) for cell in col), default=0)
-        ws.column_dimensions[col[0].column_letter].width = min(max_len + 4, 40)
+    wb = openpyxl.Workbook(write_only=True)
+    wb.add_named_style(NamedStyle(
+        name=_HEADER_STYLE,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill("solid", fgColor="4472C4"),
+        alignment=Alignment(horizontal="center"),
+    ))
+    ws = wb.create_sheet(lang.get("export_col_address") if lang.current() == "uk" else "Residents")
 
+    headers = _headers()
+    widths = [len(h) for h in headers]
+    rows = iter(rows)
+    head = list(islice(rows, EXCEL_WIDTH_SAMPLE))
+    for row in head:
+        for i, value in enumerate(row):
+            if value and len(value) > widths[i]:
+                widths[i] = len(value)
+    for i, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = min(width + 4, 40)
+
+    header_row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = _HEADER_STYLE
+        header_row.append(cell)
+    ws.append(header_row)
+
+    count = 0
+    for row in chain(head, rows):
+        ws.append([value or None for value in row])  # None cells are not written at all
+        count += 1
     wb.save(path)
+    return count
+
+
+def export_excel(path: str, residents: Iterable[Resident],
+                 addresses: Optional[AddressResolver] = None) -> int:
+    """Write residents to .xlsx in the order given; returns the row count."""
+    addresses = addresses or AddressResolver()
+    return _write_xlsx(path, (_resident_row(r, addresses) for r in residents))
+
+
+def export_excel_from_db(path: str, progress: Progress = None) -> int:
+    """Stream the whole register from the database to .xlsx; returns the row count."""
+    with _replaced_on_success(path) as tmp:
+        return _write_xlsx(tmp, _db_rows(progress))
 
 
 # ── Import ────────────────────────────────────────────────────────────────────
@@ -114,10 +286,26 @@ def _date_or_none(row, idx: int):
     return v if v else None
 
 
-def _import_rows(rows) -> Tuple[int, int]:
-    """Insert rows from a parsed file (iterable of sequences). Returns (new, skipped)."""
-    import database as db
-    new_count = skip_count = 0
+# Rows committed per chunk by the file importers.  Not above BulkImporter's
+# batch_size, so a chunk is written by one executemany just before its commit
+# and rows are parsed while other connections can write: under 0.1 s of
+# write lock per chunk, where 5000-row chunks held it for over a second.
+IMPORT_COMMIT_EVERY = 500
+
+# A chunk is also committed once it has held the write lock this long (new
+# addresses are written as they are met), so an edit saved in the window
+# while an import runs waits about this long at most.
+IMPORT_COMMIT_SECONDS = 0.1
+
+# With on_similar, imported names at least this close (db.name_similarity())
+# to someone already at the same address are reported: typos, the other script.
+IMPORT_SIMILAR_SCORE = 0.6
+
+SimilarNames = Optional[Callable[[list], None]]
+
+
+def _parse_rows(rows) -> Iterator[Tuple[str, Resident]]:
+    """Lazily normalize and validate raw rows into (street, Resident) pairs."""
     for row in rows:
         last   = _cell(row, 0)
         first  = _cell(row, 1)
@@ -130,44 +318,110 @@ def _import_rows(rows) -> Tuple[int, int]:
         marriage = _date_or_none(row, 6)
         death    = _date_or_none(row, 7)
         notes    = _cell(row, 8)
+        yield street, Resident(
+            id=None, address_id=0,
+            first_name=first, last_name=last,
+            birth_date=dob, baptism_date=baptism,
+            marriage_date=marriage, death_date=death,
+            status=status, notes=notes,
+        )
 
-        addr_id = db.find_or_create_address(street)
-        if db.resident_exists(addr_id, first, last):
-            skip_count += 1
-        else:
-            db.add_resident(Resident(
-                id=None, address_id=addr_id,
-                first_name=first, last_name=last,
-                birth_date=dob, baptism_date=baptism,
-                marriage_date=marriage, death_date=death,
-                status=status, notes=notes,
-            ))
-            new_count += 1
-    return new_count, skip_count
-
-
-def import_csv(path: str) -> Tuple[int, int]:
-    """Import residents from a CSV file. Returns (new, skipped)."""
-    with open(path, "r", encoding="utf-8-sig") as f:
+
+def _import_rows(rows, commit_every: int = 0, progress: Progress = None,
+                 total: Optional[int] = None, undo_on_error: bool = False,
+                 on_similar: SimilarNames = None,
+                 commit_seconds: float = 0.0) -> Tuple[int, int]:
+    """Insert rows from a parsed file (iterable of sequences). Returns (new, skipped).
+
+    Rows are pulled one at a time and written in batches by db.BulkImporter.
+    With commit_every=0 everything is one transaction and nothing is written
+    if any row fails; otherwise each chunk of that many new residents is
+    committed as it completes, or sooner once it has held the write lock
+    for commit_seconds.  `progress` is told how many file rows have
+    been read; if it raises (e.g. tasks.Cancelled) the open chunk rolls back,
+    and with undo_on_error the committed chunks are deleted as well.
+
+    If `on_similar` is given, new residents whose name scores at least
+    IMPORT_SIMILAR_SCORE against someone at their address are passed to it
+    once the import has succeeded, as a list of (resident, existing full
+    name, score); without it no similarity check runs.
+    """
+    import database as db
+    with db.BulkImporter(commit_every=commit_every, commit_seconds=commit_seconds,
+                         undo_on_error=undo_on_error,
+                         similar_score=IMPORT_SIMILAR_SCORE if on_similar else 0.0) as importer:
+        for street, res in _parse_rows(_reporting(rows, progress, total)):
+            importer.add(street, res)
+    if on_similar:
+        on_similar(importer.similar)
+    return importer.new_count, importer.skip_count
+
+
+def import_csv(path: str, commit_every: int = IMPORT_COMMIT_EVERY,
+               progress: Progress = None, undo_on_error: bool = True,
+               on_similar: SimilarNames = None,
+               commit_seconds: float = IMPORT_COMMIT_SECONDS) -> Tuple[int, int]:
+    """Import residents from a CSV file. Returns (new, skipped).
+
+    The file is streamed straight from the csv reader, so memory use does not
+    grow with file size.  It is committed in chunks, but by default a failed
+    or cancelled import deletes the chunks it already committed.
+    `on_similar` is told about near-duplicate names as in _import_rows().
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
         reader = csv.reader(f)
         next(reader, None)  # skip header row
-        rows = list(reader)
-    return _import_rows(rows)
+        return _import_rows(reader, commit_every=commit_every, progress=progress,
+                            undo_on_error=undo_on_error, on_similar=on_similar,
+                            commit_seconds=commit_seconds)
+
 
+def _sheet_rows(ws) -> Iterator[list]:
+    """Data rows of a read-only worksheet (header skipped), empty cells as ""."""
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        yield ["" if c is None else c for c in row]
 
-def import_excel(path: str) -> Tuple[int, int]:
-    """Import residents from an Excel (.xlsx) file. Returns (new, skipped)."""
+
+def excel_sheet_names(path: str) -> List[str]:
+    """Names of the worksheets in an .xlsx file, in workbook order."""
+    wb = _openpyxl().load_workbook(path, read_only=True)
     try:
-        import openpyxl
-    except ImportError:
-        raise RuntimeError(
-            "openpyxl is not installed.\n"
-            "Run: pip install openpyxl\n"
-            "Then try again."
-        )
-    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-    ws = wb.active
-    rows_iter = ws.iter_rows(min_row=2, values_only=True)  # skip header row
-    rows = [[str(c) if c is not None else "" for c in row] for row in rows_iter]
-    wb.close()
-    return _import_rows(rows)
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def import_excel(path: str, sheets: Optional[Iterable[str]] = None,
+                 all_sheets: bool = False,
+                 commit_every: int = IMPORT_COMMIT_EVERY,
+                 progress: Progress = None, undo_on_error: bool = True,
+                 on_similar: SimilarNames = None,
+                 commit_seconds: float = IMPORT_COMMIT_SECONDS) -> Tuple[int, int]:
+    """Import residents from an Excel (.xlsx) file. Returns (new, skipped).
+
+    Reads the active sheet by default, the named `sheets`, or every sheet
+    with all_sheets=True (archive workbooks often keep one street per sheet);
+    each sheet's first row is taken as its header.  Rows stream from
+    openpyxl's read-only iterator straight into the batched importer, which
+    commits, undoes and reports similar names as in import_csv().
+    """
+    wb = _openpyxl().load_workbook(path, read_only=True, data_only=True)
+    try:
+        if all_sheets:
+            worksheets = list(wb.worksheets)
+        elif sheets is not None:
+            sheets = list(sheets)
+            missing = [name for name in sheets if name not in wb.sheetnames]
+            if missing:
+                raise ValueError(f"Worksheet not found: {', '.join(missing)}")
+            worksheets = [wb[name] for name in sheets]
+        else:
+            worksheets = [wb.active]
+        rows = chain.from_iterable(_sheet_rows(ws) for ws in worksheets)
+        sizes = [ws.max_row for ws in worksheets]
+        total = sum(max(n - 1, 0) for n in sizes) if None not in sizes else None
+        return _import_rows(rows, commit_every=commit_every, progress=progress, total=total,
+                            undo_on_error=undo_on_error, on_similar=on_similar,
+                            commit_seconds=commit_seconds)
+    finally:
+        wb.close()
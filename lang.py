@@ -37,6 +37,14 @@ _STRINGS = {
                              "uk": "Перегляд: {street}  •  {count} активних мешканців"},
     "status_exported":      {"en": "Exported {count} residents to {file}",
                              "uk": "Експортовано {count} мешканців у {file}"},
+    "task_progress":        {"en": "Working… {done} rows",
+                             "uk": "Обробка… {done} рядків"},
+    "task_progress_total":  {"en": "Working… {done} of {total} rows",
+                             "uk": "Обробка… {done} з {total} рядків"},
+    "task_finished":        {"en": "{message}  •  {rate} rows/s",
+                             "uk": "{message}  •  {rate} рядків/с"},
+    "task_cancelled":       {"en": "Cancelled. No changes were kept.",
+                             "uk": "Скасовано. Жодних змін не збережено."},
 
     # ── Address panel ────────────────────────────────────────────────────────
     "addresses_header":     {"en": "ADDRESSES",          "uk": "АДРЕСИ"},
@@ -168,6 +176,14 @@ _STRINGS = {
     "import_success":       {"en": "Imported {new} resident(s) from {file}, skipped {skip} duplicate(s).",
                              "uk": "Імпортовано {new} ос. з {file}, пропущено {skip} дублів."},
     "import_failed":        {"en": "Import failed",     "uk": "Помилка імпорту"},
+    "import_similar_title": {"en": "Check possible duplicates", "uk": "Перевірте можливі дублікати"},
+    "import_similar":       {"en": "{count} imported name(s) look like someone already at the same address:\n\n{names}",
+                             "uk": "Імпортовані імена ({count}) схожі на когось за тією ж адресою:\n\n{names}"},
+    "import_similar_more":  {"en": "…and {count} more", "uk": "…і ще {count}"},
+    "import_all_sheets":    {"en": "This workbook has {count} sheets. Import all of them?\n\n"
+                                   "Choose No to import only the active sheet.",
+                             "uk": "У цій книзі {count} аркушів. Імпортувати всі?\n\n"
+                                   "Оберіть «Ні», щоб імпортувати лише активний аркуш."},
 
     # ── About ────────────────────────────────────────────────────────────────
     "about_title":          {"en": "About",             "uk": "Про програму"},
@@ -14,6 +14,8 @@ from ui.address_list import AddressListPanel
 from ui.resident_view import ResidentViewPanel
 from ui.dialogs import LanguageDialog
 import export as exp
+import completion
+from tasks import TaskRunner
 
 
 class MainWindow(tk.Tk):
@@ -164,11 +166,18 @@ class MainWindow(tk.Tk):
 
         self.after(100, lambda: paned.sash_place(0, 270, 0))
 
+        status = ttk.Frame(self, relief="sunken")
+        status.pack(side="bottom", fill="x")
         self._status_var = tk.StringVar(value=lang.get("ready"))
         ttk.Label(
-            self, textvariable=self._status_var,
-            relief="sunken", anchor="w", padding=(6, 2)
-        ).pack(side="bottom", fill="x")
+            status, textvariable=self._status_var,
+            anchor="w", padding=(6, 2)
+        ).pack(side="left", fill="x", expand=True)
+        # Shown only while a background export/import runs
+        self._cancel_btn = ttk.Button(status, text=lang.get("cancel"),
+                                      command=lambda: self._tasks.cancel())
+        self._progress = ttk.Progressbar(status, length=180)
+        self._tasks = TaskRunner(self, on_progress=self._on_task_progress)
 
     def _on_address_selected(self, address):
         self._res_panel.load_address(address)
@@ -179,6 +188,55 @@ class MainWindow(tk.Tk):
         else:
             self._status_var.set(lang.get("ready"))
 
+    # ── Background tasks ─────────────────────────────────────────────────────
+
+    def _run_task(self, job, success_message, error_title: str, refresh: bool = False):
+        """Run job(progress) in the background with the status-bar progress UI.
+
+        success_message(value) builds the status text from the job's return
+        value; refresh reloads the address list afterwards (also after a
+        cancel or failure, which may have undone committed import chunks).
+        """
+        def done(result):
+            self._progress.stop()
+            self._progress.pack_forget()
+            self._cancel_btn.pack_forget()
+            if refresh:
+                completion.invalidate()
+                self._addr_panel.refresh()
+            if result.error is not None:
+                self._status_var.set(lang.get("ready"))
+                messagebox.showerror(error_title, str(result.error), parent=self)
+            elif result.cancelled:
+                self._status_var.set(lang.get("task_cancelled"))
+            else:
+                self._status_var.set(lang.get("task_finished",
+                                              message=success_message(result.value),
+                                              rate=result.rate))
+
+        if not self._tasks.start(job, done):
+            self.bell()
+            return
+        self._progress.configure(mode="indeterminate", value=0)
+        self._progress.start(15)
+        self._cancel_btn.pack(side="right", padx=(0, 4), pady=1)
+        self._progress.pack(side="right", padx=4, pady=1)
+        self._status_var.set(lang.get("task_progress", done=0))
+
+    def _on_task_progress(self, done: int, total):
+        if total:
+            if str(self._progress.cget("mode")) != "determinate":
+                self._progress.stop()
+                self._progress.configure(mode="determinate", maximum=total)
+            self._progress.configure(value=min(done, total))
+            self._status_var.set(lang.get("task_progress_total", done=done, total=total))
+        else:
+            self._status_var.set(lang.get("task_progress", done=done))
+
+    def cancel_tasks(self, wait: float = 5):
+        """Stop a running export/import (used on exit)."""
+        self._tasks.cancel(wait)
+
     # ── Export ───────────────────────────────────────────────────────────────
 
     def _export_csv(self):
@@ -195,14 +253,12 @@ class MainWindow(tk.Tk):
         )
         if not path:
             return
-        try:
-            residents = db.get_all_residents()
-            exp.export_csv(path, residents)
-            self._status_var.set(lang.get("status_exported",
-                                          count=len(residents),
-                                          file=os.path.basename(path)))
-        except Exception as e:
-            messagebox.showerror(lang.get("export_failed"), str(e), parent=self)
+        self._run_task(
+            lambda progress: exp.export_csv_from_db(path, progress=progress),
+            lambda count: lang.get("status_exported", count=count,
+                                   file=os.path.basename(path)),
+            lang.get("export_failed"),
+        )
 
     def _export_excel(self):
         reports_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "xlsx-reports")
@@ -218,14 +274,12 @@ class MainWindow(tk.Tk):
         )
         if not path:
             return
-        try:
-            residents = db.get_all_residents()
-            exp.export_excel(path, residents)
-            self._status_var.set(lang.get("status_exported",
-                                          count=len(residents),
-                                          file=os.path.basename(path)))
-        except Exception as e:
-            messagebox.showerror(lang.get("export_failed"), str(e), parent=self)
+        self._run_task(
+            lambda progress: exp.export_excel_from_db(path, progress=progress),
+            lambda count: lang.get("status_exported", count=count,
+                                   file=os.path.basename(path)),
+            lang.get("export_failed"),
+        )
 
     def _import_csv(self):
         path = filedialog.askopenfilename(
@@ -234,14 +288,13 @@ class MainWindow(tk.Tk):
         )
         if not path:
             return
-        try:
-            new, skip = exp.import_csv(path)
-            self._addr_panel.refresh()
-            self._status_var.set(lang.get("import_success",
-                                          new=new, skip=skip,
-                                          file=os.path.basename(path)))
-        except Exception as e:
-            messagebox.showerror(lang.get("import_failed"), str(e), parent=self)
+        similar = []
+        self._run_task(
+            lambda progress: exp.import_csv(path, progress=progress, on_similar=similar.extend),
+            lambda counts: self._import_done(path, counts, similar),
+            lang.get("import_failed"),
+            refresh=True,
+        )
 
     def _import_excel(self):
         path = filedialog.askopenfilename(
@@ -251,13 +304,39 @@ class MainWindow(tk.Tk):
         if not path:
             return
         try:
-            new, skip = exp.import_excel(path)
-            self._addr_panel.refresh()
-            self._status_var.set(lang.get("import_success",
-                                          new=new, skip=skip,
-                                          file=os.path.basename(path)))
+            sheet_count = len(exp.excel_sheet_names(path))
         except Exception as e:
             messagebox.showerror(lang.get("import_failed"), str(e), parent=self)
+            return
+        all_sheets = False
+        if sheet_count > 1:
+            all_sheets = messagebox.askyesno(
+                lang.get("menu_import_excel").rstrip("…"),
+                lang.get("import_all_sheets", count=sheet_count),
+                parent=self,
+            )
+        similar = []
+        self._run_task(
+            lambda progress: exp.import_excel(path, all_sheets=all_sheets, progress=progress,
+                                              on_similar=similar.extend),
+            lambda counts: self._import_done(path, counts, similar),
+            lang.get("import_failed"),
+            refresh=True,
+        )
+
+    def _import_done(self, path: str, counts, similar: list) -> str:
+        """Status text for a finished import; lists names to double-check, if any."""
+        if similar:
+            lines = [f"{res.full_name} ≈ {existing}" for res, existing, _score in similar[:20]]
+            if len(similar) > 20:
+                lines.append(lang.get("import_similar_more", count=len(similar) - 20))
+            self.after_idle(lambda: messagebox.showwarning(
+                lang.get("import_similar_title"),
+                lang.get("import_similar", count=len(similar), names="\n".join(lines)),
+                parent=self,
+            ))
+        return lang.get("import_success", new=counts[0], skip=counts[1],
+                        file=os.path.basename(path))
 
     # ── Settings ─────────────────────────────────────────────────────────────
 
@@ -280,3 +359,5 @@ class MainWindow(tk.Tk):
 if __name__ == "__main__":
     app = MainWindow()
     app.mainloop()
+    app.cancel_tasks()
+    db.close_connections()
@@ -1,15 +1,32 @@
-from dataclasses import dataclass, field
+"""Dataclasses passed between the database layer and the UI.
+
+Each class is rebuilt with __slots__ by _slotted(), so an instance stores
+its fields in fixed slots instead of a per-instance __dict__; exports and
+global search create one per row.  Only the declared fields can be set.
+"""
+from dataclasses import dataclass, field, fields
 from typing import Optional
 
 
+def _slotted(cls):
+    """Recreate dataclass `cls` with __slots__ (dataclass(slots=True) needs Python 3.10)."""
+    names = tuple(f.name for f in fields(cls))
+    body = {k: v for k, v in cls.__dict__.items()
+            if k not in names and k not in ("__dict__", "__weakref__")}
+    body["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, body)
+
+
+@_slotted
 @dataclass
 class Address:
     id: Optional[int]
     street: str
     notes: str = ""
-    active_count: int = 0  # populated by DB query, not stored
+    active_count: int = 0  # read from the trigger-maintained addresses column
 
 
+@_slotted
 @dataclass
 class Resident:
     id: Optional[int]
@@ -39,6 +56,7 @@ class Resident:
         return self.marriage_date is not None or bool(self.spouse)
 
 
+@_slotted
 @dataclass
 class Event:
     id: Optional[int]
@@ -0,0 +1,243 @@
+"""Run database work off the Tk thread.
+
+TaskRunner handles long export/import jobs.  A job is a callable taking one
+argument, `progress(done, total=None)`, which it calls every so often from
+the worker thread.  Progress travels back through a queue that the Tk loop
+drains with after(), so widgets are only ever touched from the Tk thread.
+cancel() makes the next progress() call raise Cancelled inside the job,
+unwinding it through its own context managers (BulkImporter rolls back,
+exports remove their partial file).  Either way the worker then checkpoints
+the write-ahead log, so church.db alone holds what the job committed.
+
+LatestRunner handles search-as-you-type: each new query supersedes the last.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import database as db
+
+POLL_MS = 100
+
+
+class Cancelled(Exception):
+    """Raised inside a job by progress()/emit() once it was cancelled or superseded."""
+
+
+@dataclass
+class TaskResult:
+    value: object = None
+    error: Optional[Exception] = None
+    cancelled: bool = False
+    rows: int = 0          # last `done` the job reported
+    elapsed: float = 0.0   # seconds
+
+    @property
+    def rate(self) -> int:
+        """Rows per second over the whole job."""
+        return int(self.rows / self.elapsed) if self.elapsed > 0 else self.rows
+
+
+class TaskRunner:
+    """Run one job at a time in a worker thread and report back on the Tk loop.
+
+    `widget` supplies after(); `on_progress(done, total)` is called with the
+    latest figures at most once per poll.  The worker borrows a pooled
+    database connection for the duration of the job.
+    """
+
+    def __init__(self, widget, on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                 poll_ms: int = POLL_MS):
+        self._widget = widget
+        self._on_progress = on_progress
+        self._poll_ms = poll_ms
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._on_done: Optional[Callable[[TaskResult], None]] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None
+
+    def start(self, job: Callable[[Callable], object],
+              on_done: Callable[[TaskResult], None]) -> bool:
+        """Start job unless one is already running; returns whether it started."""
+        if self.busy:
+            return False
+        self._cancel = threading.Event()
+        self._queue = queue.Queue()
+        self._on_done = on_done
+        self._thread = threading.Thread(target=self._run, name="task",
+                                        args=(job, self._cancel, self._queue), daemon=True)
+        self._thread.start()
+        self._widget.after(self._poll_ms, self._poll)
+        return True
+
+    def cancel(self, wait: float = 0):
+        """Ask the running job to stop; optionally wait up to `wait` seconds for it."""
+        self._cancel.set()
+        thread = self._thread
+        if wait and thread is not None:
+            thread.join(wait)
+
+    @staticmethod
+    def _run(job, cancel: threading.Event, out: queue.Queue):
+        result = TaskResult()
+
+        def progress(done: int, total: Optional[int] = None):
+            result.rows = done
+            if cancel.is_set():
+                raise Cancelled()
+            out.put(("progress", done, total))
+
+        start = time.perf_counter()
+        try:
+            with db.pooled_connection():
+                try:
+                    result.value = job(progress)
+                finally:
+                    db.checkpoint()
+        except Cancelled:
+            result.cancelled = True
+        except Exception as e:
+            result.error = e
+        result.elapsed = time.perf_counter() - start
+        out.put(("done", result))
+
+    def _poll(self):
+        latest = None
+        while True:
+            try:
+                msg = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == "done":
+                self._thread.join()
+                self._thread = None
+                on_done, self._on_done = self._on_done, None
+                on_done(msg[1])
+                return
+            latest = msg
+        if latest is not None and self._on_progress is not None:
+            self._on_progress(latest[1], latest[2])
+        self._widget.after(self._poll_ms, self._poll)
+
+
+class LatestRunner:
+    """Run only the newest of a stream of jobs on one worker thread (search-as-you-type).
+
+    submit() supersedes whatever is queued or running: the running job's
+    SQLite statement is interrupted, its next emit() raises Cancelled, and
+    nothing it produced is delivered any more.  A job is `job(emit)` and
+    hands results over in batches with emit(items); on the Tk thread
+    on_batch(items, first) receives them in order, then on_done(TaskResult)
+    with `rows` = items delivered and `error` if the job failed.
+    """
+
+    def __init__(self, widget, poll_ms: int = POLL_MS):
+        self._widget = widget
+        self._poll_ms = poll_ms
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Shared with the worker, guarded by _lock
+        self._generation = 0
+        self._pending: Optional[tuple] = None
+        self._conn = None
+        # Tk thread only
+        self._current: Optional[list] = None   # [generation, on_batch, on_done, rows]
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    def submit(self, job: Callable[[Callable], object],
+               on_batch: Callable[[list, bool], None],
+               on_done: Optional[Callable[[TaskResult], None]] = None):
+        with self._lock:
+            self._generation += 1
+            self._pending = (self._generation, job)
+            self._interrupt()
+            self._current = [self._generation, on_batch, on_done, 0]
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, name="latest", daemon=True)
+            self._thread.start()
+        self._wake.set()
+        if not self._polling:
+            self._polling = True
+            self._widget.after(self._poll_ms, self._poll)
+
+    def cancel(self):
+        """Drop the queued/running job; nothing more is delivered for it."""
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+            self._interrupt()
+        self._current = None
+
+    def _interrupt(self):
+        # Called with _lock held, so the worker cannot move on to the next
+        # job's statements in between.
+        if self._conn is not None:
+            self._conn.interrupt()
+
+    def _work(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                self._wake.clear()
+                item, self._pending = self._pending, None
+            if item is not None:
+                self._run(*item)
+
+    def _run(self, generation: int, job):
+        def emit(items):
+            if generation != self._generation:
+                raise Cancelled()
+            self._queue.put((generation, list(items)))
+
+        error = None
+        try:
+            with db.pooled_connection() as conn:
+                with self._lock:
+                    if generation != self._generation:
+                        return
+                    self._conn = conn
+                try:
+                    job(emit)
+                finally:
+                    with self._lock:
+                        self._conn = None
+        except Cancelled:
+            return
+        except Exception as e:
+            if generation != self._generation:
+                return  # interrupted because it was superseded
+            error = e
+        self._queue.put((generation, error))
+
+    def _poll(self):
+        while True:
+            try:
+                generation, item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            current = self._current
+            if current is None or generation != current[0]:
+                continue  # superseded
+            if isinstance(item, list):
+                current[1](item, current[3] == 0)
+                current[3] += len(item)
+            else:
+                self._current = None
+                if current[2] is not None:
+                    current[2](TaskResult(error=item, rows=current[3]))
+        if self._current is None and self._queue.empty():
+            self._polling = False
+            return
+        self._widget.after(self._poll_ms, self._poll)
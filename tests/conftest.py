@@ -9,6 +9,11 @@ import pytest
 from unittest.mock import patch
 
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: wall-clock comparison; deselect with -m 'not benchmark'")
+
+
 @pytest.fixture
 def temp_db(tmp_path):
     """Provide a fresh, isolated SQLite database for each test."""
@@ -0,0 +1,64 @@
+"""Tests for ui/address_list.py — filter helpers (no Tk display needed)."""
+import random
+
+import pytest
+
+from ui.address_list import _listbox_edits, _matching
+
+
+def _apply(rows, edits, labels):
+    """Replay _listbox_edits on a plain list the way the panel replays them on a Listbox."""
+    rows = list(rows)
+    for pos, deleted, inserted in edits:
+        del rows[pos:pos + deleted]
+        rows[pos:pos] = [labels[i] for i in inserted]
+    return rows
+
+
+class TestMatching:
+    KEYS = ["shevchenka 1", "franka 2", "shevchenka 10", "lesi ukrainky 3"]
+
+    def test_empty_query_keeps_all_candidates(self):
+        assert _matching(self.KEYS, range(4), "") == [0, 1, 2, 3]
+
+    def test_substring(self):
+        assert _matching(self.KEYS, range(4), "shev") == [0, 2]
+
+    def test_only_candidates_are_checked(self):
+        assert _matching(self.KEYS, [2, 3], "shev") == [2]
+
+
+class TestListboxEdits:
+    LABELS = [f"row {i}" for i in range(20)]
+
+    @pytest.mark.parametrize("old,new", [
+        ([], []),
+        ([], [0, 1, 2]),
+        ([0, 1, 2], []),
+        ([0, 1, 2, 3], [1, 3]),
+        ([1, 3], [0, 1, 2, 3, 4]),
+        ([0, 2, 4], [1, 2, 3]),
+        ([0, 1, 2], [0, 1, 2]),
+    ])
+    def test_turns_old_into_new(self, old, new):
+        rows = _apply([self.LABELS[i] for i in old], _listbox_edits(old, new), self.LABELS)
+        assert rows == [self.LABELS[i] for i in new]
+
+    def test_random_subsets(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            old = sorted(rng.sample(range(20), rng.randint(0, 20)))
+            new = sorted(rng.sample(range(20), rng.randint(0, 20)))
+            rows = _apply([self.LABELS[i] for i in old], _listbox_edits(old, new), self.LABELS)
+            assert rows == [self.LABELS[i] for i in new]
+
+    def test_unchanged_rows_are_not_touched(self):
+        assert _listbox_edits([0, 1, 2], [0, 1, 2]) == []
+
+    def test_narrowing_only_deletes(self):
+        edits = _listbox_edits(list(range(10)), [2, 3, 7])
+        assert all(not inserted for _, _, inserted in edits)
+        assert sum(deleted for _, deleted, _ in edits) == 7
+
+    def test_contiguous_runs_are_batched(self):
+        assert _listbox_edits(list(range(1000)), [0, 999]) == [(1, 998, [])]
@@ -0,0 +1,144 @@
+"""Tests for completion.py — prefix index for street and name fields."""
+import random
+import time
+
+import pytest
+
+import completion
+from completion import PrefixIndex
+from models import Resident
+
+
+class TestPrefixIndex:
+    STREETS = ["вул. Шевченка 5", "вул. Шевченка 12", "Франка 2", "Лесі Українки 3", "Shevchuka 1"]
+
+    def test_completes_by_prefix(self):
+        idx = PrefixIndex(self.STREETS)
+        assert idx.complete("Фра") == ["Франка 2"]
+
+    def test_matches_any_word_start(self):
+        idx = PrefixIndex(self.STREETS)
+        assert set(idx.complete("шевч")) == {"вул. Шевченка 5", "вул. Шевченка 12", "Shevchuka 1"}
+        assert idx.complete("укр") == ["Лесі Українки 3"]
+
+    def test_not_mid_word(self):
+        assert PrefixIndex(self.STREETS).complete("evch") == []
+
+    def test_cross_script(self):
+        idx = PrefixIndex(self.STREETS)
+        assert set(idx.complete("shevchenka")) == {"вул. Шевченка 5", "вул. Шевченка 12"}
+        assert idx.complete("Шевчука") == ["Shevchuka 1"]
+
+    def test_limit_and_distinct(self):
+        idx = PrefixIndex(["Ivan Ivanenko"] + [f"Ivan {i}" for i in range(20)])
+        found = idx.complete("iv", limit=5)
+        assert len(found) == 5
+        assert len(set(found)) == 5
+
+    def test_blank_prefix(self):
+        assert PrefixIndex(self.STREETS).complete("  ") == []
+
+    def test_add_is_incremental(self):
+        idx = PrefixIndex(self.STREETS)
+        idx.add("Зелена 7")
+        assert idx.complete("зел") == ["Зелена 7"]
+        assert "Зелена 7" in idx and len(idx) == 6
+
+    def test_whitespace_is_collapsed(self):
+        idx = PrefixIndex(["  Франка   2 "])
+        assert idx.complete("фр") == ["Франка 2"]
+
+    def test_remove(self):
+        idx = PrefixIndex(self.STREETS)
+        idx.remove("Франка 2")
+        assert idx.complete("фр") == []
+        assert "Франка 2" not in idx
+        idx.remove("Франка 2")   # unknown: ignored
+
+    def test_remove_counts_occurrences(self):
+        idx = PrefixIndex(["Іван Коваль", "Іван Коваль"])
+        idx.remove("Іван Коваль")
+        assert idx.complete("ков") == ["Іван Коваль"]
+        idx.remove("Іван Коваль")
+        assert idx.complete("ков") == []
+
+    def test_matches_rebuilt_index_after_random_edits(self):
+        rng = random.Random(3)
+        pool = [f"{rng.choice('АБВГДЕ')}{rng.choice('абвгде')}{i}" for i in range(200)]
+        live = []
+        idx = PrefixIndex()
+        for _ in range(1000):
+            text = rng.choice(pool)
+            if text in live and rng.random() < 0.5:
+                live.remove(text)
+                idx.remove(text)
+            else:
+                live.append(text)
+                idx.add(text)
+        fresh = PrefixIndex(live)
+        for prefix in ("а", "б", "ва", "г"):
+            assert idx.complete(prefix, limit=50) == fresh.complete(prefix, limit=50)
+
+    def test_completion_benchmark(self):
+        """Benchmark: completing against 20k streets takes microseconds per call."""
+        rng = random.Random(5)
+        syllables = ["ко", "ва", "ль", "ше", "вч", "ен", "ка", "фра", "нка", "ли", "со", "та"]
+        streets = [f"вул. {''.join(rng.choice(syllables) for _ in range(3))} {i}" for i in range(20000)]
+        start = time.perf_counter()
+        idx = PrefixIndex(streets)
+        build = time.perf_counter() - start
+        prefixes = ["к", "ко", "кова", "ше", "shev", "фра", "вул", "zzz"] * 250
+        start = time.perf_counter()
+        for p in prefixes:
+            idx.complete(p)
+        per_call = (time.perf_counter() - start) / len(prefixes)
+        assert per_call < 200e-6, f"{per_call * 1e6:.0f} µs per completion"
+        assert build < 5
+
+
+class TestSharedIndexes:
+    @pytest.fixture(autouse=True)
+    def fresh(self, temp_db):
+        completion.invalidate()
+        yield
+        completion.invalidate()
+
+    def test_streets_load_lazily_once(self, temp_db):
+        temp_db.add_address("Франка 2")
+        idx = completion.streets()
+        assert idx.complete("фр") == ["Франка 2"]
+        temp_db.add_address("Фрунзе 1")
+        assert completion.streets() is idx   # not reloaded
+        completion.add_street("Фрунзе 1")
+        assert idx.complete("фр") == ["Франка 2", "Фрунзе 1"]
+
+    def test_remove_street(self, temp_db):
+        temp_db.add_address("Франка 2")
+        completion.streets()
+        completion.remove_street("Франка 2")
+        assert completion.streets().complete("фр") == []
+
+    def test_updates_before_load_are_ignored(self, temp_db):
+        completion.add_street("Нова 1")
+        completion.add_names("Ivan Koval")
+        completion.remove_names("Ivan Koval")
+        temp_db.add_address("Франка 2")
+        assert completion.streets().complete("но") == []
+        assert len(completion.names()) == 0
+
+    def test_names_include_family_names(self, temp_db):
+        addr = temp_db.add_address("Франка 2")
+        temp_db.add_resident(Resident(id=None, address_id=addr.id, first_name="Олена",
+                                      last_name="Коваль", father="Петро Коваль"))
+        idx = completion.names()
+        assert idx.complete("ков") == ["Олена Коваль", "Петро Коваль"]
+        completion.add_names("Марія Коваль", None, "")
+        assert "Марія Коваль" in idx
+        completion.remove_names("Петро Коваль", None)
+        assert idx.complete("ков") == ["Марія Коваль", "Олена Коваль"]
+
+    def test_invalidate_reloads(self, temp_db):
+        completion.streets()
+        temp_db.add_address("Франка 2")
+        completion.invalidate()
+        assert completion.streets().complete("фр") == ["Франка 2"]
@@ -1,4 +1,9 @@
 """Tests for database.py — all CRUD operations against an isolated temp DB."""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 import pytest
 from unittest.mock import patch
 from models import Address, Resident, Event
@@ -16,6 +21,21 @@ def db(tmp_path):
         yield _db
 
 
+@contextmanager
+def _db_upgraded_from(tmp_path, version: int, seed: str):
+    """Database created at schema `version`, given the raw rows in the `seed`
+    SQL script, then upgraded to the latest schema by init_db()."""
+    with patch("database.DB_PATH", str(tmp_path / f"v{version}.db")):
+        import database as _db
+        steps = [step for step in _db._MIGRATIONS if step[0] <= version]
+        with patch.object(_db, "_MIGRATIONS", steps), \
+             patch.object(_db, "SCHEMA_VERSION", version):
+            _db.init_db()
+        _db.get_connection().executescript(seed)
+        _db.init_db()
+        yield _db
+
+
 @pytest.fixture
 def addr(db):
     """A pre-created address for reuse."""
@@ -52,28 +72,368 @@ class TestConfig:
         assert db.get_config("language") == "uk"
 
 
+# ── Connection manager ───────────────────────────────────────────────────────
+
+class TestConnectionManager:
+    def test_calls_reuse_one_connection(self, db, addr):
+        before = db.connection_stats()
+        for _ in range(5):
+            db.get_config("language")
+            db.get_residents(addr.id)
+        after = db.connection_stats()
+        assert after["opened"] == before["opened"]
+
+    def test_same_connection_per_thread(self, db):
+        assert db.get_connection() is db.get_connection()
+
+    def test_foreign_keys_enabled(self, db):
+        assert db.get_connection().execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_write_ahead_log(self, db):
+        assert db.get_connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_checkpoint_empties_the_log(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Ivan", last_name="Bilyi"))
+        assert os.path.getsize(db.DB_PATH + "-wal") > 0
+        db.checkpoint()
+        assert os.path.getsize(db.DB_PATH + "-wal") == 0
+
+    def test_close_checkpoints_while_a_reader_is_open(self, db, addr):
+        reader = sqlite3.connect(db.DB_PATH)  # keeps the log from being removed on close
+        try:
+            reader.execute("SELECT COUNT(*) FROM config").fetchone()
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name="Ivan", last_name="Bilyi"))
+            db.close_connections()
+            assert os.path.getsize(db.DB_PATH + "-wal") == 0
+        finally:
+            reader.close()
+
+    def test_db_path_change_reopens(self, db, tmp_path):
+        first = db.get_connection()
+        with patch("database.DB_PATH", str(tmp_path / "other.db")):
+            second = db.get_connection()
+        assert second is not first
+        assert first.is_closed
+
+    def test_worker_threads_share_pool(self, db):
+        db.close_connections()
+        seen = []
+
+        def work():
+            with db.pooled_connection() as conn:
+                db.get_config("language")
+                seen.append(db.get_connection() is conn)
+
+        for _ in range(3):
+            t = threading.Thread(target=work)
+            t.start()
+            t.join()
+        stats = db.connection_stats()
+        assert seen == [True, True, True]
+        assert stats["opened"] - stats["closed"] == stats["open"]
+        assert stats["pooled"] == 1
+
+    def test_close_connections(self, db):
+        conn = db.get_connection()
+        db.close_connections()
+        assert conn.is_closed
+        assert db.connection_stats()["open"] == 0
+        assert db.get_config("missing", "x") == "x"
+
+
+# ── Schema migrations ────────────────────────────────────────────────────────
+
+class TestMigrations:
+    def test_fresh_db_at_latest_version(self, db):
+        assert db.get_config(db.SCHEMA_VERSION_KEY) == str(db.SCHEMA_VERSION)
+
+    def test_current_schema_runs_no_steps(self, db):
+        assert db.migrate(db.get_connection()) == []
+
+    def test_current_schema_skips_ddl(self, db):
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            db.init_db()
+        finally:
+            conn.set_trace_callback(None)
+        assert not any(s.lstrip().upper().startswith(("CREATE", "ALTER")) for s in statements)
+
+    def test_upgrades_pre_versioning_db(self, tmp_path):
+        db_file = str(tmp_path / "legacy.db")
+        legacy = sqlite3.connect(db_file)
+        legacy.executescript("""
+            CREATE TABLE config (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE addresses (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                    street TEXT NOT NULL, notes TEXT DEFAULT '');
+            CREATE TABLE residents (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                    address_id INTEGER NOT NULL, first_name TEXT NOT NULL,
+                                    last_name TEXT NOT NULL, birth_date TEXT,
+                                    baptism_date TEXT, marriage_date TEXT, death_date TEXT,
+                                    status TEXT NOT NULL DEFAULT 'active', notes TEXT DEFAULT '');
+            INSERT INTO addresses (street) VALUES ('Old St 1');
+            INSERT INTO residents (address_id, first_name, last_name) VALUES (1, 'Olha', 'Stara');
+        """)
+        legacy.commit()
+        legacy.close()
+        with patch("database.DB_PATH", db_file):
+            import database as _db
+            _db.init_db()
+            assert _db.get_config(_db.SCHEMA_VERSION_KEY) == str(_db.SCHEMA_VERSION)
+            residents = _db.get_all_residents()
+        assert residents[0].first_name == "Olha"
+        assert residents[0].father is None
+
+    def test_backfills_folded_keys(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 3, """
+                INSERT INTO addresses (street) VALUES ('ВУЛ. ФРАНКА 3');
+                INSERT INTO residents (address_id, first_name, last_name)
+                VALUES (1, 'ОЛЕНА', 'Ґудзь');""") as _db:
+            assert _db.find_or_create_address("вул. франка 3") == 1
+            assert _db.resident_exists(1, "олена", "ґудзь") is True
+
+    def test_backfills_sort_keys(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 4, """
+                INSERT INTO addresses (street) VALUES ('Франка 3');
+                INSERT INTO residents (address_id, first_name, last_name)
+                VALUES (1, 'А', 'Яковенко'), (1, 'А', 'Ґудзь'), (1, 'А', 'Гнатюк');""") as _db:
+            names = [r.last_name for r in _db.get_residents(1)]
+        assert names == ["Гнатюк", "Ґудзь", "Яковенко"]
+
+    def test_backfills_address_sort_keys(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 5, """
+                INSERT INTO addresses (street)
+                VALUES ('Франка 10'), ('Франка 2а'), ('Грушевського 4');""") as _db:
+            streets = [a.street for a in _db.get_addresses()]
+        assert streets == ["Грушевського 4", "Франка 2а", "Франка 10"]
+
+    def test_address_sort_backfill_clamps_huge_numbers(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 5, """
+                INSERT INTO addresses (street)
+                VALUES ('Франка 123456789012345678901234'), ('Франка 2');""") as _db:
+            streets = [a.street for a in _db.get_addresses()]
+        assert streets == ["Франка 2", "Франка 123456789012345678901234"]
+
+    def test_backfills_active_counters(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 6, """
+                INSERT INTO addresses (street) VALUES ('Франка 10');
+                INSERT INTO residents (address_id, first_name, last_name, status)
+                VALUES (1, 'А', 'Б', 'active'), (1, 'А', 'Б', 'active'), (1, 'А', 'Б', 'left');""") as _db:
+            assert _db.get_addresses()[0].active_count == 2
+            assert _db.get_active_total() == 2
+
+    def test_backfills_search_index(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 7, """
+                INSERT INTO addresses (street) VALUES ('Франка 10');
+                INSERT INTO residents (address_id, first_name, last_name)
+                VALUES (1, 'Олена', 'Ґудзь');""") as _db:
+            found = _db.search_residents("gudz")
+        assert [r.first_name for r, _ in found] == ["Олена"]
+
+    def test_backfills_fuzzy_index(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 8, """
+                INSERT INTO addresses (street) VALUES ('Франка 10');
+                INSERT INTO residents (address_id, first_name, last_name)
+                VALUES (1, 'Іван', 'Ковальчук');""") as _db:
+            found = _db.similar_residents("Kovalchyk Ivan")
+        assert [r.last_name for r, _, _ in found] == ["Ковальчук"]
+
+    def test_backfills_phonetic_keys(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 9, """
+                INSERT INTO addresses (street) VALUES ('Франка 10');
+                INSERT INTO residents (address_id, first_name, last_name)
+                VALUES (1, 'Іван', 'Ковальчук');""") as _db:
+            found = _db.search_residents("Kowalczuk")
+        assert [r.last_name for r, _ in found] == ["Ковальчук"]
+
+    def test_rekeys_other_cyrillic_letters(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 10, """
+                INSERT INTO addresses (street) VALUES ('Франка 10');
+                INSERT INTO residents (address_id, first_name, last_name)
+                VALUES (1, 'А', 'Эрдман'), (1, 'А', 'Абрамович'), (1, 'А', 'Яковенко');""") as _db:
+            names = [r.last_name for r in _db.get_residents(1)]
+        assert names == ["Абрамович", "Эрдман", "Яковенко"]
+
+    def test_trigram_triggers_work_without_resident_index(self, tmp_path):
+        with _db_upgraded_from(tmp_path, 11, "INSERT INTO addresses (street) VALUES ('Франка 10');") as _db:
+            conn = _db.get_connection()
+            res = _db.add_resident(Resident(id=None, address_id=1, first_name="Іван",
+                                            last_name="Ковальчук"))
+            res.last_name = "Шевчук"
+            _db.update_resident(res)
+            renamed = {r[0] for r in conn.execute("SELECT gram FROM resident_trigrams")}
+            _db.delete_resident(res.id)
+            left = conn.execute("SELECT COUNT(*) FROM resident_trigrams").fetchone()[0]
+            index = conn.execute("SELECT 1 FROM sqlite_master "
+                                 "WHERE name='idx_resident_trigrams_resident'").fetchone()
+        assert renamed == _db._trigrams(_db._fuzzy_key("Іван Шевчук"))
+        assert left == 0
+        assert index is None
+
+    def test_failed_step_rolls_back(self, tmp_path):
+        def broken(conn):
+            conn.execute("CREATE TABLE half_done (x)")
+            raise RuntimeError("boom")
+
+        db_file = str(tmp_path / "broken.db")
+        with patch("database.DB_PATH", db_file):
+            import database as _db
+            steps = _db._MIGRATIONS + [(_db.SCHEMA_VERSION + 1, broken)]
+            with patch.object(_db, "_MIGRATIONS", steps), \
+                 patch.object(_db, "SCHEMA_VERSION", _db.SCHEMA_VERSION + 1):
+                with pytest.raises(RuntimeError):
+                    _db.init_db()
+            tables = [r[0] for r in _db.get_connection().execute(
+                "SELECT name FROM sqlite_master WHERE type='table'")]
+        assert "half_done" not in tables
+        assert "residents" not in tables
+
+
+# ── Query plans ──────────────────────────────────────────────────────────────
+
+# Every read/update/delete path in database.py. A bare "SCAN <table>" in any
+# of their plans means an index is missing or no longer usable.
+_PLANNED_CALLS = {
+    "get_config":             lambda db, a, r: db.get_config("language"),
+    "get_addresses":          lambda db, a, r: db.get_addresses(),
+    "get_address_streets":    lambda db, a, r: db.get_address_streets(),
+    "get_address_street":     lambda db, a, r: db.get_address_street(a.id),
+    "update_address":         lambda db, a, r: db.update_address(a),
+    "delete_address":         lambda db, a, r: db.delete_address(a.id),
+    "find_or_create_address": lambda db, a, r: db.find_or_create_address("shevchenko 5"),
+    "resident_exists":        lambda db, a, r: db.resident_exists(a.id, "ivan", "kovalenko"),
+    "get_residents":          lambda db, a, r: db.get_residents(a.id),
+    "get_all_residents":      lambda db, a, r: db.get_all_residents(),
+    "count_residents":        lambda db, a, r: db.count_residents(),
+    "get_person_names":       lambda db, a, r: db.get_person_names(),
+    "update_resident":        lambda db, a, r: db.update_resident(r),
+    "delete_resident":        lambda db, a, r: db.delete_resident(r.id),
+    "mark_deceased":          lambda db, a, r: db.mark_deceased(r.id, "2020-01-01"),
+    "mark_left":              lambda db, a, r: db.mark_left(r.id),
+    "get_events_for_address": lambda db, a, r: db.get_events_for_address(a.id),
+    "get_active_total":       lambda db, a, r: db.get_active_total(),
+    "search_residents":       lambda db, a, r: db.search_residents("Коваль"),
+    "iter_search_residents":  lambda db, a, r: list(db.iter_search_residents("Коваль", batch_size=1)),
+    "similar_residents":      lambda db, a, r: db.similar_residents("Kovalenko Ivan"),
+    "similar_residents_address": lambda db, a, r: db.similar_residents("Kovalenko", address_id=a.id),
+    "iter_residents":         lambda db, a, r: list(db.iter_residents(batch_size=1)),
+    "iter_residents_address": lambda db, a, r: list(db.iter_residents(batch_size=1, order="address")),
+    "iter_export_rows":       lambda db, a, r: list(db.iter_export_rows()),
+    "bulk_import_undo":       lambda db, a, r: _cancelled_import(db),
+}
+
+
+def _cancelled_import(db):
+    """A chunked import with undo_on_error that fails after committing a chunk."""
+    try:
+        with db.BulkImporter(commit_every=1, undo_on_error=True) as imp:
+            imp.add("New St 1", Resident(id=None, address_id=0, first_name="Olha", last_name="Nova"))
+            raise RuntimeError("cancelled")
+    except RuntimeError:
+        pass
+
+# Queries whose job is to read a whole table may scan that table only.
+# The schema catalog is tiny and read once per connection.
+_ALLOWED_SCANS = {
+    "search_residents": {"SCAN sqlite_master"},
+    "iter_search_residents": {"SCAN sqlite_master"},
+    # The grouped trigram matches, already narrowed by the gram index
+    "similar_residents": {"SCAN m"},
+    "similar_residents_address": {"SCAN m"},
+    "get_address_streets": {"SCAN addresses"},
+    "get_person_names": {"SCAN residents"},
+    # BulkImporter loads the whole address key map once on entry
+    "bulk_import_undo": {"SCAN addresses", "SCAN CONSTANT ROW"},
+}
+
+
+def _query_plans(db, call):
+    """Run call() and return EXPLAIN QUERY PLAN details for each statement it issued."""
+    conn = db.get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    plans = {}
+    for sql in statements:
+        if sql.split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            plans[sql] = [row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    return plans
+
+
+class TestQueryPlans:
+    @pytest.mark.parametrize("name", sorted(_PLANNED_CALLS))
+    def test_no_full_table_scan(self, db, addr, resident, name):
+        plans = _query_plans(db, lambda: _PLANNED_CALLS[name](db, addr, resident))
+        assert plans, f"{name} issued no queries"
+        allowed = _ALLOWED_SCANS.get(name, set())
+        scans = [step for steps in plans.values() for step in steps
+                 if step.startswith("SCAN ") and " USING " not in step
+                 and " VIRTUAL TABLE " not in step and step not in allowed]
+        assert scans == [], f"{name}: {scans}"
+
+    def test_indexes_present(self, db):
+        names = {row["name"] for row in db.get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type='index'")}
+        assert {
+            "idx_residents_address_sort", "idx_residents_sort",
+            "idx_events_resident_date", "idx_addresses_street_key",
+            "idx_residents_name_key",
+        } <= names
+        # The trigram triggers delete through the primary key (migration 12)
+        assert "idx_resident_trigrams_resident" not in names
+
+    def test_key_lookups_use_key_indexes(self, db, addr, resident):
+        plans = _query_plans(db, lambda: (db.find_or_create_address("Shevchenko 5"),
+                                          db.resident_exists(addr.id, "Ivan", "Kovalenko")))
+        steps = " | ".join(step for steps in plans.values() for step in steps)
+        assert "idx_addresses_street_key" in steps
+        assert "idx_residents_name_key" in steps
+
+
 # ── Address sort key ─────────────────────────────────────────────────────────
 
 class TestAddressSortKey:
     def test_numbered_street(self, db):
         key = db._address_sort_key("Oak Lane 12")
-        assert key == ("oak lane", 12)
+        assert key == ("oak lane", 12, "")
 
     def test_numbered_street_casefold(self, db):
         key = db._address_sort_key("MAIN Street 3")
-        assert key == ("main street", 3)
+        assert key == ("main street", 3, "")
 
     def test_no_number(self, db):
         key = db._address_sort_key("Central")
-        assert key == ("central", 0)
+        assert key == ("central", 0, "")
 
     def test_cyrillic_street(self, db):
         key = db._address_sort_key("вул. Незалежності 15")
-        assert key == ("вул. незалежності", 15)
+        assert key == (db._sort_key("вул. незалежності"), 15, "")
 
     def test_strips_whitespace(self, db):
         key = db._address_sort_key("  Oak Lane 7  ")
-        assert key == ("oak lane", 7)
+        assert key == ("oak lane", 7, "")
+
+    def test_letter_suffix(self, db):
+        key = db._address_sort_key("Франка 12а")
+        assert key == (db._sort_key("франка"), 12, db._sort_key("а"))
+
+    def test_fraction_suffix(self, db):
+        key = db._address_sort_key("Oak Lane 12/3")
+        assert key == ("oak lane", 12, "/3")
+
+    def test_huge_number_is_clamped(self, db):
+        key = db._address_sort_key("Street 123456789012345678901234")
+        assert key == ("street", 2 ** 63 - 1, "")
+
+    def test_huge_number_is_stored(self, db):
+        db.add_address("Street 123456789012345678901234")
+        db.add_address("Street 9")
+        assert [a.street for a in db.get_addresses()] == [
+            "Street 9", "Street 123456789012345678901234"]
 
 
 # ── Addresses ─────────────────────────────────────────────────────────────────
@@ -106,6 +466,27 @@ class TestAddresses:
         assert streets.index("Ash Ln 1") < streets.index("Oak Ave 2")
         assert streets.index("Oak Ave 2") < streets.index("Oak Ave 10")
 
+    def test_get_addresses_building_suffixes(self, db):
+        for street in ("Франка 12б", "Франка 2", "Франка 12/3", "Франка 12а", "Франка 12", "Франка 13"):
+            db.add_address(street)
+        streets = [a.street for a in db.get_addresses()]
+        assert streets == ["Франка 2", "Франка 12", "Франка 12/3", "Франка 12а",
+                           "Франка 12б", "Франка 13"]
+
+    def test_get_addresses_ukrainian_street_order(self, db):
+        for street in ("Яворова 1", "Івана Франка 1", "Грушевського 1", "Ґрунтова 1", "Європейська 1"):
+            db.add_address(street)
+        streets = [a.street for a in db.get_addresses()]
+        assert streets == ["Грушевського 1", "Ґрунтова 1", "Європейська 1",
+                           "Івана Франка 1", "Яворова 1"]
+
+    def test_update_address_resorts(self, db):
+        a = db.add_address("Oak Ave 1")
+        db.add_address("Oak Ave 5")
+        a.street = "Oak Ave 9"
+        db.update_address(a)
+        assert [x.street for x in db.get_addresses()] == ["Oak Ave 5", "Oak Ave 9"]
+
     def test_get_addresses_active_count(self, db):
         addr = db.add_address("Pine Rd 3")
         r = Resident(id=None, address_id=addr.id, first_name="A", last_name="B")
@@ -149,6 +530,21 @@ class TestAddresses:
         id2 = db.find_or_create_address("  Trim St 1  ")
         assert id1 == id2
 
+    def test_find_or_create_cyrillic_case_insensitive(self, db):
+        id1 = db.find_or_create_address("вул. Шевченка 5")
+        id2 = db.find_or_create_address("ВУЛ. ШЕВЧЕНКА 5")
+        assert id1 == id2
+
+    def test_find_or_create_collapses_inner_whitespace(self, db):
+        id1 = db.find_or_create_address("вул. Шевченка 5")
+        id2 = db.find_or_create_address("вул.  Шевченка   5")
+        assert id1 == id2
+
+    def test_find_or_create_matches_updated_street(self, db, addr):
+        addr.street = "Франка 12"
+        db.update_address(addr)
+        assert db.find_or_create_address("ФРАНКА 12") == addr.id
+
 
 # ── Resident existence check ──────────────────────────────────────────────────
 
@@ -166,6 +562,54 @@ class TestResidentExists:
         addr2 = db.add_address("Other St 2")
         assert db.resident_exists(addr2.id, "Ivan", "Kovalenko") is False
 
+    def test_cyrillic_case_insensitive(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id,
+                                 first_name="Олена", last_name="Ґудзь"))
+        assert db.resident_exists(addr.id, "ОЛЕНА", "ґУДЗЬ") is True
+
+    def test_follows_renamed_resident(self, db, addr, resident):
+        resident.first_name = "Іван"
+        db.update_resident(resident)
+        assert db.resident_exists(addr.id, "ІВАН", "Kovalenko") is True
+        assert db.resident_exists(addr.id, "Ivan", "Kovalenko") is False
+
+
+class TestSortKey:
+    def test_ukrainian_letters_in_alphabet_order(self, db):
+        letters = "абвгґдеєжзиіїйклмнопрстуфхцчшщьюя"
+        assert sorted(letters, key=db._sort_key) == list(letters)
+
+    def test_case_insensitive(self, db):
+        assert db._sort_key("ҐУДЗЬ") == db._sort_key("ґудзь")
+
+    def test_apostrophe_ignored(self, db):
+        assert db._sort_key("Мар'яна") == db._sort_key("Марʼяна") == db._sort_key("Маряна")
+
+    def test_latin_before_cyrillic(self, db):
+        assert db._sort_key("Zubko") < db._sort_key("Антонюк")
+
+    def test_other_cyrillic_letters_beside_neighbours(self, db):
+        letters = "деёэєжзиыіъью"
+        assert sorted(letters, key=db._sort_key) == list(letters)
+        assert db._sort_key("Эрдман") > db._sort_key("Абрамович")
+
+    def test_other_cyrillic_letters_in_resident_order(self, db, addr):
+        for last in ("Эрдман", "Абрамович", "Ёлкин", "Єрмак"):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name="А", last_name=last))
+        names = [r.last_name for r in db.get_residents(addr.id)]
+        assert names == ["Абрамович", "Ёлкин", "Эрдман", "Єрмак"]
+
+
+class TestFold:
+    def test_casefolds_cyrillic(self, db):
+        assert db._fold("ВУЛ. ШЕВЧЕНКА 5") == "вул. шевченка 5"
+
+    def test_collapses_whitespace(self, db):
+        assert db._fold("  Oak   Lane\t7 ") == "oak lane 7"
+
+    def test_none_is_empty(self, db):
+        assert db._fold(None) == ""
+
 
 # ── Residents ─────────────────────────────────────────────────────────────────
 
@@ -183,12 +627,33 @@ class TestResidents:
     def test_get_residents_empty_for_unknown_address(self, db):
         assert db.get_residents(9999) == []
 
+    def test_get_person_names(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Olena",
+                                 last_name="Koval", father="Petro Koval", spouse="Ivan Koval"))
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Ivan", last_name="Koval"))
+        assert sorted(db.get_person_names()) == [
+            "Ivan Koval", "Ivan Koval", "Olena Koval", "Petro Koval"]
+
     def test_get_residents_sorted_by_name(self, db, addr):
         db.add_resident(Resident(id=None, address_id=addr.id, first_name="Zoriana", last_name="Bila"))
         db.add_resident(Resident(id=None, address_id=addr.id, first_name="Anna", last_name="Bila"))
         names = [r.first_name for r in db.get_residents(addr.id)]
         assert names.index("Anna") < names.index("Zoriana")
 
+    def test_get_residents_ukrainian_alphabetical_order(self, db, addr):
+        for last in ("Яковенко", "Їжакевич", "Ігнатенко", "Євтух", "Ґудзь", "Гнатюк", "Андрієнко"):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name="А", last_name=last))
+        names = [r.last_name for r in db.get_residents(addr.id)]
+        assert names == ["Андрієнко", "Гнатюк", "Ґудзь", "Євтух", "Ігнатенко", "Їжакевич", "Яковенко"]
+
+    def test_get_all_residents_ukrainian_alphabetical_order(self, db, addr):
+        addr2 = db.add_address("Second St 2")
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Ігор", last_name="Бойко"))
+        db.add_resident(Resident(id=None, address_id=addr2.id, first_name="Ганна", last_name="бойко"))
+        db.add_resident(Resident(id=None, address_id=addr2.id, first_name="Євген", last_name="Бойко"))
+        names = [r.first_name for r in db.get_all_residents()]
+        assert names == ["Ганна", "Євген", "Ігор"]
+
     def test_get_all_residents(self, db, addr, resident):
         addr2 = db.add_address("Second St 2")
         db.add_resident(Resident(id=None, address_id=addr2.id, first_name="Oksana", last_name="Melnyk"))
@@ -228,6 +693,12 @@ class TestResidents:
         addresses = db.get_addresses()
         assert addresses[0].active_count == 0
 
+    def test_active_count_follows_status_change_back(self, db, addr, resident):
+        db.mark_left(resident.id)
+        resident.status = "active"
+        db.update_resident(resident)
+        assert db.get_addresses()[0].active_count == 1
+
     def test_resident_all_fields_roundtrip(self, db, addr):
         r = Resident(
             id=None, address_id=addr.id,
@@ -248,6 +719,519 @@ class TestResidents:
         assert fetched.notes == "Elder of the church"
 
 
+# ── Active counters ──────────────────────────────────────────────────────────
+
+class TestActiveCounters:
+    def _counts(self, db):
+        return {a.street: a.active_count for a in db.get_addresses()}
+
+    def test_total_starts_at_zero(self, db):
+        assert db.get_active_total() == 0
+
+    def test_insert_counts_only_active(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="A", last_name="B"))
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="C", last_name="D",
+                                 status="deceased"))
+        assert self._counts(db) == {"Shevchenko 5": 1}
+        assert db.get_active_total() == 1
+
+    def test_delete_resident_decrements(self, db, addr, resident):
+        db.delete_resident(resident.id)
+        assert self._counts(db) == {"Shevchenko 5": 0}
+        assert db.get_active_total() == 0
+
+    def test_moving_resident_moves_count(self, db, addr, resident):
+        addr2 = db.add_address("Franka 2")
+        db.get_connection().execute(
+            "UPDATE residents SET address_id=? WHERE id=?", (addr2.id, resident.id))
+        assert self._counts(db) == {"Shevchenko 5": 0, "Franka 2": 1}
+        assert db.get_active_total() == 1
+
+    def test_address_cascade_updates_total(self, db, addr, resident):
+        addr2 = db.add_address("Franka 2")
+        db.add_resident(Resident(id=None, address_id=addr2.id, first_name="O", last_name="M"))
+        db.delete_address(addr.id)
+        assert db.get_active_total() == 1
+
+    def test_total_matches_sum(self, db, addr, resident):
+        addr2 = db.add_address("Franka 2")
+        for i in range(3):
+            db.add_resident(Resident(id=None, address_id=addr2.id,
+                                     first_name=f"N{i}", last_name="M"))
+        db.mark_deceased(resident.id, "2020-01-01")
+        assert db.get_active_total() == sum(a.active_count for a in db.get_addresses()) == 3
+
+
+# ── Streaming iterator ───────────────────────────────────────────────────────
+
+class TestIterResidents:
+    @pytest.fixture
+    def many(self, db, addr):
+        for last in ("Яковенко", "Бойко", "Ґудзь", "Андрієнко", "Гнатюк", "Євтух", "Іваненко"):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name="А", last_name=last))
+        return addr
+
+    def test_matches_get_all_residents(self, db, many):
+        assert [r.id for r in db.iter_residents(batch_size=3)] == \
+               [r.id for r in db.get_all_residents()]
+
+    def test_crosses_batch_boundaries_in_order(self, db, many):
+        names = [r.last_name for r in db.iter_residents(batch_size=2)]
+        assert names == ["Андрієнко", "Бойко", "Гнатюк", "Ґудзь", "Євтух", "Іваненко", "Яковенко"]
+
+    def test_is_lazy(self, db, many):
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            it = db.iter_residents(batch_size=2)
+            next(it)
+            selects = [s for s in statements if s.lstrip().startswith("SELECT")]
+        finally:
+            conn.set_trace_callback(None)
+        assert len(selects) == 1
+        assert "LIMIT 2" in selects[0]
+
+    def test_order_by_id(self, db, many):
+        ids = [r.id for r in db.iter_residents(batch_size=3, order="id")]
+        assert ids == sorted(ids)
+
+    def test_order_by_address(self, db, many):
+        addr2 = db.add_address("Aaa 1")
+        db.add_resident(Resident(id=None, address_id=addr2.id, first_name="Я", last_name="Яр"))
+        ids = [r.address_id for r in db.iter_residents(batch_size=3, order="address")]
+        assert ids == sorted(ids)
+
+    def test_where_filter(self, db, many):
+        db.mark_left(db.get_all_residents()[0].id)
+        left = list(db.iter_residents(batch_size=2, where="status=?", params=("left",)))
+        assert [r.last_name for r in left] == ["Андрієнко"]
+
+    def test_exact_multiple_of_batch_size(self, db, addr):
+        for i in range(4):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name=f"N{i}", last_name="M"))
+        assert len(list(db.iter_residents(batch_size=2))) == 4
+
+    def test_empty(self, db):
+        assert list(db.iter_residents()) == []
+
+    def test_unknown_order_raises(self, db):
+        with pytest.raises(ValueError):
+            list(db.iter_residents(order="birthday"))
+
+
+class TestIterExportRows:
+    def test_columns_and_order(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Я", last_name="Ґудзь",
+                                 status="left", birth_date="1960-01-01", notes="n"))
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="А", last_name="Гнатюк"))
+        rows = list(db.iter_export_rows())
+        assert rows == [
+            ("Гнатюк", "А", addr.street, "active", None, None, None, None, ""),
+            ("Ґудзь", "Я", addr.street, "left", "1960-01-01", None, None, None, "n"),
+        ]
+        assert len(db.EXPORT_COLUMNS) == len(rows[0])
+
+    def test_single_query(self, db, addr):
+        for i in range(5):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name=f"N{i}", last_name="M"))
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            assert len(list(db.iter_export_rows())) == 5
+        finally:
+            conn.set_trace_callback(None)
+        assert len([s for s in statements if s.lstrip().startswith("SELECT")]) == 1
+
+    def test_empty(self, db):
+        assert list(db.iter_export_rows()) == []
+
+
+# ── Bulk import ──────────────────────────────────────────────────────────────
+
+def _person(first, last, **kw):
+    return Resident(id=None, address_id=0, first_name=first, last_name=last, **kw)
+
+
+class TestBulkImporter:
+    def test_inserts_and_counts(self, db):
+        with db.BulkImporter() as imp:
+            imp.add("Main St 1", _person("Ivan", "Kovalenko"))
+            imp.add("Main St 1", _person("Olena", "Kovalenko"))
+            imp.add("Oak Ave 2", _person("Petro", "Bilyi"))
+        assert (imp.new_count, imp.skip_count) == (3, 0)
+        assert len(db.get_all_residents()) == 3
+        assert [a.street for a in db.get_addresses()] == ["Main St 1", "Oak Ave 2"]
+
+    def test_skips_existing_resident(self, db, addr, resident):
+        with db.BulkImporter() as imp:
+            imp.add("SHEVCHENKO 5", _person("IVAN", "kovalenko"))
+        assert (imp.new_count, imp.skip_count) == (0, 1)
+
+    def test_reuses_existing_address_cyrillic_case(self, db):
+        addr = db.add_address("вул. Шевченка 5")
+        with db.BulkImporter() as imp:
+            imp.add("ВУЛ. ШЕВЧЕНКА 5", _person("Іван", "Коваль"))
+        assert db.get_residents(addr.id)[0].last_name == "Коваль"
+        assert len(db.get_addresses()) == 1
+
+    def test_skips_duplicates_within_import(self, db):
+        with db.BulkImporter(batch_size=10) as imp:
+            imp.add("Main St 1", _person("Ivan", "Kovalenko"))
+            imp.add("Main St 1", _person("ivan", "KOVALENKO"))
+        assert (imp.new_count, imp.skip_count) == (1, 1)
+        assert len(db.get_all_residents()) == 1
+
+    def test_flushes_in_batches(self, db):
+        with db.BulkImporter(batch_size=2) as imp:
+            for i in range(5):
+                imp.add("Main St 1", _person(f"N{i}", "M"))
+        assert len(db.get_all_residents()) == 5
+
+    def test_single_commit(self, db):
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            with db.BulkImporter(batch_size=2) as imp:
+                for i in range(6):
+                    imp.add(f"Street {i % 3}", _person(f"N{i}", "M"))
+        finally:
+            conn.set_trace_callback(None)
+        ends = [s for s in statements if s.split()[0].upper() in ("COMMIT", "RELEASE")]
+        assert len(ends) <= 2  # RELEASE, plus COMMIT only if a transaction was already open
+
+    def test_rolls_back_on_error(self, db, addr, resident):
+        with pytest.raises(RuntimeError):
+            with db.BulkImporter(batch_size=1) as imp:
+                imp.add("New St 1", _person("Olha", "Nova"))
+                imp.add("Shevchenko 5", _person("Taras", "Hrytsenko"))
+                raise RuntimeError("bad row")
+        assert [a.street for a in db.get_addresses()] == ["Shevchenko 5"]
+        assert [r.first_name for r in db.get_all_residents()] == ["Ivan"]
+
+    def test_keeps_committed_chunks_on_error(self, db):
+        with pytest.raises(RuntimeError):
+            with db.BulkImporter(batch_size=2, commit_every=3) as imp:
+                for i in range(5):
+                    imp.add("New St 1", _person("Olha", f"Nova{i}"))
+                raise RuntimeError("bad row")
+        assert len(db.get_all_residents()) == 3
+
+    def test_commit_seconds_ends_a_chunk_holding_the_lock(self, db):
+        clock = [0.0]
+        with patch("time.monotonic", lambda: clock[0]):
+            with pytest.raises(RuntimeError):
+                with db.BulkImporter(commit_every=100, commit_seconds=0.1) as imp:
+                    imp.add("New St 1", _person("Olha", "Nova0"))  # new address: first write
+                    imp.add("New St 1", _person("Olha", "Nova1"))
+                    clock[0] = 0.1
+                    imp.add("New St 1", _person("Olha", "Nova2"))  # lock held 0.1 s: committed
+                    imp.add("New St 1", _person("Olha", "Nova3"))
+                    raise RuntimeError("bad row")
+        assert [r.last_name for r in db.get_all_residents()] == ["Nova0", "Nova1", "Nova2"]
+
+    def test_commit_seconds_counts_from_first_write(self, db, addr):
+        clock = [0.0]
+        with patch("time.monotonic", lambda: clock[0]):
+            with pytest.raises(RuntimeError):
+                with db.BulkImporter(commit_every=100, commit_seconds=0.1) as imp:
+                    imp.add("Shevchenko 5", _person("Olha", "Nova0"))  # only queued
+                    clock[0] = 1.0
+                    imp.add("Shevchenko 5", _person("Olha", "Nova1"))
+                    raise RuntimeError("bad row")
+        assert db.get_all_residents() == []
+
+    def test_undo_on_error_deletes_committed_chunks(self, db, addr, resident):
+        with pytest.raises(RuntimeError):
+            with db.BulkImporter(batch_size=2, commit_every=3, undo_on_error=True) as imp:
+                for i in range(7):
+                    imp.add(f"New St {i % 2}", _person("Olha", f"Nova{i}"))
+                    imp.add("Shevchenko 5", _person("Taras", f"Hrytsenko{i}"))
+                raise RuntimeError("bad row")
+        assert [a.street for a in db.get_addresses()] == ["Shevchenko 5"]
+        assert [r.first_name for r in db.get_all_residents()] == ["Ivan"]
+        assert db.get_addresses()[0].active_count == 1
+
+    def test_undo_keeps_addresses_used_meanwhile(self, db):
+        with pytest.raises(RuntimeError):
+            with db.BulkImporter(commit_every=1, undo_on_error=True) as imp:
+                imp.add("New St 1", _person("Olha", "Nova"))
+                # Another thread adds a resident at the new address between chunks
+                t = threading.Thread(target=db.add_resident, args=(Resident(
+                    id=None, address_id=imp.address_id("New St 1"),
+                    first_name="Petro", last_name="Inshyi"),))
+                t.start()
+                t.join()
+                raise RuntimeError("cancelled")
+        assert [a.street for a in db.get_addresses()] == ["New St 1"]
+        assert [r.first_name for r in db.get_all_residents()] == ["Petro"]
+
+    def test_reports_similar_names_at_same_address(self, db):
+        addr = db.add_address("Франка 2")
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Іван", last_name="Ковальчук"))
+        with db.BulkImporter(similar_score=0.5) as imp:
+            imp.add("Франка 2", _person("Ivan", "Kovalchyk"))
+            imp.add("Франка 2", _person("Petro", "Bilyi"))
+            imp.add("Main St 1", _person("Ivan", "Kovalchuk"))   # elsewhere: not a duplicate
+        assert imp.new_count == 3
+        assert [(r.last_name, name) for r, name, _ in imp.similar] == [("Kovalchyk", "Іван Ковальчук")]
+
+    def test_reports_similar_names_within_import(self, db):
+        with db.BulkImporter(similar_score=0.5, batch_size=100) as imp:
+            imp.add("Main St 1", _person("Olena", "Shevchuk"))
+            imp.add("Main St 1", _person("Olena", "Shevchyk"))
+        assert [(r.last_name, name) for r, name, _ in imp.similar] == [("Shevchyk", "Olena Shevchuk")]
+
+    def test_reports_closest_housemate(self, db):
+        addr = db.add_address("Франка 2")
+        for first, last in [("Петро", "Ковальчук"), ("Іван", "Ковальчук"), ("Іван", "Шевчук")]:
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name=first, last_name=last))
+        with db.BulkImporter(similar_score=0.5) as imp:
+            imp.add("Франка 2", _person("Ivan", "Kovalchyk"))
+        assert [name for _, name, _ in imp.similar] == ["Іван Ковальчук"]
+        assert imp.similar[0][2] == pytest.approx(db.name_similarity("Ivan Kovalchyk", "Іван Ковальчук"))
+
+    def test_shared_first_name_is_not_similar(self, db):
+        with db.BulkImporter(similar_score=0.6) as imp:
+            for last in ["Shevchuk", "Bondar", "Melnyk", "Tkachenko", "Kravets"]:
+                imp.add("Main St 1", _person("Ivan", last))
+        assert imp.similar == []
+
+    def test_similar_check_is_off_by_default(self, db):
+        with db.BulkImporter() as imp:
+            imp.add("Main St 1", _person("Olena", "Shevchuk"))
+            imp.add("Main St 1", _person("Olena", "Shevchyk"))
+        assert imp.similar == []
+
+    def test_keeps_derived_columns(self, db):
+        with db.BulkImporter() as imp:
+            imp.add("Франка 2", _person("Іван", "Ґудзь"))
+            imp.add("Франка 2", _person("Олег", "Гнатюк"))
+        assert [r.last_name for r in db.get_all_residents()] == ["Гнатюк", "Ґудзь"]
+        assert db.get_active_total() == 2
+        assert [r.last_name for r, _ in db.search_residents("gudz")] == ["Ґудзь"]
+        assert [r.last_name for r, _, _ in db.similar_residents("Gudz Ivan")] == ["Ґудзь"]
+
+    @staticmethod
+    def _trigram_rows(db):
+        conn = db.get_connection()
+        expected = {(g, r["id"]) for r in conn.execute("SELECT id, fuzzy_key FROM residents")
+                    for g in db._trigrams(r["fuzzy_key"])}
+        return set(map(tuple, conn.execute("SELECT gram, resident_id FROM resident_trigrams"))), expected
+
+    def test_indexes_trigrams_per_chunk(self, db, resident):
+        with db.BulkImporter(batch_size=2, commit_every=3) as imp:
+            for i in range(7):
+                imp.add("Франка 2", _person("Іван", f"Ковальчук {i}"))
+        stored, expected = self._trigram_rows(db)
+        assert stored == expected
+        assert db.get_connection().execute("SELECT COUNT(*) FROM trigrams_deferred").fetchone()[0] == 0
+
+    def test_failed_import_rearms_trigram_trigger(self, db, addr):
+        with pytest.raises(RuntimeError):
+            with db.BulkImporter(batch_size=1) as imp:
+                imp.add("Франка 2", _person("Іван", "Ґудзь"))
+                raise RuntimeError("boom")
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Олег", last_name="Гнатюк"))
+        stored, expected = self._trigram_rows(db)
+        assert stored == expected != set()
+
+
+# ── Name search ──────────────────────────────────────────────────────────────
+
+class TestSearchResidents:
+    def _names(self, db, query, **kw):
+        return [r.full_name for r, _street in db.search_residents(query, **kw)]
+
+    def test_latin_query_finds_cyrillic(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Іван", last_name="Коваленко"))
+        assert self._names(db, "koval") == ["Іван Коваленко"]
+
+    def test_cyrillic_query_finds_latin(self, db, addr, resident):
+        assert self._names(db, "Коваленко") == ["Ivan Kovalenko"]
+
+    def test_matches_across_first_and_last_name(self, db, addr, resident):
+        assert self._names(db, "ivan kov") == ["Ivan Kovalenko"]
+
+    def test_matches_family_names(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Olha", last_name="Bila",
+                                 father="Теодор Білий"))
+        assert self._names(db, "teodor") == ["Olha Bila"]
+
+    def test_returns_street(self, db, addr, resident):
+        assert db.search_residents("kovalenko")[0][1] == "Shevchenko 5"
+
+    def test_short_query(self, db, addr, resident):
+        assert self._names(db, "iv") == ["Ivan Kovalenko"]
+
+    def test_no_match(self, db, addr, resident):
+        assert db.search_residents("zzz") == []
+
+    def test_empty_query(self, db, addr, resident):
+        assert db.search_residents("   ") == []
+
+    def test_limit(self, db, addr):
+        for i in range(5):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name=f"Anna{i}", last_name="Melnyk"))
+        assert len(db.search_residents("melnyk", limit=3)) == 3
+
+    def test_follows_update(self, db, addr, resident):
+        resident.last_name = "Shevchuk"
+        db.update_resident(resident)
+        assert self._names(db, "kovalenko") == []
+        assert self._names(db, "шевчук") == ["Ivan Shevchuk"]
+
+    def test_follows_delete(self, db, addr, resident):
+        db.delete_resident(resident.id)
+        assert self._names(db, "kovalenko") == []
+
+    def test_other_romanisations_find_cyrillic(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Іван", last_name="Іванишин"))
+        for query in ("Iwanyszyn", "Ivanishin", "iwanysz"):
+            assert self._names(db, query) == ["Іван Іванишин"], query
+
+    def test_cyrillic_query_finds_other_romanisation(self, db, addr):
+        db.add_resident(Resident(id=None, address_id=addr.id, first_name="Taras", last_name="Schewtschenko"))
+        assert self._names(db, "Шевченко") == ["Taras Schewtschenko"]
+
+    def test_variants_are_one_statement(self, db, addr, resident):
+        db.search_residents("warm up")  # the FTS probe runs once per connection
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            found = db.search_residents("Kowalenko")
+        finally:
+            conn.set_trace_callback(None)
+        assert [r.full_name for r, _ in found] == ["Ivan Kovalenko"]
+        # One query over residents (the rest are FTS5 reading its own tables)
+        assert len([s for s in statements if "FROM resident_fts" in s]) == 1
+
+    def test_like_fallback_without_fts(self, tmp_path):
+        with patch("database.DB_PATH", str(tmp_path / "nofts.db")):
+            import database as _db
+            with patch.object(_db, "_has_fts5_trigram", lambda conn: False):
+                _db.init_db()
+            addr = _db.add_address("Main St 1")
+            _db.add_resident(Resident(id=None, address_id=addr.id, first_name="Іван", last_name="Коваленко"))
+            assert [r.last_name for r, _ in _db.search_residents("kovalen")] == ["Коваленко"]
+
+
+class TestIterSearchResidents:
+    @pytest.fixture
+    def melnyks(self, db, addr):
+        for i in range(7):
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name=f"Anna{i}", last_name="Melnyk"))
+
+    def test_batches_match_search_residents(self, db, melnyks):
+        batches = list(db.iter_search_residents("melnyk", batch_size=3))
+        assert [len(b) for b in batches] == [3, 3, 1]
+        flat = [(r.id, street) for batch in batches for r, street in batch]
+        assert flat == [(r.id, street) for r, street in db.search_residents("melnyk")]
+
+    def test_respects_limit(self, db, melnyks):
+        assert sum(len(b) for b in db.iter_search_residents("melnyk", limit=4, batch_size=3)) == 4
+
+    def test_empty_query(self, db, melnyks):
+        assert list(db.iter_search_residents("  ")) == []
+
+    def test_is_lazy(self, db, melnyks):
+        it = db.iter_search_residents("melnyk", batch_size=2)
+        assert len(next(it)) == 2
+        it.close()  # abandoning the search closes its cursor
+
+
+class TestNameSimilarity:
+    def test_same_name_across_scripts_and_order(self, db):
+        assert db.name_similarity("Іван Ковальчук", "kovalchuk ivan") == 1.0
+
+    def test_typo_scores_between(self, db):
+        assert 0.4 < db.name_similarity("Kovalchyk", "Ковальчук") < 1.0
+
+    def test_unrelated_names(self, db):
+        assert db.name_similarity("Petro Bilyi", "Olena Shevchuk") < 0.1
+
+    def test_empty(self, db):
+        assert db.name_similarity("", "Ivan") == 0.0
+
+
+class TestSimilarResidents:
+    def _names(self, db, query, **kw):
+        return [r.full_name for r, _street, _score in db.similar_residents(query, **kw)]
+
+    @pytest.fixture
+    def people(self, db, addr):
+        for first, last in [("Іван", "Ковальчук"), ("Петро", "Коваль"),
+                            ("Марія", "Шевчук"), ("Ivan", "Kovalenko")]:
+            db.add_resident(Resident(id=None, address_id=addr.id, first_name=first, last_name=last))
+
+    def test_typo_finds_cyrillic_name(self, db, people):
+        assert self._names(db, "Kovalchyk")[0] == "Іван Ковальчук"
+
+    def test_word_order_does_not_matter(self, db, people):
+        assert self._names(db, "Kovalchuk Ivan")[0] == "Іван Ковальчук"
+        assert db.similar_residents("Kovalchuk Ivan")[0][2] == 1.0
+
+    def test_ranked_best_first(self, db, people):
+        scores = [score for _, _, score in db.similar_residents("ivan kovalchyk")]
+        assert scores == sorted(scores, reverse=True)
+        assert self._names(db, "ivan kovalchyk")[:2] == ["Іван Ковальчук", "Ivan Kovalenko"]
+
+    def test_top_k(self, db, people):
+        assert len(db.similar_residents("Koval", limit=2, min_score=0.1)) == 2
+
+    def test_min_score(self, db, people):
+        assert db.similar_residents("Kovalchyk", min_score=0.9) == []
+        assert all(s >= 0.3 for _, _, s in db.similar_residents("koval"))
+
+    def test_address_filter(self, db, people):
+        other = db.add_address("Franka 2")
+        db.add_resident(Resident(id=None, address_id=other.id, first_name="Іван", last_name="Ковальчук"))
+        found = db.similar_residents("Kovalchuk Ivan", address_id=other.id)
+        assert [(r.address_id, street) for r, street, _ in found] == [(other.id, "Franka 2")]
+
+    def test_no_match(self, db, people):
+        assert db.similar_residents("zzz") == []
+        assert db.similar_residents("  ") == []
+
+    def test_follows_insert_update_and_delete(self, db, addr, resident):
+        assert self._names(db, "Kovalenko") == ["Ivan Kovalenko"]
+        resident.last_name = "Shevchuk"
+        db.update_resident(resident)
+        assert self._names(db, "Kovalenko") == []
+        assert self._names(db, "Shevchyk") == ["Ivan Shevchuk"]
+        db.delete_resident(resident.id)
+        assert self._names(db, "Shevchyk") == []
+
+    def test_rename_replaces_exactly_its_trigrams(self, db, addr, resident, people):
+        def rows(where, *params):
+            return set(map(tuple, db.get_connection().execute(
+                f"SELECT gram, resident_id FROM resident_trigrams WHERE {where}", params)))
+
+        others = rows("resident_id <> ?", resident.id)
+        resident.last_name = "Shevchuk"
+        db.update_resident(resident)
+        assert rows("resident_id = ?", resident.id) == {
+            (g, resident.id) for g in db._trigrams(db._fuzzy_key("Ivan Shevchuk"))}
+        db.delete_resident(resident.id)
+        assert rows("1") == others
+
+    def test_index_follows_address_delete(self, db, addr, people):
+        db.delete_address(addr.id)
+        assert db.get_connection().execute("SELECT COUNT(*) FROM resident_trigrams").fetchone()[0] == 0
+
+    def test_unchanged_name_keeps_trigrams(self, db, addr, resident):
+        conn = db.get_connection()
+        grams = conn.execute("SELECT COUNT(*) FROM resident_trigrams").fetchone()[0]
+        before = conn.total_changes
+        resident.notes = "moved in 2020"
+        db.update_resident(resident)
+        # Rewriting the trigrams alone would change 2 * grams rows
+        assert conn.total_changes - before < grams
+
+
 # ── Events ────────────────────────────────────────────────────────────────────
 
 class TestEvents:
@@ -287,3 +1271,81 @@ class TestEvents:
                            event_type="birth", event_date="1980-04-10"))
         db.delete_resident(resident.id)
         assert db.get_events_for_address(addr.id) == []
+
+
+class TestRowDecoding:
+    def test_empty_optional_text_is_normalised(self, db, addr):
+        conn = db.get_connection()
+        with conn:
+            conn.execute("""INSERT INTO residents (address_id, first_name, last_name, father, notes)
+                            VALUES (?, 'Ivan', 'Koval', '', NULL)""", (addr.id,))
+        r = db.get_residents(addr.id)[0]
+        assert (r.father, r.mother, r.spouse, r.notes) == (None, None, None, "")
+
+    def test_missing_columns_get_defaults(self, db, resident):
+        cur = db.get_connection().execute(
+            "SELECT last_name, first_name, id, address_id FROM residents")
+        r = db._row_decoder(cur, Resident)(cur.fetchone())
+        assert r == Resident(id=resident.id, address_id=resident.address_id,
+                             first_name="Ivan", last_name="Kovalenko")
+
+    def test_extra_columns(self, db, resident):
+        cur = db.get_connection().execute(
+            f"SELECT {db._RESIDENT_COLUMNS}, 'x' AS street, 0.5 AS score FROM residents")
+        r, street, score = db._row_decoder(cur, Resident, ("street", "score"))(cur.fetchone())
+        assert (r.full_name, street, score) == ("Ivan Kovalenko", "x", 0.5)
+
+    def test_layout_resolved_once(self, db, resident):
+        conn = db.get_connection()
+        sql = f"SELECT {db._RESIDENT_COLUMNS} FROM residents"
+        first = db._row_decoder(conn.execute(sql), Resident)
+        assert db._row_decoder(conn.execute(sql), Resident) is first
+
+    def test_unknown_model_rejected(self, db):
+        cur = db.get_connection().execute("SELECT id, street FROM addresses")
+        with pytest.raises(TypeError):
+            db._row_decoder(cur, Address)
+
+    @pytest.mark.benchmark
+    def test_decoding_benchmark(self, db, addr):
+        """Benchmark: on the same 100k rows and columns, positional decoding beats by-name sqlite3.Row."""
+        conn = db.get_connection()
+        with conn:
+            conn.execute("""WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000)
+                            INSERT INTO residents (address_id, first_name, last_name, birth_date, father)
+                            SELECT ?, 'First' || i, 'Last' || (i % 5000), '1990-01-01',
+                                   CASE WHEN i % 3 THEN 'Petro' ELSE '' END FROM n""", (addr.id,))
+        sql = f"SELECT {db._RESIDENT_COLUMNS} FROM residents ORDER BY last_sort, first_sort"
+        named_rows = conn.execute(sql).fetchall()
+        cur = conn.execute(sql)
+        decode = db._row_decoder(cur, Resident)
+        plain_rows = cur.fetchall()
+
+        def by_name():
+            # The per-row lookup that get_all_residents() used to do.
+            out = []
+            for r in named_rows:
+                keys = r.keys()
+                out.append(Resident(
+                    id=r["id"], address_id=r["address_id"], first_name=r["first_name"],
+                    last_name=r["last_name"], birth_date=r["birth_date"],
+                    baptism_date=r["baptism_date"], marriage_date=r["marriage_date"],
+                    death_date=r["death_date"], status=r["status"],
+                    father=r["father"] or None if "father" in keys else None,
+                    mother=r["mother"] or None if "mother" in keys else None,
+                    spouse=r["spouse"] or None if "spouse" in keys else None,
+                    notes=r["notes"] or ""))
+            return out
+
+        def timed(fn):
+            best, result = float("inf"), None
+            for _ in range(3):
+                start = time.perf_counter()
+                result = fn()
+                best = min(best, time.perf_counter() - start)
+            return best, result
+        old, expected = timed(by_name)
+        new, residents = timed(lambda: list(map(decode, plain_rows)))
+        assert residents == expected == db.get_all_residents()
+        # Measured about 3x; the margin leaves room for a busy machine.
+        assert new * 1.5 < old, f"{new / 1e5 * 1e6:.2f} µs/row vs {old / 1e5 * 1e6:.2f} µs/row"
@@ -83,13 +83,12 @@ class TestDateOrNone:
 class TestResidentRow:
     def _call(self, resident, addresses=None):
         import export as exp
-        exp._ADDRESS_CACHE.clear()
         if addresses is None:
             addresses = [Address(id=resident.address_id, street="Test St 1")]
         mock_db = MagicMock()
-        mock_db.get_addresses.return_value = addresses
+        mock_db.get_address_streets.return_value = {a.id: a.street for a in addresses}
         with patch.dict("sys.modules", {"database": mock_db}):
-            return exp._resident_row(resident)
+            return exp._resident_row(resident, exp.AddressResolver())
 
     def test_active_status_label(self):
         lang.set_lang("en")
@@ -112,12 +111,11 @@ class TestResidentRow:
     def test_ukrainian_status_deceased(self):
         lang.set_lang("uk")
         import export as exp
-        exp._ADDRESS_CACHE.clear()
         r = _make_resident(status="deceased")
         mock_db = MagicMock()
-        mock_db.get_addresses.return_value = [Address(id=1, street="Test St 1")]
+        mock_db.get_address_streets.return_value = {a.id: a.street for a in [Address(id=1, street="Test St 1")]}
         with patch.dict("sys.modules", {"database": mock_db}):
-            row = exp._resident_row(r)
+            row = exp._resident_row(r, exp.AddressResolver())
         assert row[3] == "помер"
 
     def test_date_fields_empty_when_none(self):
@@ -150,12 +148,11 @@ class TestResidentRow:
 class TestExportCsv:
     def _export_and_read(self, tmp_path, residents, addresses=None):
         import export as exp
-        exp._ADDRESS_CACHE.clear()
         if addresses is None:
             addresses = [Address(id=1, street="Main St 1")]
         path = str(tmp_path / "out.csv")
         mock_db = MagicMock()
-        mock_db.get_addresses.return_value = addresses
+        mock_db.get_address_streets.return_value = {a.id: a.street for a in addresses}
         with patch.dict("sys.modules", {"database": mock_db}):
             exp.export_csv(path, residents)
         with open(path, "r", encoding="utf-8") as f:
@@ -171,23 +168,170 @@ class TestExportCsv:
         rows = self._export_and_read(tmp_path, residents)
         assert len(rows) == 4  # 1 header + 3 data
 
-    def test_data_sorted_by_last_then_first(self, tmp_path):
+    def test_data_keeps_register_order(self, tmp_path):
         residents = [
-            _make_resident(first_name="Zoriana", last_name="Bila"),
-            _make_resident(first_name="Anna", last_name="Bila"),
-            _make_resident(first_name="Ivan", last_name="Adamenko"),
+            _make_resident(first_name="Ivan", last_name="Гнатюк"),
+            _make_resident(first_name="Anna", last_name="Ґудзь"),
+            _make_resident(first_name="Zoriana", last_name="Єрмак"),
         ]
         rows = self._export_and_read(tmp_path, residents)
         last_names = [r[0] for r in rows[1:]]
-        assert last_names[0] == "Adamenko"
-        assert last_names[1] == "Bila"
+        assert last_names == ["Гнатюк", "Ґудзь", "Єрмак"]
 
-    def test_clears_address_cache_before_export(self, tmp_path):
+    def test_fresh_address_lookup_per_export(self, tmp_path):
+        first = self._export_and_read(tmp_path, [_make_resident()], [Address(id=1, street="Old St 1")])
+        second = self._export_and_read(tmp_path, [_make_resident()], [Address(id=1, street="New St 1")])
+        assert (first[1][2], second[1][2]) == ("Old St 1", "New St 1")
+
+    def test_accepts_iterator_and_returns_count(self, tmp_path):
+        import export as exp
+        path = str(tmp_path / "gen.csv")
+        mock_db = MagicMock()
+        mock_db.get_address_streets.return_value = {a.id: a.street for a in [Address(id=1, street="Main St 1")]}
+        with patch.dict("sys.modules", {"database": mock_db}):
+            count = exp.export_csv(path, (_make_resident(id=i) for i in range(4)))
+        assert count == 4
+        with open(path, encoding="utf-8") as f:
+            assert len(list(csv.reader(f))) == 5
+
+
+# ── Address resolver ──────────────────────────────────────────────────────────
+
+class TestAddressResolver:
+    @pytest.fixture
+    def streets(self, db):
+        return [db.add_address(f"Street {i}") for i in range(4)]
+
+    def test_resolves_streets_with_one_query(self, db, streets):
+        import export as exp
+        res = exp.AddressResolver()
+        assert [res.street(a.id) for a in streets * 3] == [a.street for a in streets * 3]
+        assert res.stats()["loads"] == 1
+        assert res.stats()["lookups"] == 12
+
+    def test_unknown_id_is_blank_without_query_when_table_fits(self, db, streets):
+        import export as exp
+        res = exp.AddressResolver()
+        assert res.street(9999) == ""
+        assert res.street(9999) == ""
+        assert (res.loads, res.misses) == (1, 2)
+
+    def test_misses_cached_when_table_exceeds_bound(self, db, streets):
+        import export as exp
+        res = exp.AddressResolver(max_size=2)
+        assert res.street(9999) == ""
+        assert res.street(9999) == ""
+        assert (res.loads, res.misses) == (2, 2)
+
+    def test_bounded_lru(self, db, streets):
+        import export as exp
+        res = exp.AddressResolver(max_size=2)
+        for a in streets:
+            assert res.street(a.id) == a.street
+        assert res.stats()["size"] == 2
+        assert res.evictions > 0
+
+    @staticmethod
+    def _orphaned_rows(db):
+        real = [db.add_address(f"Street {i}") for i in range(50)]
+        return [_make_resident(id=i, address_id=real[i % 50].id if i % 4 else 100000 + i % 200)
+                for i in range(4000)]
+
+    def test_orphaned_ids_regression(self, db, tmp_path):
+        """Many rows pointing at deleted addresses must not reload the table."""
+        import export as exp
+        residents = self._orphaned_rows(db)
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            for size in (exp.ADDRESS_CACHE_SIZE, 16):
+                res = exp.AddressResolver(max_size=size)
+                exp.export_csv(str(tmp_path / "orphans.csv"), residents, res)
+                if size > 50:
+                    assert res.loads == 1
+                assert res.misses == 1000
+        finally:
+            conn.set_trace_callback(None)
+        # Fits in the bound: one query for the whole export.  Too small a
+        # bound: one single-row query per load after the first, never a reload.
+        full_loads = [s for s in statements if "LIMIT" in s and "FROM addresses" in s]
+        assert len(full_loads) == 2
+        single = [s for s in statements if "FROM addresses WHERE id=" in s]
+        assert len(single) == res.loads - 1
+        assert not any("ORDER BY street_sort" in s for s in statements)
+
+    @pytest.mark.benchmark
+    def test_orphaned_ids_benchmark(self, db, tmp_path):
+        """Benchmark: 4 000 rows with orphaned address ids export in well under 5 s either way."""
+        import time
         import export as exp
-        exp._ADDRESS_CACHE[9999] = "stale"
-        residents = [_make_resident()]
-        self._export_and_read(tmp_path, residents)
-        assert 9999 not in exp._ADDRESS_CACHE
+        residents = self._orphaned_rows(db)
+        for size in (exp.ADDRESS_CACHE_SIZE, 16):
+            start = time.perf_counter()
+            exp.export_csv(str(tmp_path / "orphans.csv"), residents,
+                           exp.AddressResolver(max_size=size))
+            elapsed = time.perf_counter() - start
+            assert elapsed < 5, f"max_size={size}: {elapsed:.2f}s"
+
+
+# ── Streaming CSV export from the database ────────────────────────────────────
+
+class TestExportCsvFromDb:
+    def _read(self, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def _populate(self, db):
+        a = db.add_address("Shevchenka 1")
+        b = db.add_address("Franka 2")
+        db.add_resident(_make_resident(id=None, address_id=b.id, first_name="Петро",
+                                       last_name="Ярошенко", birth_date="1950-02-03"))
+        db.add_resident(_make_resident(id=None, address_id=a.id, first_name="Олена",
+                                       last_name="Гнатюк", status="left", notes="note"))
+        db.add_resident(_make_resident(id=None, address_id=a.id, first_name="Іван",
+                                       last_name="Ґудзь", status="deceased",
+                                       death_date="2020-01-01"))
+
+    def test_matches_list_export(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        streamed, listed = str(tmp_path / "s.csv"), str(tmp_path / "l.csv")
+        assert exp.export_csv_from_db(streamed) == 3
+        exp.export_csv(listed, db.get_all_residents())
+        assert self._read(streamed) == self._read(listed)
+
+    def test_ukrainian_alphabetical_order(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        path = str(tmp_path / "out.csv")
+        exp.export_csv_from_db(path)
+        assert [row[0] for row in self._read(path)[1:]] == ["Гнатюк", "Ґудзь", "Ярошенко"]
+
+    def test_orphaned_address_writes_blank_street(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        conn = db.get_connection()
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("UPDATE residents SET address_id = 9999 WHERE last_name = 'Ярошенко'")
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = ON")
+        path = str(tmp_path / "out.csv")
+        exp.export_csv_from_db(path)
+        assert self._read(path)[3][:3] == ["Ярошенко", "Петро", ""]
+
+    def test_does_not_build_resident_objects(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        with patch.object(db, "_row_decoder", side_effect=AssertionError), \
+             patch.object(db, "get_addresses", side_effect=AssertionError):
+            assert exp.export_csv_from_db(str(tmp_path / "out.csv")) == 3
+
+    def test_empty_register_writes_header_only(self, db, tmp_path):
+        import export as exp
+        path = str(tmp_path / "out.csv")
+        assert exp.export_csv_from_db(path) == 0
+        assert len(self._read(path)) == 1
 
 
 # ── CSV import via _import_rows ───────────────────────────────────────────────
@@ -195,7 +339,6 @@ class TestExportCsv:
 class TestImportRows:
     def _run(self, db, rows):
         import export as exp
-        exp._ADDRESS_CACHE.clear()
         with patch("export.db", db, create=True):
             # _import_rows imports `database as db` internally, so patch at module level
             with patch("database.DB_PATH", db.DB_PATH if hasattr(db, "DB_PATH") else ":memory:"):
@@ -236,6 +379,30 @@ class TestImportRows:
         assert skip == 1
         assert new == 0
 
+    def test_reports_similar_names(self, tmp_path):
+        import export as exp
+        with patch("database.DB_PATH", str(tmp_path / "similar.db")):
+            import database as _db
+            _db.init_db()
+            exp._import_rows([["Ковальчук", "Іван", "Main St 1"]])
+            similar = []
+            counts = exp._import_rows([
+                ["Kovalchyk", "Ivan", "Main St 1"],   # typo in the other script
+                ["Kovalchyk", "Ivan", "Main St 2"],   # nobody there yet
+            ], on_similar=similar.extend)
+        assert counts == (2, 0)
+        assert [(r.last_name, name) for r, name, _ in similar] == [("Kovalchyk", "Іван Ковальчук")]
+
+    def test_similar_check_is_opt_in(self, tmp_path):
+        import export as exp
+        with patch("database.DB_PATH", str(tmp_path / "similar.db")), \
+             patch("database.BulkImporter._check_similar") as check:
+            import database as _db
+            _db.init_db()
+            exp._import_rows([["Ковальчук", "Іван", "Main St 1"],
+                              ["Kovalchyk", "Ivan", "Main St 1"]])
+        check.assert_not_called()
+
     def test_status_mapping_ukrainian(self, tmp_path):
         import export as exp
         db_path = str(tmp_path / "test3.db")
@@ -259,6 +426,33 @@ class TestImportRows:
             residents = _db.get_all_residents()
         assert residents[0].status == "deceased"
 
+    def test_duplicate_rows_in_one_file(self, tmp_path):
+        import export as exp
+        with patch("database.DB_PATH", str(tmp_path / "dup.db")):
+            import database as _db
+            _db.init_db()
+            rows = [["Ковальчук", "Іван", "вул. Шевченка 5"],
+                    ["КОВАЛЬЧУК", "ІВАН", "ВУЛ. ШЕВЧЕНКА 5"],
+                    ["Ковальчук", "Олена", "вул. Шевченка 5"]]
+            new, skip = exp._import_rows(rows)
+            assert len(_db.get_addresses()) == 1
+        assert (new, skip) == (2, 1)
+
+    def test_failure_rolls_back_whole_import(self, tmp_path):
+        import export as exp
+
+        def rows():
+            yield ["Kovalenko", "Ivan", "Main St 1"]
+            raise ValueError("corrupt file")
+
+        with patch("database.DB_PATH", str(tmp_path / "rb.db")):
+            import database as _db
+            _db.init_db()
+            with pytest.raises(ValueError):
+                exp._import_rows(rows())
+            assert _db.get_all_residents() == []
+            assert _db.get_addresses() == []
+
     def test_unknown_status_defaults_to_active(self, tmp_path):
         import export as exp
         db_path = str(tmp_path / "test5.db")
@@ -271,6 +465,85 @@ class TestImportRows:
         assert residents[0].status == "active"
 
 
+# ── Streaming CSV import ──────────────────────────────────────────────────────
+
+class TestImportCsvStreaming:
+    def _write_csv(self, tmp_path, rows, name="in.csv"):
+        path = str(tmp_path / name)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Last", "First", "Address"])
+            writer.writerows(rows)
+        return path
+
+    def test_parse_rows_is_lazy(self):
+        import export as exp
+        pulled = []
+
+        def rows():
+            for i in range(3):
+                pulled.append(i)
+                yield [f"Last{i}", "First", "Main St 1"]
+
+        parsed = exp._parse_rows(rows())
+        street, res = next(parsed)
+        assert pulled == [0]
+        assert (street, res.last_name) == ("Main St 1", "Last0")
+
+    def test_chunked_commit_keeps_completed_chunks(self, tmp_path):
+        import export as exp
+
+        def rows():
+            for i in range(5):
+                yield [f"Last{i}", "First", "Main St 1"]
+            raise ValueError("truncated file")
+
+        with patch("database.DB_PATH", str(tmp_path / "chunks.db")):
+            import database as _db
+            _db.init_db()
+            with pytest.raises(ValueError):
+                exp._import_rows(rows(), commit_every=2)
+            assert len(_db.get_all_residents()) == 4
+
+    def test_failed_file_import_keeps_nothing(self, tmp_path):
+        import export as exp
+        path = self._write_csv(tmp_path, [[f"Last{i}", "First", f"Street {i}"] for i in range(7)])
+
+        def fail_at_end(done, total):
+            if done == 7:
+                raise ValueError("stopped")
+        with patch("database.DB_PATH", str(tmp_path / "undo.db")):
+            import database as _db
+            _db.init_db()
+            with pytest.raises(ValueError):
+                exp.import_csv(path, commit_every=3, progress=fail_at_end)
+            assert _db.get_all_residents() == []
+            assert _db.get_addresses() == []
+
+    def test_rerun_after_failure_skips_committed(self, tmp_path):
+        import export as exp
+        path = self._write_csv(tmp_path, [[f"Last{i}", "First", "Main St 1"] for i in range(7)])
+        with patch("database.DB_PATH", str(tmp_path / "rerun.db")):
+            import database as _db
+            _db.init_db()
+            with _db.BulkImporter(commit_every=3) as imp:
+                for i in range(3):
+                    imp.add("Main St 1", Resident(id=None, address_id=0,
+                                                  first_name="First", last_name=f"Last{i}"))
+            new, skip = exp.import_csv(path, commit_every=3)
+        assert (new, skip) == (4, 3)
+
+    def test_multiline_quoted_field(self, tmp_path):
+        import export as exp
+        path = self._write_csv(tmp_path, [["Bila", "Olha", "Main St 1", "active",
+                                           "", "", "", "", "line one\nline two"]])
+        with patch("database.DB_PATH", str(tmp_path / "ml.db")):
+            import database as _db
+            _db.init_db()
+            assert exp.import_csv(path) == (1, 0)
+            assert _db.get_all_residents()[0].notes == "line one\nline two"
+
+
 # ── Full CSV round-trip ───────────────────────────────────────────────────────
 
 class TestCsvRoundTrip:
@@ -294,9 +567,8 @@ class TestCsvRoundTrip:
             import database as _db
             residents = _db.get_all_residents()
             addresses = _db.get_addresses()
-            exp._ADDRESS_CACHE.clear()
             mock_db = MagicMock()
-            mock_db.get_addresses.return_value = addresses
+            mock_db.get_address_streets.return_value = {a.id: a.street for a in addresses}
             with patch.dict("sys.modules", {"database": mock_db}):
                 exp.export_csv(csv_path, residents)
 
@@ -321,12 +593,11 @@ class TestExportExcel:
     def _export_and_read_ws(self, tmp_path, residents, addresses=None):
         import export as exp
         import openpyxl
-        exp._ADDRESS_CACHE.clear()
         if addresses is None:
             addresses = [Address(id=1, street="Main St 1")]
         path = str(tmp_path / "out.xlsx")
         mock_db = MagicMock()
-        mock_db.get_addresses.return_value = addresses
+        mock_db.get_address_streets.return_value = {a.id: a.street for a in addresses}
         with patch.dict("sys.modules", {"database": mock_db}):
             exp.export_excel(path, residents)
         return openpyxl.load_workbook(path).active, path
@@ -335,7 +606,7 @@ class TestExportExcel:
         import export as exp
         path = str(tmp_path / "out.xlsx")
         mock_db = MagicMock()
-        mock_db.get_addresses.return_value = [Address(id=1, street="Main St 1")]
+        mock_db.get_address_streets.return_value = {a.id: a.street for a in [Address(id=1, street="Main St 1")]}
         with patch.dict("sys.modules", {"database": mock_db}):
             exp.export_excel(path, [])
         assert os.path.exists(path)
@@ -358,15 +629,16 @@ class TestExportExcel:
         ws, _ = self._export_and_read_ws(tmp_path, [])
         assert ws.max_row == 1
 
-    def test_data_sorted_by_last_then_first(self, tmp_path):
+    def test_data_keeps_register_order(self, tmp_path):
         residents = [
-            _make_resident(first_name="Zoriana", last_name="Bila"),
-            _make_resident(first_name="Anna",    last_name="Bila"),
-            _make_resident(first_name="Ivan",    last_name="Adamenko"),
+            _make_resident(first_name="Ivan",    last_name="Гнатюк"),
+            _make_resident(first_name="Anna",    last_name="Ґудзь"),
+            _make_resident(first_name="Zoriana", last_name="Єрмак"),
         ]
         ws, _ = self._export_and_read_ws(tmp_path, residents)
-        assert ws.cell(row=2, column=1).value == "Adamenko"
-        assert ws.cell(row=3, column=1).value == "Bila"
+        assert ws.cell(row=2, column=1).value == "Гнатюк"
+        assert ws.cell(row=3, column=1).value == "Ґудзь"
+        assert ws.cell(row=4, column=1).value == "Єрмак"
 
     def test_date_fields_written(self, tmp_path):
         r = _make_resident(
@@ -380,11 +652,11 @@ class TestExportExcel:
         # openpyxl stores empty strings as None when read back
         assert ws.cell(row=2, column=8).value in (None, "")
 
-    def test_clears_address_cache_before_export(self, tmp_path):
-        import export as exp
-        exp._ADDRESS_CACHE[9999] = "stale"
-        self._export_and_read_ws(tmp_path, [_make_resident()])
-        assert 9999 not in exp._ADDRESS_CACHE
+    def test_fresh_address_lookup_per_export(self, tmp_path):
+        ws, _ = self._export_and_read_ws(tmp_path, [_make_resident()], [Address(id=1, street="Old St 1")])
+        assert ws.cell(row=2, column=3).value == "Old St 1"
+        ws, _ = self._export_and_read_ws(tmp_path, [_make_resident()], [Address(id=1, street="New St 1")])
+        assert ws.cell(row=2, column=3).value == "New St 1"
 
     def test_raises_runtime_error_without_openpyxl(self, tmp_path):
         import export as exp
@@ -394,6 +666,138 @@ class TestExportExcel:
                 exp.export_excel(path, [])
 
 
+class TestExportExcelFromDb:
+    def _populate(self, db):
+        a = db.add_address("Shevchenka 1")
+        db.add_resident(_make_resident(id=None, address_id=a.id, first_name="Петро",
+                                       last_name="Ярошенко", birth_date="1950-02-03",
+                                       notes="A fairly long note that should widen the column"))
+        db.add_resident(_make_resident(id=None, address_id=a.id, first_name="Олена",
+                                       last_name="Гнатюк", status="left"))
+
+    def _values(self, path):
+        ws = openpyxl.load_workbook(path).active
+        return [[c.value for c in row] for row in ws.iter_rows()]
+
+    def test_matches_list_export(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        streamed, listed = str(tmp_path / "s.xlsx"), str(tmp_path / "l.xlsx")
+        assert exp.export_excel_from_db(streamed) == 2
+        exp.export_excel(listed, db.get_all_residents())
+        assert self._values(streamed) == self._values(listed)
+        assert [row[0] for row in self._values(streamed)[1:]] == ["Гнатюк", "Ярошенко"]
+
+    def test_header_cells_share_one_named_style(self, db, tmp_path):
+        import export as exp
+        path = str(tmp_path / "out.xlsx")
+        exp.export_excel_from_db(path)
+        ws = openpyxl.load_workbook(path).active
+        assert {c.style for c in ws[1]} == {exp._HEADER_STYLE}
+        assert ws.cell(row=1, column=1).font.bold is True
+
+    def test_uses_write_only_workbook(self, db, tmp_path):
+        import export as exp
+        with patch("openpyxl.Workbook", wraps=openpyxl.Workbook) as wb:
+            exp.export_excel_from_db(str(tmp_path / "out.xlsx"))
+        wb.assert_called_once_with(write_only=True)
+
+    def test_column_widths_fit_content(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        path = str(tmp_path / "out.xlsx")
+        exp.export_excel_from_db(path)
+        dims = openpyxl.load_workbook(path).active.column_dimensions
+        assert dims["A"].width == len("Last Name") + 4
+        assert dims["I"].width == 40  # capped
+
+    def test_widths_sampled_from_leading_rows(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        path = str(tmp_path / "out.xlsx")
+        with patch.object(exp, "EXCEL_WIDTH_SAMPLE", 1):
+            assert exp.export_excel_from_db(path) == 2
+        ws = openpyxl.load_workbook(path).active
+        assert ws.max_row == 3
+        assert ws.column_dimensions["I"].width == len("Notes") + 4
+
+    def test_empty_cells_not_written(self, db, tmp_path):
+        import export as exp
+        self._populate(db)
+        path = str(tmp_path / "out.xlsx")
+        exp.export_excel_from_db(path)
+        assert openpyxl.load_workbook(path).active.cell(row=2, column=5).value is None  # Гнатюк has no birth date
+
+
+# ── Progress reporting ────────────────────────────────────────────────────────
+
+class TestProgress:
+    def test_reports_every_n_rows_and_at_end(self):
+        import export as exp
+        calls = []
+        rows = list(exp._reporting(range(1201), lambda d, t: calls.append((d, t)), 1201))
+        assert rows == list(range(1201))
+        assert calls == [(0, 1201), (500, 1201), (1000, 1201), (1201, 1201)]
+
+    def test_no_callback_passes_rows_through(self):
+        import export as exp
+        assert list(exp._reporting(iter("abc"), None)) == ["a", "b", "c"]
+
+    def test_csv_export_reports_total(self, db, tmp_path):
+        import export as exp
+        addr = db.add_address("Main St 1")
+        for i in range(3):
+            db.add_resident(_make_resident(id=None, address_id=addr.id, first_name=f"F{i}"))
+        calls = []
+        exp.export_csv_from_db(str(tmp_path / "out.csv"), progress=lambda d, t: calls.append((d, t)))
+        assert calls[-1] == (3, 3)
+
+    def test_excel_import_total_from_sheet_dimensions(self, db, tmp_path):
+        import export as exp
+        wb = openpyxl.Workbook()
+        wb.active.append(["Last Name", "First Name", "Address"])
+        for i in range(4):
+            wb.active.append([f"L{i}", f"F{i}", "Main St 1"])
+        path = str(tmp_path / "in.xlsx")
+        wb.save(path)
+        calls = []
+        exp.import_excel(path, progress=lambda d, t: calls.append((d, t)))
+        assert calls[-1] == (4, 4)
+
+    def test_failed_export_leaves_no_file(self, db, tmp_path):
+        import export as exp
+        db.add_resident(_make_resident(id=None, address_id=db.add_address("Main St 1").id))
+        out = tmp_path / "exports"
+        out.mkdir()
+
+        def fail(done, total):
+            if done:
+                raise RuntimeError("disk full")
+        with pytest.raises(RuntimeError):
+            exp.export_csv_from_db(str(out / "out.csv"), progress=fail)
+        assert os.listdir(out) == []
+
+    @pytest.mark.parametrize("name, export", [
+        ("out.csv", "export_csv_from_db"),
+        ("out.xlsx", "export_excel_from_db"),
+    ])
+    def test_failed_export_keeps_previous_file(self, db, tmp_path, name, export):
+        import export as exp
+        db.add_resident(_make_resident(id=None, address_id=db.add_address("Main St 1").id))
+        out = tmp_path / "exports"
+        out.mkdir()
+        path = out / name
+        path.write_bytes(b"last week's export")
+
+        def fail(done, total):
+            if done:
+                raise RuntimeError("disk full")
+        with pytest.raises(RuntimeError):
+            getattr(exp, export)(str(path), progress=fail)
+        assert path.read_bytes() == b"last week's export"
+        assert os.listdir(out) == [name]
+
+
 # ── Excel import ──────────────────────────────────────────────────────────────
 
 class TestImportExcel:
@@ -529,6 +933,71 @@ class TestImportExcel:
         assert new == 0
 
 
+class TestImportExcelSheets:
+    def _make_workbook(self, tmp_path, sheets):
+        import openpyxl
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for title, rows in sheets.items():
+            ws = wb.create_sheet(title)
+            ws.append(["Last Name", "First Name", "Address"])
+            for row in rows:
+                ws.append(row)
+        path = str(tmp_path / "archive.xlsx")
+        wb.save(path)
+        return path
+
+    def _import(self, tmp_path, path, **kw):
+        import export as exp
+        with patch("database.DB_PATH", str(tmp_path / "sheets.db")):
+            import database as _db
+            _db.init_db()
+            counts = exp.import_excel(path, **kw)
+            names = sorted(r.last_name for r in _db.get_all_residents())
+        return counts, names
+
+    def _archive(self, tmp_path):
+        return self._make_workbook(tmp_path, {
+            "Shevchenka": [["Bila", "Olha", "Shevchenka 1"], ["Sirko", "Ivan", "Shevchenka 2"]],
+            "Franka":     [["Melnyk", "Petro", "Franka 1"]],
+            "Lesi":       [["Tkach", "Anna", "Lesi Ukrainky 3"], ["Bila", "Olha", "Shevchenka 1"]],
+        })
+
+    def test_sheet_names(self, tmp_path):
+        import export as exp
+        assert exp.excel_sheet_names(self._archive(tmp_path)) == ["Shevchenka", "Franka", "Lesi"]
+
+    def test_default_imports_active_sheet_only(self, tmp_path):
+        counts, names = self._import(tmp_path, self._archive(tmp_path))
+        assert counts == (2, 0)
+        assert names == ["Bila", "Sirko"]
+
+    def test_all_sheets(self, tmp_path):
+        counts, names = self._import(tmp_path, self._archive(tmp_path), all_sheets=True)
+        assert counts == (4, 1)  # Bila repeats on the last sheet
+        assert names == ["Bila", "Melnyk", "Sirko", "Tkach"]
+
+    def test_chosen_sheets(self, tmp_path):
+        counts, names = self._import(tmp_path, self._archive(tmp_path), sheets=["Franka", "Lesi"])
+        assert counts == (3, 0)
+        assert names == ["Bila", "Melnyk", "Tkach"]
+
+    def test_unknown_sheet_raises(self, tmp_path):
+        with pytest.raises(ValueError, match="Nowhere"):
+            self._import(tmp_path, self._archive(tmp_path), sheets=["Franka", "Nowhere"])
+
+    def test_empty_cells_read_as_blank(self, tmp_path):
+        path = self._make_workbook(tmp_path, {"S": [["Bila", "Olha", "Shevchenka 1", None, None]]})
+        with patch("database.DB_PATH", str(tmp_path / "blank.db")):
+            import database as _db
+            _db.init_db()
+            import export as exp
+            exp.import_excel(path)
+            r = _db.get_all_residents()[0]
+        assert r.birth_date is None
+        assert r.status == "active"
+
+
 # ── Full Excel round-trip ─────────────────────────────────────────────────────
 
 class TestExcelRoundTrip:
@@ -554,9 +1023,8 @@ class TestExcelRoundTrip:
             import database as _db
             residents = _db.get_all_residents()
             addresses = _db.get_addresses()
-            exp._ADDRESS_CACHE.clear()
             mock_db = MagicMock()
-            mock_db.get_addresses.return_value = addresses
+            mock_db.get_address_streets.return_value = {a.id: a.street for a in addresses}
             with patch.dict("sys.modules", {"database": mock_db}):
                 exp.export_excel(xlsx_path, residents)
 
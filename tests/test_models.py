@@ -1,4 +1,8 @@
 """Tests for models.py — Address, Resident, Event dataclasses."""
+import dataclasses
+import pickle
+import tracemalloc
+
 import pytest
 from models import Address, Resident, Event
 
@@ -99,3 +103,50 @@ class TestEvent:
     def test_id_can_be_none(self):
         ev = Event(id=None, resident_id=1, event_type="death", event_date="2023-01-01")
         assert ev.id is None
+
+
+class TestSlots:
+    @pytest.mark.parametrize("obj", [
+        Address(id=1, street="Main St 5"),
+        Resident(id=1, address_id=10, first_name="Ivan", last_name="Kovalenko"),
+        Event(id=1, resident_id=5, event_type="birth", event_date="1990-03-10"),
+    ])
+    def test_no_instance_dict(self, obj):
+        assert not hasattr(obj, "__dict__")
+        assert type(obj).__slots__ == tuple(f.name for f in dataclasses.fields(obj))
+
+    def test_unknown_attribute_rejected(self):
+        r = Resident(id=1, address_id=10, first_name="Ivan", last_name="Kovalenko")
+        with pytest.raises(AttributeError):
+            r.middle_name = "Petrovych"
+
+    def test_fields_stay_mutable(self):
+        addr = Address(id=1, street="Main St 5")
+        addr.street = "Main St 7"
+        assert addr.street == "Main St 7"
+
+    def test_dataclass_behaviour_kept(self):
+        r = Resident(id=1, address_id=10, first_name="Ivan", last_name="Kovalenko", spouse="Olena")
+        assert r == Resident(id=1, address_id=10, first_name="Ivan", last_name="Kovalenko", spouse="Olena")
+        assert "first_name='Ivan'" in repr(r)
+        assert dataclasses.replace(r, first_name="Petro").full_name == "Petro Kovalenko"
+        assert pickle.loads(pickle.dumps(r)) == r
+        assert r.is_married
+
+    def test_memory_benchmark(self):
+        """Benchmark: 100k slotted residents take clearly less memory than with a __dict__ each."""
+        plain = dataclasses.make_dataclass(
+            "PlainResident", [(f.name, f.type, f) for f in dataclasses.fields(Resident)])
+        rows = [(i, i % 500, f"First{i % 300}", f"Last{i % 900}", "1990-01-01",
+                 None, None, None, "active", None, None, None, "") for i in range(100_000)]
+
+        def traced(cls):
+            tracemalloc.start()
+            try:
+                objs = [cls(*row) for row in rows]
+                return tracemalloc.get_traced_memory()[0], len(objs)
+            finally:
+                tracemalloc.stop()
+        with_dict, _ = traced(plain)
+        slotted, _ = traced(Resident)
+        assert slotted < 0.85 * with_dict, f"{slotted / 1e6:.1f} MB vs {with_dict / 1e6:.1f} MB"
@@ -0,0 +1,394 @@
+"""Tests for tasks.py — background task runner."""
+import csv
+import os
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+import tasks
+from models import Resident
+
+
+@pytest.fixture(autouse=True)
+def isolated_db(tmp_path):
+    """The worker always borrows a connection, so keep it off the real church.db."""
+    with patch("database.DB_PATH", str(tmp_path / "tasks.db")):
+        yield
+
+
+class _FakeWidget:
+    """Stands in for a Tk widget: after() callbacks run when _drive() is called."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+
+
+def _drive(widget, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while widget.pending:
+        assert time.monotonic() < deadline, "task did not finish"
+        widget.pending.pop(0)()
+        time.sleep(0.002)
+
+
+def _run(job, on_progress=None):
+    widget = _FakeWidget()
+    results = []
+    runner = tasks.TaskRunner(widget, on_progress=on_progress)
+    assert runner.start(job, results.append)
+    _drive(widget)
+    return runner, results[0]
+
+
+class TestTaskRunner:
+    def test_returns_value_rows_and_rate(self):
+        def job(progress):
+            for i in range(0, 1001, 250):
+                progress(i, 1000)
+            return "ok"
+        runner, result = _run(job)
+        assert (result.value, result.rows, result.error, result.cancelled) == ("ok", 1000, None, False)
+        assert result.elapsed > 0
+        assert result.rate > 0
+        assert not runner.busy
+
+    def test_progress_reaches_tk_side(self):
+        seen = []
+        release = threading.Event()
+
+        def job(progress):
+            progress(10, 20)
+            release.wait(2)
+            progress(20, 20)
+        widget = _FakeWidget()
+        runner = tasks.TaskRunner(widget, on_progress=lambda d, t: seen.append((d, t)))
+        runner.start(job, lambda r: None)
+        time.sleep(0.05)
+        widget.pending.pop(0)()          # one poll while the job is blocked
+        assert seen == [(10, 20)]
+        release.set()
+        _drive(widget)
+
+    def test_runs_job_off_the_calling_thread(self):
+        caller = threading.get_ident()
+        _, result = _run(lambda progress: threading.get_ident())
+        assert result.value != caller
+
+    def test_one_job_at_a_time(self):
+        release = threading.Event()
+        widget = _FakeWidget()
+        runner = tasks.TaskRunner(widget)
+        assert runner.start(lambda p: release.wait(2), lambda r: None)
+        assert runner.busy
+        assert not runner.start(lambda p: None, lambda r: None)
+        release.set()
+        _drive(widget)
+        assert not runner.busy
+
+    def test_error_is_reported(self):
+        def job(progress):
+            raise ValueError("bad file")
+        _, result = _run(job)
+        assert isinstance(result.error, ValueError)
+        assert not result.cancelled
+
+    def test_cancel(self):
+        started = threading.Event()
+
+        def job(progress):
+            started.set()
+            for i in range(10_000):
+                progress(i)
+                time.sleep(0.001)
+            return "finished"
+        widget = _FakeWidget()
+        results = []
+        runner = tasks.TaskRunner(widget)
+        runner.start(job, results.append)
+        started.wait(2)
+        runner.cancel()
+        _drive(widget)
+        assert results[0].cancelled
+        assert results[0].value is None
+        assert results[0].error is None
+
+
+class TestTaskRunnerWithDatabase:
+    def _write_csv(self, path, n):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["Last Name", "First Name", "Address"])
+            for i in range(n):
+                w.writerow([f"Last{i}", f"First{i}", f"Street {i % 7}"])
+
+    def test_import_uses_pooled_connection(self, temp_db, tmp_path):
+        import export as exp
+        path = str(tmp_path / "in.csv")
+        self._write_csv(path, 50)
+        temp_db.get_connection()
+        _, result = _run(lambda progress: exp.import_csv(path, progress=progress))
+        assert result.value == (50, 0)
+        assert result.rows == 50
+        assert temp_db.count_residents() == 50
+        opened = temp_db.connection_stats()["opened"]
+        _, result = _run(lambda progress: exp.import_csv(path, progress=progress))
+        assert result.value == (0, 50)
+        assert temp_db.connection_stats()["opened"] == opened  # worker reused the pool
+
+    def test_copy_of_db_file_has_imported_rows(self, temp_db, tmp_path):
+        """A backup made by copying church.db alone, with the app still open."""
+        import export as exp
+        import sqlite3
+        import shutil
+        path = str(tmp_path / "in.csv")
+        self._write_csv(path, 50)
+        temp_db.get_connection()
+        _run(lambda progress: exp.import_csv(path, progress=progress))
+        copy = str(tmp_path / "backup.db")
+        shutil.copyfile(temp_db.DB_PATH, copy)
+        conn = sqlite3.connect(copy)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM residents").fetchone()[0] == 50
+        finally:
+            conn.close()
+
+    def test_cancelled_import_rolls_back(self, temp_db, tmp_path):
+        """Same call as the Import menu: chunked commits, undone on cancel."""
+        import export as exp
+        import sqlite3
+        path = str(tmp_path / "in.csv")
+        self._write_csv(path, exp.IMPORT_COMMIT_EVERY + 2 * exp.PROGRESS_EVERY)
+        committed = []
+
+        def job(progress):
+            def cancel_midway(done, total):
+                if done > exp.IMPORT_COMMIT_EVERY:
+                    with sqlite3.connect(temp_db.DB_PATH) as other:
+                        committed.append(other.execute("SELECT COUNT(*) FROM residents").fetchone()[0])
+                    runner.cancel()
+                progress(done, total)
+            return exp.import_csv(path, progress=cancel_midway)
+        widget = _FakeWidget()
+        results = []
+        runner = tasks.TaskRunner(widget)
+        runner.start(job, results.append)
+        _drive(widget)
+        assert results[0].cancelled
+        assert committed[0] >= exp.IMPORT_COMMIT_EVERY   # a chunk was committed...
+        assert temp_db.count_residents() == 0            # ...and undone
+        assert temp_db.get_addresses() == []
+
+    def test_ui_write_during_export_does_not_wait(self, temp_db, tmp_path):
+        import export as exp
+        with temp_db.BulkImporter() as imp:
+            for i in range(2 * exp.PROGRESS_EVERY):
+                imp.add("Main St 1", Resident(id=None, address_id=0,
+                                              first_name=f"F{i}", last_name=f"L{i}"))
+        addr_id = temp_db.get_addresses()[0].id
+        midway, written = threading.Event(), threading.Event()
+
+        def job(progress):
+            def hold_cursor(done, total):
+                if done == exp.PROGRESS_EVERY:
+                    midway.set()
+                    written.wait(10)
+                progress(done, total)
+            return exp.export_csv_from_db(str(tmp_path / "out.csv"), progress=hold_cursor)
+        widget = _FakeWidget()
+        results = []
+        runner = tasks.TaskRunner(widget)
+        runner.start(job, results.append)
+        assert midway.wait(5)
+        start = time.monotonic()
+        temp_db.add_resident(Resident(id=None, address_id=addr_id,
+                                      first_name="New", last_name="Resident"))
+        elapsed = time.monotonic() - start
+        written.set()
+        _drive(widget)
+        assert elapsed < 1, f"write waited {elapsed:.1f}s for the export's read"
+        assert results[0].error is None
+        assert results[0].value == 2 * exp.PROGRESS_EVERY   # the export's own snapshot
+
+    def test_cancelled_export_removes_partial_file(self, temp_db, tmp_path):
+        import export as exp
+        addr = temp_db.add_address("Main St 1")
+        for i in range(2 * exp.PROGRESS_EVERY):
+            temp_db.add_resident(Resident(id=None, address_id=addr.id,
+                                          first_name=f"F{i}", last_name=f"L{i}"))
+        out = tmp_path / "exports"
+        out.mkdir()
+        path = str(out / "out.csv")
+
+        def job(progress):
+            def cancel_midway(done, total):
+                if done:
+                    runner.cancel()
+                progress(done, total)
+            return exp.export_csv_from_db(path, progress=cancel_midway)
+        widget = _FakeWidget()
+        results = []
+        runner = tasks.TaskRunner(widget)
+        runner.start(job, results.append)
+        _drive(widget)
+        assert results[0].cancelled
+        assert os.listdir(out) == []
+
+    def test_cancelled_export_keeps_previous_file(self, temp_db, tmp_path):
+        import export as exp
+        addr = temp_db.add_address("Main St 1")
+        for i in range(2 * exp.PROGRESS_EVERY):
+            temp_db.add_resident(Resident(id=None, address_id=addr.id,
+                                          first_name=f"F{i}", last_name=f"L{i}"))
+        out = tmp_path / "exports"
+        out.mkdir()
+        path = out / "out.csv"
+        path.write_text("last week's export", encoding="utf-8")
+
+        def job(progress):
+            def cancel_midway(done, total):
+                if done:
+                    runner.cancel()
+                progress(done, total)
+            return exp.export_csv_from_db(str(path), progress=cancel_midway)
+        widget = _FakeWidget()
+        results = []
+        runner = tasks.TaskRunner(widget)
+        runner.start(job, results.append)
+        _drive(widget)
+        assert results[0].cancelled
+        assert path.read_text(encoding="utf-8") == "last week's export"
+        assert os.listdir(out) == ["out.csv"]
+
+
+class TestTaskResult:
+    def test_rate(self):
+        assert tasks.TaskResult(rows=1000, elapsed=0.5).rate == 2000
+
+    def test_rate_without_elapsed_time(self):
+        assert tasks.TaskResult(rows=10).rate == 10
+
+
+class TestLatestRunner:
+    def _collect(self):
+        batches, done = [], []
+        return batches, done, (lambda items, first: batches.append((items, first))), done.append
+
+    def test_delivers_batches_in_order(self):
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        batches, done, on_batch, on_done = self._collect()
+
+        def job(emit):
+            emit([1, 2])
+            emit([3])
+        runner.submit(job, on_batch, on_done)
+        _drive(widget)
+        assert batches == [([1, 2], True), ([3], False)]
+        assert done[0].rows == 3 and done[0].error is None
+        assert not runner.busy
+
+    def test_newer_submission_supersedes_running_job(self):
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        started, release = threading.Event(), threading.Event()
+        batches, done, on_batch, on_done = self._collect()
+
+        def slow(emit):
+            started.set()
+            release.wait(2)
+            emit(["stale"])
+        runner.submit(slow, on_batch, on_done)
+        started.wait(2)
+        runner.submit(lambda emit: emit(["fresh"]), on_batch, on_done)
+        release.set()
+        _drive(widget)
+        assert batches == [(["fresh"], True)]
+        assert len(done) == 1
+
+    def test_only_latest_of_queued_jobs_runs(self):
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        started, release = threading.Event(), threading.Event()
+        ran = []
+
+        def blocker(emit):
+            started.set()
+            release.wait(2)
+        runner.submit(blocker, lambda i, f: None)
+        started.wait(2)
+        for q in ("k", "ko", "kov"):
+            runner.submit(lambda emit, q=q: ran.append(q), lambda i, f: None)
+        release.set()
+        _drive(widget)
+        assert ran == ["kov"]
+
+    def test_cancel_drops_results(self):
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        started, release = threading.Event(), threading.Event()
+        batches, done, on_batch, on_done = self._collect()
+
+        def job(emit):
+            started.set()
+            release.wait(2)
+            emit([1])
+        runner.submit(job, on_batch, on_done)
+        started.wait(2)
+        runner.cancel()
+        release.set()
+        _drive(widget)
+        assert batches == [] and done == []
+
+    def test_interrupts_running_query(self, temp_db):
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        started = threading.Event()
+        batches, done, on_batch, on_done = self._collect()
+
+        def endless(emit):
+            conn = temp_db.get_connection()
+            started.set()
+            conn.execute("""WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+                            SELECT COUNT(*) FROM n""").fetchone()
+            emit(["never"])
+        t0 = time.monotonic()
+        runner.submit(endless, on_batch, on_done)
+        started.wait(2)
+        time.sleep(0.05)
+        runner.submit(lambda emit: emit(["fresh"]), on_batch, on_done)
+        _drive(widget)
+        assert batches == [(["fresh"], True)]
+        assert time.monotonic() - t0 < 3
+
+    def test_error_is_reported(self):
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        batches, done, on_batch, on_done = self._collect()
+
+        def job(emit):
+            raise ValueError("boom")
+        runner.submit(job, on_batch, on_done)
+        _drive(widget)
+        assert isinstance(done[0].error, ValueError)
+
+    def test_streams_search_results(self, temp_db):
+        addr = temp_db.add_address("Main St 1")
+        for i in range(5):
+            temp_db.add_resident(Resident(id=None, address_id=addr.id,
+                                          first_name=f"Anna{i}", last_name="Melnyk"))
+        widget = _FakeWidget()
+        runner = tasks.LatestRunner(widget)
+        batches, done, on_batch, on_done = self._collect()
+
+        def job(emit):
+            for batch in temp_db.iter_search_residents("melnyk", batch_size=2):
+                emit(batch)
+        runner.submit(job, on_batch, on_done)
+        _drive(widget)
+        assert [len(items) for items, _ in batches] == [2, 2, 1]
+        assert done[0].rows == 5
@@ -1,6 +1,10 @@
 """Tests for transliterate.py — Ukrainian ↔ Latin helpers."""
+import threading
+import time
+
 import pytest
-from transliterate import uk_to_en, normalize_for_search
+import transliterate
+from transliterate import uk_to_en, normalize_for_search, normalize_many, phonetic_keys
 
 
 class TestUkToEn:
@@ -213,3 +217,199 @@ class TestNormalizeForSearch:
         koval_uk = normalize_for_search("Коваль")   # soft sign drops → "koval"
         koval_en = normalize_for_search("Koval")
         assert koval_uk == koval_en
+
+
+class TestNormalizeMany:
+    """normalize_many() — batch form of normalize_for_search()."""
+
+    def test_matches_normalize_for_search(self):
+        names = ["Іван Коваль", "Ivan Koval", "ЩУКА", "", "O'Brien 5", "Ївга Щербань"]
+        assert normalize_many(names) == [normalize_for_search(n) for n in names]
+
+    def test_accepts_generator(self):
+        assert normalize_many(n for n in ("Іван", "Petro")) == ["ivan", "petro"]
+
+    def test_empty(self):
+        assert normalize_many([]) == []
+
+
+class TestTranslateTable:
+    """The compiled str.translate table and its ASCII fast path."""
+
+    @staticmethod
+    def _reference(text):
+        # The original per-character implementation
+        return ''.join(transliterate._UK_TO_EN.get(ch, ch) for ch in text).lower()
+
+    def test_agrees_with_reference_on_every_character(self):
+        chars = "".join(transliterate._UK_TO_EN) + "AZaz09 ,.-'ёЁъыэ"
+        for ch in chars:
+            assert normalize_for_search(ch) == self._reference(ch), repr(ch)
+
+    def test_ascii_input_is_returned_unchanged(self):
+        text = "Koval"
+        assert uk_to_en(text) is text
+
+    @pytest.mark.benchmark
+    def test_throughput_benchmark(self):
+        """Microbenchmark: the compiled table must beat the per-character join.
+
+        The key cache is switched off, or the repeated names would be cache hits.
+        """
+        base = ["Шевченко Тарас Григорович", "Коваль Іван", "Ярошенко Петро",
+                "Ivan Koval", "Kulykiv, Shevchenka 5", "Щербань Ївга"]
+        names = base * 2000
+
+        def best_of(fn, runs=3):
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        old = best_of(lambda: [self._reference(n) for n in names])
+        transliterate.set_cache_size(0)
+        try:
+            new = best_of(lambda: normalize_many(names))
+            assert normalize_many(names) == [self._reference(n) for n in names]
+        finally:
+            transliterate.set_cache_size(transliterate.NORMALIZE_CACHE_SIZE)
+        # Measured about 2x; the margin leaves room for a busy machine.
+        assert new * 1.25 < old, f"translate {new * 1000:.1f} ms vs join {old * 1000:.1f} ms"
+
+
+class TestKeyCache:
+    """KeyCache — bounded LRU behind normalize_for_search()."""
+
+    def test_hit_after_miss(self):
+        cache = transliterate.KeyCache(max_size=4)
+        assert cache.get("Іван") == "ivan"
+        assert cache.get("Іван") == "ivan"
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0,
+                                 "size": 1, "max_size": 4}
+
+    def test_bounded_and_evicts_least_recently_used(self):
+        cache = transliterate.KeyCache(max_size=2)
+        cache.get("Іван")
+        cache.get("Петро")
+        cache.get("Іван")          # Петро is now the oldest
+        cache.get("Марія")
+        assert cache.stats()["size"] == 2
+        assert cache.evictions == 1
+        cache.get("Іван")
+        assert cache.hits == 2
+        cache.get("Петро")
+        assert cache.misses == 4
+
+    def test_resize_evicts_down_to_new_bound(self):
+        cache = transliterate.KeyCache(max_size=10)
+        for name in ("Іван", "Петро", "Марія", "Ольга"):
+            cache.get(name)
+        cache.resize(1)
+        assert cache.stats()["size"] == 1
+        assert cache.evictions == 3
+        assert cache.get("Ольга") == "olha" and cache.hits == 1
+
+    def test_zero_size_disables_caching(self):
+        cache = transliterate.KeyCache(max_size=0)
+        assert cache.get("Іван") == "ivan"
+        assert cache.get("Іван") == "ivan"
+        assert cache.stats() == {"hits": 0, "misses": 2, "evictions": 0,
+                                 "size": 0, "max_size": 0}
+
+    def test_clear_resets_counters(self):
+        cache = transliterate.KeyCache(max_size=4)
+        cache.get("Іван")
+        cache.get("Іван")
+        cache.clear()
+        assert cache.stats()["hits"] == cache.stats()["size"] == 0
+
+    def test_concurrent_use(self):
+        cache = transliterate.KeyCache(max_size=8)
+        names = [f"Іван{i}" for i in range(32)]
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(200):
+                    for n in names:
+                        assert cache.get(n) == f"ivan{n[4:]}"
+            except Exception as e:   # pragma: no cover - reported below
+                errors.append(e)
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert cache.stats()["size"] <= 8
+
+
+class TestNormalizeCache:
+    """The module-level cache used by normalize_for_search()/normalize_many()."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        transliterate.clear_cache()
+        yield
+        transliterate.set_cache_size(transliterate.NORMALIZE_CACHE_SIZE)
+        transliterate.clear_cache()
+
+    def test_repeated_filtering_hits_the_cache(self):
+        streets = ["Шевченка 1", "Франка 2", "Лесі Українки 3"]
+        for _ in range(5):          # five refreshes / keystrokes
+            normalize_many(streets)
+        stats = transliterate.cache_stats()
+        assert stats["misses"] == 3
+        assert stats["hits"] == 12
+
+    def test_ascii_bypasses_the_cache(self):
+        normalize_for_search("Koval")
+        assert transliterate.cache_stats()["misses"] == 0
+
+    def test_set_cache_size_bounds_memory(self):
+        transliterate.set_cache_size(10)
+        normalize_many(f"Іван{i}" for i in range(100))
+        stats = transliterate.cache_stats()
+        assert stats["size"] == 10
+        assert stats["evictions"] == 90
+
+
+class TestPhoneticKeys:
+    """phonetic_keys() — one canonical spelling per name across romanisations."""
+
+    @pytest.mark.parametrize("variants", [
+        ("Ковальчук", "Kovalchuk", "Kowalczuk"),
+        ("Іванишин", "Ivanyshyn", "Ivanishin", "Iwanyszyn"),
+        ("Шевченко", "Shevchenko", "Schewtschenko", "Szewczenko"),
+        ("Григорій", "Hryhoriy", "Grigoriy", "Hryhorii"),
+        ("Кравець", "Kravets", "Krawiec", "Krawetz"),
+        ("Ярошенко", "Yaroshenko", "Jaroszenko"),
+        ("Щербак", "Shcherbak", "Szczerbak"),
+        ("Жук", "Zhuk", "Żuk"),
+        ("Юрій", "Yuriy", "Jurij", "Yurii"),
+        ("Мар'яна", "Maryana", "Mariana"),
+        ("Ганна", "Hanna", "Hana"),
+    ])
+    def test_variants_share_a_key(self, variants):
+        keys = [phonetic_keys(v)[0] for v in variants]
+        assert len(set(keys)) == 1, dict(zip(variants, keys))
+
+    def test_different_names_differ(self):
+        assert phonetic_keys("Коваль") != phonetic_keys("Ковальчук")
+        assert phonetic_keys("Іван") != phonetic_keys("Петро")
+
+    def test_polish_ch_reading(self):
+        assert phonetic_keys("Chmielnicki") == ["chmelnicki", "hmelnicki"]
+        assert phonetic_keys("Хмельницький") == ["hmelnicki"]
+
+    def test_cyrillic_has_a_single_key(self):
+        assert phonetic_keys("Чорновол") == ["chornovol"]
+
+    def test_words_kept_apart(self):
+        assert phonetic_keys("Тарас Шевченко") == ["taras shevchenko"]
+
+    def test_no_letters(self):
+        assert phonetic_keys("") == []
+        assert phonetic_keys(" 12 ") == []
@@ -7,7 +7,19 @@ Cyrillic names (e.g. "Іван") and vice-versa.
 Only uk_to_en is needed for search: both the query and the stored name are
 converted to Latin, then compared — so whichever script the user types in,
 the match works.
+
+phonetic_keys() goes one step further for names written down under other
+conventions (Polish "Kowalczuk", German "Schewtschenko", passport "Grigoriy"):
+it reduces any of them to the same canonical spelling.
 """
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+# Entries kept by the normalize_for_search() cache (0 disables it)
+NORMALIZE_CACHE_SIZE = 8192
 
 # Simplified KMU-2010-based Ukrainian → Latin table, tuned for name matching.
 # Multi-character outputs are intentional (zh, kh, ts, ch, sh, shch).
@@ -31,13 +43,83 @@ _UK_TO_EN: dict[str, str] = {
 }
 
 
+# str.translate() table indexed by code point, covering everything up to the
+# end of the Cyrillic block.  A tuple is indexed directly, which is much faster
+# than the dict str.maketrans() builds; code points past its end raise
+# IndexError, which str.translate() treats as "leave unchanged".
+_TABLE: tuple = tuple(_UK_TO_EN.get(chr(cp), chr(cp)) for cp in range(0x500))
+
+
 def uk_to_en(text: str) -> str:
     """Transliterate Ukrainian Cyrillic characters to Latin equivalents.
 
     Non-Cyrillic characters (Latin, digits, spaces, punctuation) pass through
     unchanged, so mixed-script strings work correctly.
     """
-    return ''.join(_UK_TO_EN.get(ch, ch) for ch in text)
+    if text.isascii():
+        return text  # nothing to transliterate
+    return text.translate(_TABLE)
+
+
+class KeyCache:
+    """Bounded LRU of search keys, keyed by the original text.
+
+    Thread-safe: the UI filters on the Tk thread while imports build search
+    text on a worker.  Once `max_size` entries are held, each new one evicts
+    the least recently used.  `hits`, `misses` and `evictions` count since
+    the last clear().
+    """
+
+    def __init__(self, max_size: int = NORMALIZE_CACHE_SIZE):
+        self.max_size = max_size
+        self._keys: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text: str) -> str:
+        keys = self._keys
+        with self._lock:
+            key = keys.get(text)
+            if key is not None:
+                keys.move_to_end(text)
+                self.hits += 1
+                return key
+            self.misses += 1
+        key = text.translate(_TABLE).lower()
+        if self.max_size > 0:
+            with self._lock:
+                keys[text] = key
+                self._trim()
+        return key
+
+    def resize(self, max_size: int):
+        """Change the bound, evicting the oldest entries if it shrank."""
+        with self._lock:
+            self.max_size = max_size
+            self._trim()
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hits/misses/evictions/size/max_size counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._keys), "max_size": self.max_size}
+
+    def _trim(self):
+        # Called with _lock held
+        keys = self._keys
+        while len(keys) > max(self.max_size, 0):
+            keys.popitem(last=False)
+            self.evictions += 1
+
+
+_cache = KeyCache()
 
 
 def normalize_for_search(text: str) -> str:
@@ -51,5 +133,95 @@ def normalize_for_search(text: str) -> str:
       - "Ivan"  matches "Іван"
       - "іван"  matches "ivan"
       - "Koval" matches "Коваль"
+
+    Results for non-ASCII text are memoized in a bounded LRU (see
+    cache_stats()); ASCII text is just lowercased, which is cheaper than a
+    cache lookup.
+    """
+    if text.isascii():
+        return text.lower()
+    return _cache.get(text)
+
+
+def normalize_many(texts: Iterable[str]) -> List[str]:
+    """normalize_for_search() over a batch, e.g. every name on a list refresh."""
+    get = _cache.get
+    return [t.lower() if t.isascii() else get(t) for t in texts]
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return hits/misses/evictions/size/max_size of the search-key cache."""
+    return _cache.stats()
+
+
+def set_cache_size(max_size: int):
+    """Bound the search-key cache to `max_size` entries (0 turns it off)."""
+    _cache.resize(max_size)
+
+
+def clear_cache():
+    """Drop every cached search key and reset the counters."""
+    _cache.clear()
+
+
+# ── Phonetic keys ────────────────────────────────────────────────────────────
+#
+# The same Ukrainian sound is spelled differently by KMU-2010, older passport
+# romanisations, Polish, German and Czech.  Each spelling below is rewritten
+# to one canonical form, and sounds the conventions disagree on are merged:
+# г/ґ/х → h (Hryhoriy, Grigoriy), ц → c (Kravets, Krawiec, Krawetz),
+# и/і/й/ї → i (Ivanyshyn, Iwanyszyn, Ivanishin), Polish "ie" → e.  Doubled
+# letters collapse.
+# The key is only ever compared with other keys, never shown.
+
+# Letters with diacritics that stand for a different sound than their base
+# letter; the remaining marks (ó, ü, ą, …) are simply dropped, and so are
+# apostrophes (Мар'яна, Mar'iana, Marjana).
+_PHONETIC_LETTERS = str.maketrans({
+    "ł": "l", "ż": "zh", "ž": "zh", "ź": "z", "š": "sh", "ś": "s",
+    "č": "ch", "ć": "c", "ń": "n", "ß": "ss",
+    "'": None, "’": None, "ʼ": None,
+})
+
+_PHONETIC_RULES = {
+    "schtsch": "shch", "szcz": "shch", "shch": "shch",
+    "tsch": "ch", "sch": "sh", "cz": "ch", "sz": "sh", "rz": "zh",
+    "kh": "h", "g": "h", "ts": "c", "tz": "c",
+    "w": "v", "j": "i", "y": "i", "ie": "e",
+}
+_PHONETIC_RE = re.compile("|".join(sorted(_PHONETIC_RULES, key=len, reverse=True)))
+# Polish, German and Czech "ch" is х, not ч (but "sch"/"shch" is ш/щ)
+_PHONETIC_CH_RE = re.compile(r"(?<!s)(?<!sh)ch")
+_NON_LETTERS_RE = re.compile(r"[^a-z]+")
+_DOUBLES_RE = re.compile(r"(.)\1+")
+
+
+def _phonetic(latin: str) -> str:
+    words = (_DOUBLES_RE.sub(r"\1", _PHONETIC_RE.sub(lambda m: _PHONETIC_RULES[m.group()], w))
+             for w in _NON_LETTERS_RE.split(latin))
+    return " ".join(w for w in words if w)
+
+
+def phonetic_keys(text: str) -> List[str]:
+    """Canonical spellings of a name under the common romanisations.
+
+    Spelling variants of one name share a key: "Kowalczuk", "Kovalchuk" and
+    "Ковальчук" all give ["kovalchuk"], "Iwanyszyn" and "Іванишин" give
+    ["ivanishin"].  Latin text with a "ch" gets a second key reading it as
+    х ("Chmielnicki" → ["chmelnicki", "hmelnicki"]).  Store the keys of a
+    name and look up the keys of a query; both sides are reduced the same
+    way, so one lookup covers every variant.
     """
-    return uk_to_en(text).lower()
+    latin = normalize_for_search(text).translate(_PHONETIC_LETTERS)
+    if not latin.isascii():
+        latin = "".join(ch for ch in unicodedata.normalize("NFKD", latin)
+                        if not unicodedata.combining(ch))
+    key = _phonetic(latin)
+    if not key:
+        return []
+    keys = [key]
+    if text.isascii() and "ch" in latin:
+        alt = _phonetic(_PHONETIC_CH_RE.sub("h", latin))
+        if alt != key:
+            keys.append(alt)
+    return keys
@@ -1,11 +1,49 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Callable, Optional, List
+from typing import Callable, Optional, List, Tuple
 from models import Address
 import database as db
+import completion
 import lang
 from ui.dialogs import AddressDialog
-from transliterate import normalize_for_search
+from transliterate import normalize_for_search, normalize_many
+
+# Typing pauses shorter than this are coalesced into one filter pass.
+FILTER_DELAY_MS = 150
+
+
+def _matching(keys: List[str], candidates, query: str) -> List[int]:
+    """Indices from `candidates` whose search key contains `query`."""
+    if not query:
+        return list(candidates)
+    return [i for i in candidates if query in keys[i]]
+
+
+def _listbox_edits(old: List[int], new: List[int]) -> List[Tuple[int, int, List[int]]]:
+    """Edits turning listbox rows `old` into `new` (both ascending indices).
+
+    Returns (position, rows_to_delete, indices_to_insert) tuples to apply
+    front to back, so rows present in both lists are left untouched.
+    """
+    edits = []
+    i = j = pos = 0
+    while i < len(old) or j < len(new):
+        if i < len(old) and j < len(new) and old[i] == new[j]:
+            i += 1
+            j += 1
+            pos += 1
+            continue
+        deleted = 0
+        inserted = []
+        while i < len(old) and (j == len(new) or old[i] < new[j]):
+            i += 1
+            deleted += 1
+        while j < len(new) and (i == len(old) or new[j] < old[i]):
+            inserted.append(new[j])
+            j += 1
+        edits.append((pos, deleted, inserted))
+        pos += len(inserted)
+    return edits
 
 
 class AddressListPanel(ttk.Frame):
@@ -15,7 +53,13 @@ class AddressListPanel(ttk.Frame):
         super().__init__(parent)
         self._on_select = on_select
         self._addresses: List[Address] = []   # full list from DB
+        self._keys: List[str] = []            # normalize_for_search(street), per refresh
+        self._labels: List[str] = []          # listbox line, per refresh
+        self._shown: List[int] = []           # indices into _addresses now in the listbox
         self._displayed: List[Address] = []   # after applying filter
+        self._last_query: Optional[str] = None
+        self._filter_after: Optional[str] = None
+        self._active_total = 0
         self._selected_id: Optional[int] = None
 
         self._build_ui()
@@ -30,7 +74,7 @@ class AddressListPanel(ttk.Frame):
         sf.pack(fill="x", padx=8, pady=(0, 4))
         ttk.Label(sf, text="🔍", font=("", 9)).pack(side="left")
         self._search_var = tk.StringVar()
-        self._search_var.trace_add("write", lambda *_: self._apply_filter())
+        self._search_var.trace_add("write", lambda *_: self._schedule_filter())
         ttk.Entry(sf, textvariable=self._search_var,
                   font=("", 9)).pack(side="left", fill="x", expand=True, padx=(4, 2))
         ttk.Button(sf, text="✕", width=2,
@@ -70,22 +114,46 @@ class AddressListPanel(ttk.Frame):
 
     def refresh(self):
         self._addresses = db.get_addresses()
+        self._keys = normalize_many(a.street for a in self._addresses)
+        self._labels = [f"  {a.street}  ({a.active_count})" for a in self._addresses]
+        self._active_total = db.get_active_total()
+        # Total always reflects ALL addresses, not just the filtered subset
+        self._total_var.set(lang.get("lbl_active_total", count=self._active_total))
+        # Indices changed with the reload: redraw from scratch, without waiting
+        self._listbox.delete(0, "end")
+        self._shown = []
+        self._last_query = None
         self._apply_filter()
 
+    def _schedule_filter(self):
+        if self._filter_after is not None:
+            self.after_cancel(self._filter_after)
+        self._filter_after = self.after(FILTER_DELAY_MS, self._apply_filter)
+
     def _apply_filter(self):
+        if self._filter_after is not None:
+            self.after_cancel(self._filter_after)
+            self._filter_after = None
         q = normalize_for_search(self._search_var.get().strip())
-        self._displayed = [a for a in self._addresses
-                           if not q or q in normalize_for_search(a.street)]
-
-        self._listbox.delete(0, "end")
-        for addr in self._displayed:
-            self._listbox.insert("end", f"  {addr.street}  ({addr.active_count})")
-
-        # Total always reflects ALL addresses, not just the filtered subset
-        total = sum(a.active_count for a in self._addresses)
-        self._total_var.set(lang.get("lbl_active_total", count=total))
+        if q == self._last_query:
+            return
+        # A query that contains the previous one can only match a subset of
+        # the previous matches, so only those need checking.
+        narrowing = self._last_query is not None and self._last_query in q
+        candidates = self._shown if narrowing else range(len(self._addresses))
+        shown = _matching(self._keys, candidates, q)
+
+        for pos, deleted, inserted in _listbox_edits(self._shown, shown):
+            if deleted:
+                self._listbox.delete(pos, pos + deleted - 1)
+            if inserted:
+                self._listbox.insert(pos, *(self._labels[i] for i in inserted))
+        self._shown = shown
+        self._last_query = q
+        self._displayed = [self._addresses[i] for i in shown]
 
         # Restore selection highlight if the selected address is still visible
+        self._listbox.selection_clear(0, "end")
         if self._selected_id is not None:
             for i, a in enumerate(self._displayed):
                 if a.id == self._selected_id:
@@ -128,6 +196,7 @@ class AddressListPanel(ttk.Frame):
         dlg = AddressDialog(self)
         if dlg.result:
             db.add_address(dlg.result.street, dlg.result.notes)
+            completion.add_street(dlg.result.street)
             self.refresh()
 
     def _edit_address(self):
@@ -136,9 +205,12 @@ class AddressListPanel(ttk.Frame):
             messagebox.showinfo(lang.get("info"),
                                 lang.get("select_address_first"), parent=self)
             return
+        old_street = addr.street
         dlg = AddressDialog(self, addr)
         if dlg.result:
             db.update_address(dlg.result)
+            completion.remove_street(old_street)
+            completion.add_street(dlg.result.street)
             self.refresh()
 
     def _delete_address(self):
@@ -154,6 +226,7 @@ class AddressListPanel(ttk.Frame):
         ):
             return
         db.delete_address(addr.id)
+        completion.invalidate()  # its residents' names went with it
         self._selected_id = None
         self._on_select(None)
         self.refresh()
@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Optional
+from typing import Callable, Optional
 from models import Address, Resident, Event
 import database as db
+import completion
 import lang
 
 
@@ -25,6 +26,91 @@ def _date_entry(parent, label_key: str, row: int, initial: str = ""):
     return var
 
 
+class _Completer:
+    """Drop-down list of completions under an Entry while the user types.
+
+    `index` is called on the first keystroke (completion.streets or
+    completion.names), so a dialog that is only opened and closed never
+    loads it.  Down moves into the list, Return or a click picks an entry,
+    Escape closes the list.
+    """
+
+    def __init__(self, entry: ttk.Entry, var: tk.StringVar,
+                 index: Callable[[], completion.PrefixIndex]):
+        self._entry = entry
+        self._var = var
+        self._index = index
+        self._popup: Optional[tk.Toplevel] = None
+        self._list: Optional[tk.Listbox] = None
+        self._setting = False
+        var.trace_add("write", lambda *_: self._update())
+        entry.bind("<Down>", self._enter_list, add="+")
+        entry.bind("<Escape>", lambda e: self._hide(), add="+")
+        entry.bind("<FocusOut>", lambda e: entry.after(100, self._hide_unless_focused), add="+")
+
+    def _update(self):
+        if self._setting:
+            return
+        text = self._var.get()
+        items = self._index().complete(text)
+        if not items or items == [text.strip()]:
+            self._hide()
+            return
+        self._show(items)
+
+    def _show(self, items):
+        if self._popup is None:
+            self._popup = tk.Toplevel(self._entry)
+            self._popup.wm_overrideredirect(True)
+            self._list = tk.Listbox(self._popup, exportselection=False)
+            self._list.pack(fill="both", expand=True)
+            self._list.bind("<ButtonRelease-1>", self._choose)
+            self._list.bind("<Return>", self._choose)
+            self._list.bind("<Escape>", lambda e: self._hide(focus_entry=True))
+        self._list.delete(0, "end")
+        self._list.insert("end", *items)
+        self._list.config(height=len(items),
+                          width=max(int(self._entry.cget("width")), *(len(i) for i in items)))
+        x = self._entry.winfo_rootx()
+        y = self._entry.winfo_rooty() + self._entry.winfo_height()
+        self._popup.geometry(f"+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _hide(self, focus_entry: bool = False):
+        if self._popup is not None:
+            self._popup.withdraw()
+        if focus_entry:
+            self._entry.focus_set()
+
+    def _hide_unless_focused(self):
+        if not self._entry.winfo_exists():
+            return  # the dialog was closed
+        if self._list is None or self._entry.focus_get() is not self._list:
+            self._hide()
+
+    def _enter_list(self, event=None):
+        if self._popup is None or not self._popup.winfo_viewable():
+            return None
+        self._list.focus_set()
+        self._list.selection_clear(0, "end")
+        self._list.selection_set(0)
+        self._list.activate(0)
+        return "break"
+
+    def _choose(self, event=None):
+        sel = self._list.curselection()
+        if sel:
+            self._setting = True
+            try:
+                self._var.set(self._list.get(sel[0]))
+            finally:
+                self._setting = False
+            self._entry.icursor("end")
+        self._hide(focus_entry=True)
+        return "break"
+
+
 def _to_display(iso: str) -> str:
     """YYYY-MM-DD → DD.MM.YYYY for display in UI."""
     if iso and len(iso) == 10 and iso[4] == "-":
@@ -71,9 +157,9 @@ class AddressDialog(tk.Toplevel):
             row=0, column=0, sticky="e", padx=8, pady=(6, 0)
         )
         self._street = tk.StringVar(value=address.street if address else "")
-        ttk.Entry(frame, textvariable=self._street, width=34).grid(
-            row=0, column=1, columnspan=3, sticky="ew", padx=4, pady=(6, 0)
-        )
+        street_entry = ttk.Entry(frame, textvariable=self._street, width=34)
+        street_entry.grid(row=0, column=1, columnspan=3, sticky="ew", padx=4, pady=(6, 0))
+        _Completer(street_entry, self._street, completion.streets)
         ttk.Label(frame, text=lang.get("lbl_street_hint"),
                   foreground="gray", font=("", 8)).grid(
             row=1, column=1, columnspan=3, sticky="w", padx=4, pady=(0, 6)
@@ -149,27 +235,27 @@ class ResidentDialog(tk.Toplevel):
             row=row, column=0, sticky="e", padx=8, pady=4
         )
         self._father = tk.StringVar(value=resident.father or "" if resident else "")
-        ttk.Entry(frame, textvariable=self._father, width=26).grid(
-            row=row, column=1, columnspan=3, sticky="w", padx=4, pady=4
-        )
+        father_entry = ttk.Entry(frame, textvariable=self._father, width=26)
+        father_entry.grid(row=row, column=1, columnspan=3, sticky="w", padx=4, pady=4)
+        _Completer(father_entry, self._father, completion.names)
 
         row += 1
         ttk.Label(frame, text=lang.get("lbl_mother")).grid(
             row=row, column=0, sticky="e", padx=8, pady=4
         )
         self._mother = tk.StringVar(value=resident.mother or "" if resident else "")
-        ttk.Entry(frame, textvariable=self._mother, width=26).grid(
-            row=row, column=1, columnspan=3, sticky="w", padx=4, pady=4
-        )
+        mother_entry = ttk.Entry(frame, textvariable=self._mother, width=26)
+        mother_entry.grid(row=row, column=1, columnspan=3, sticky="w", padx=4, pady=4)
+        _Completer(mother_entry, self._mother, completion.names)
 
         row += 1
         ttk.Label(frame, text=lang.get("lbl_spouse")).grid(
             row=row, column=0, sticky="e", padx=8, pady=4
         )
         self._spouse = tk.StringVar(value=resident.spouse or "" if resident else "")
-        ttk.Entry(frame, textvariable=self._spouse, width=26).grid(
-            row=row, column=1, columnspan=3, sticky="w", padx=4, pady=4
-        )
+        spouse_entry = ttk.Entry(frame, textvariable=self._spouse, width=26)
+        spouse_entry.grid(row=row, column=1, columnspan=3, sticky="w", padx=4, pady=4)
+        _Completer(spouse_entry, self._spouse, completion.names)
 
         row += 1
         self._birth    = _date_entry(frame, "lbl_dob",      row, _to_display(resident.birth_date    or "") if resident else "")
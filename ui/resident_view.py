@@ -3,9 +3,18 @@ from tkinter import ttk, messagebox
 from typing import Optional, List
 from models import Address, Resident, Event
 import database as db
+import completion
 import lang
 from ui.dialogs import ResidentDialog, ResidentViewDialog, MarkDeceasedDialog, EventDialog
-from transliterate import normalize_for_search
+from transliterate import normalize_for_search, normalize_many
+from tasks import LatestRunner
+
+# Global (no address selected) search waits for a pause in typing this long,
+# then streams results into the table this many rows at a time.
+SEARCH_DELAY_MS = 200
+SEARCH_BATCH = 50
+# Typo-tolerant matches (db.similar_residents) appended after the exact ones
+SEARCH_SIMILAR = 10
 
 
 def _fmt_date(iso: str) -> str:
@@ -30,8 +39,11 @@ class ResidentViewPanel(ttk.Frame):
         super().__init__(parent)
         self._address: Optional[Address] = None
         self._residents: List[Resident] = []
+        self._name_keys: List[str] = []   # normalize_for_search(full_name), per address load
         self._on_change = on_change or (lambda: None)
         self._name_filter_var = tk.StringVar()  # created before _build_ui wires the trace
+        self._search = LatestRunner(self)
+        self._search_after: Optional[str] = None
         self._build_ui()
         self._show_placeholder()
 
@@ -47,7 +59,7 @@ class ResidentViewPanel(ttk.Frame):
         sf = ttk.Frame(self)
         sf.pack(fill="x", padx=8, pady=(6, 0))
         ttk.Label(sf, text="🔍", font=("", 9)).pack(side="left")
-        self._name_filter_var.trace_add("write", lambda *_: self._apply_name_filter())
+        self._name_filter_var.trace_add("write", lambda *_: self._on_name_filter_changed())
         ttk.Entry(sf, textvariable=self._name_filter_var,
                   font=("", 9)).pack(side="left", fill="x", expand=True, padx=(4, 2))
         ttk.Button(sf, text="✕", width=2,
@@ -153,24 +165,36 @@ class ResidentViewPanel(ttk.Frame):
             self._apply_name_filter()
             return
         self._residents = db.get_residents(self._address.id)
+        self._name_keys = normalize_many(r.full_name for r in self._residents)
         self._apply_name_filter()
 
+    def _on_name_filter_changed(self):
+        if self._address is not None:
+            self._apply_name_filter()  # in-memory filter of one address: instant
+            return
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(SEARCH_DELAY_MS, self._apply_name_filter)
+
     def _apply_name_filter(self):
-        q = normalize_for_search(self._name_filter_var.get().strip())
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+            self._search_after = None
+        raw = self._name_filter_var.get().strip()
+        q = normalize_for_search(raw)
         if self._address is None:
             if q:
-                self._global_search(q)
+                self._global_search(raw)
             else:
                 # No address, no filter → full placeholder state
-                self._tree.delete(*self._tree.get_children())
-                self._residents = []
-                self._header_var.set(lang.get("select_address_placeholder"))
-                self._set_buttons_state("disabled")
+                self._search.cancel()
+                self._show_no_results()
             return
+        self._search.cancel()
         # Normal mode: filter within the selected address
         self._tree.delete(*self._tree.get_children())
-        for r in self._residents:
-            if q and q not in normalize_for_search(r.full_name):
+        for r, key in zip(self._residents, self._name_keys):
+            if q and q not in key:
                 continue
             self._insert_resident_row(r, r.full_name)
 
@@ -200,25 +224,51 @@ class ResidentViewPanel(ttk.Frame):
         )
 
     def _global_search(self, q: str):
-        """Search all residents by name across all addresses."""
-        all_res = db.get_all_residents()
-        addr_map = {a.id: a.street for a in db.get_addresses()}
-        matches = [r for r in all_res if q in normalize_for_search(r.full_name)]
-        self._residents = matches
-        self._tree.delete(*self._tree.get_children())
-        if matches:
+        """Search all residents by name across all addresses, off the Tk thread.
+
+        A newer query supersedes this one; the previous results stay on
+        screen until the first batch of the new ones arrives.  Substring
+        matches come first, then up to SEARCH_SIMILAR near misses
+        ("Kovalchyk" for "Ковальчук"), best first.
+        """
+        def job(emit):
+            shown = set()
+            for batch in db.iter_search_residents(q, batch_size=SEARCH_BATCH):
+                shown.update(r.id for r, _ in batch)
+                emit(batch)
+            similar = [(r, street) for r, street, _ in
+                       db.similar_residents(q, limit=SEARCH_SIMILAR + len(shown))
+                       if r.id not in shown][:SEARCH_SIMILAR]
+            if similar:
+                emit(similar)
+        self._search.submit(job, self._on_search_batch, self._on_search_done)
+
+    def _on_search_batch(self, found, first: bool):
+        if first:
+            self._residents = []
+            self._tree.delete(*self._tree.get_children())
             self._header_var.set(lang.get("search_results_header"))
             # Enable action buttons; Add Member requires a selected address
             for btn in (self._btn_view, self._btn_edit, self._btn_event,
                         self._btn_death, self._btn_left, self._btn_delete):
                 btn.config(state="normal")
             self._btn_add.config(state="disabled")
-            for r in matches:
-                street = addr_map.get(r.address_id, "")
-                self._insert_resident_row(r, f"{r.full_name}  —  {street}")
-        else:
-            self._header_var.set(lang.get("select_address_placeholder"))
-            self._set_buttons_state("disabled")
+        for r, street in found:
+            self._residents.append(r)
+            self._insert_resident_row(r, f"{r.full_name}  —  {street}")
+
+    def _on_search_done(self, result):
+        if result.error is not None:
+            self._show_no_results()
+            messagebox.showerror(lang.get("error"), str(result.error), parent=self)
+        elif result.rows == 0:
+            self._show_no_results()
+
+    def _show_no_results(self):
+        self._tree.delete(*self._tree.get_children())
+        self._residents = []
+        self._header_var.set(lang.get("select_address_placeholder"))
+        self._set_buttons_state("disabled")
 
     def _refresh_events(self):
         if not self._address:
@@ -266,6 +316,7 @@ class ResidentViewPanel(ttk.Frame):
         dlg = ResidentDialog(self, self._address.id)
         if dlg.result:
             r = db.add_resident(dlg.result)
+            completion.add_names(r.full_name, r.father, r.mother, r.spouse)
             if r.birth_date:
                 db.add_event(Event(
                     None, r.id, "birth", r.birth_date,
@@ -286,9 +337,13 @@ class ResidentViewPanel(ttk.Frame):
             messagebox.showinfo(lang.get("info"),
                                 lang.get("select_resident_first"), parent=self)
             return
+        old_names = (res.full_name, res.father, res.mother, res.spouse)
         dlg = ResidentDialog(self, res.address_id, res)
         if dlg.result:
-            db.update_resident(dlg.result)
+            r = dlg.result
+            db.update_resident(r)
+            completion.remove_names(*old_names)
+            completion.add_names(r.full_name, r.father, r.mother, r.spouse)
             self._refresh_residents()
             self._refresh_events()
             self._on_change()
@@ -380,6 +435,7 @@ class ResidentViewPanel(ttk.Frame):
         ):
             return
         db.delete_resident(res.id)
+        completion.remove_names(res.full_name, res.father, res.mother, res.spouse)
         self._refresh_residents()
         self._refresh_events()
         self._on_change()